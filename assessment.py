@@ -0,0 +1,186 @@
+"""
+Upcoming Artist Assessment
+The PART 10 scoring rules as data, evaluated over an (artists x scenarios) grid with NumPy broadcasting
+"""
+
+import argparse
+import json
+
+import numpy as np
+import pandas as pd
+
+# One rule per factor. A metric passes a threshold when it is above it (at or above with `inclusive`);
+# thresholds descend, and the first one passed picks the score, label and note (the last entry if none is)
+FACTORS = (
+    {'factor': 'follower_growth', 'metric': 'follower_growth_pct', 'inclusive': False,
+     'thresholds': (20, 10, 0), 'scores': (2, 1.5, 1, 0),
+     'labels': ('Strong Follower Growth', 'Moderate Follower Growth', 'Slow Follower Growth', 'Declining Followers'),
+     'notes': ('Excellent growth trajectory', 'Positive growth', 'Needs improvement', 'Critical issue')},
+    {'factor': 'stream_volume', 'metric': 'total_streams_1yr', 'inclusive': False,
+     'thresholds': (500000, 200000, 100000), 'scores': (2, 1.5, 1, 0.5),
+     'labels': ('High Stream Volume', 'Moderate Stream Volume', 'Low Stream Volume', 'Very Low Stream Volume'),
+     'notes': ('Strong performance', 'Good performance', 'Needs growth', 'Critical issue')},
+    {'factor': 'engagement', 'metric': 'engagement_rate', 'inclusive': False,
+     'thresholds': (2, 1, 0.5), 'scores': (2, 1.5, 1, 0.5),
+     'labels': ('High Engagement', 'Moderate Engagement', 'Low Engagement', 'Very Low Engagement'),
+     'notes': ('Strong fan base', 'Room for improvement', 'Needs focus', 'Critical issue')},
+    {'factor': 'revenue', 'metric': 'total_earnings', 'inclusive': False,
+     'thresholds': (2000, 1000, 500), 'scores': (2, 1.5, 1, 0.5),
+     'labels': ('Strong Revenue', 'Moderate Revenue', 'Low Revenue', 'Very Low Revenue'),
+     'notes': ('Monetization working', 'Growing monetization', 'Needs improvement', 'Critical issue')},
+    {'factor': 'content_velocity', 'metric': 'songs_per_year', 'inclusive': True,
+     'thresholds': (12, 6, 3), 'scores': (2, 1.5, 1, 0.5),
+     'labels': ('High Content Velocity', 'Moderate Content Velocity', 'Low Content Velocity',
+                'Very Low Content Velocity'),
+     'notes': ('Excellent consistency', 'Good consistency', 'Needs more releases', 'Critical issue')},
+)
+
+MAX_SCORE = 10
+
+# Verdict tiers, best first: a score percentage at or above a cutoff earns that tier
+TIER_CUTOFFS = (70, 50, 30)
+TIERS = (
+    ("STRONG UPCOMING ARTIST",
+     "{artist} demonstrates strong indicators of an upcoming artist with solid growth potential. The artist shows consistent content creation, growing audience, and monetization success."),
+    ("PROMISING UPCOMING ARTIST",
+     "{artist} shows promise as an upcoming artist with several positive indicators. However, there are areas that need attention to accelerate growth."),
+    ("EMERGING ARTIST",
+     "{artist} is an emerging artist with potential, but requires strategic focus on key growth areas to reach upcoming artist status."),
+    ("EARLY STAGE ARTIST",
+     "{artist} is in early stages of development. Significant strategic improvements are needed across multiple areas."),
+)
+
+METRICS = tuple(rule['metric'] for rule in FACTORS)
+
+
+def _descending(values, what):
+    values = np.asarray(values, dtype=float)
+    if values.shape != (3,) or not (np.diff(values) < 0).all():
+        raise ValueError(f"{what} must be three strictly descending values, got {values.tolist()}")
+    return values
+
+
+def scenario_rules(scenarios=None):
+    """Scenario names, (S, F, 3) factor thresholds and (S, 3) tier cutoffs.
+
+    A scenario is a dict mapping factor names to replacement thresholds and optionally 'tiers' to
+    replacement cutoffs (and 'name' to its label); rules it leaves out keep their defaults.
+    None is the single default scenario.
+    """
+    scenarios = [{'name': 'default'}] if scenarios is None else list(scenarios)
+    names = [scenario.get('name', f'scenario_{i}') for i, scenario in enumerate(scenarios)]
+    unknown = {key for scenario in scenarios for key in scenario} - {rule['factor'] for rule in FACTORS} - {'name', 'tiers'}
+    if unknown:
+        raise ValueError(f"Unknown scenario keys {sorted(unknown)}; factors are {', '.join(r['factor'] for r in FACTORS)}")
+    thresholds = np.array([[_descending(scenario.get(rule['factor'], rule['thresholds']), rule['factor'])
+                            for rule in FACTORS] for scenario in scenarios]).reshape(len(scenarios), len(FACTORS), 3)
+    cutoffs = np.array([_descending(scenario.get('tiers', TIER_CUTOFFS), 'tiers')
+                        for scenario in scenarios]).reshape(len(scenarios), 3)
+    return names, thresholds, cutoffs
+
+
+def scaled_scenarios(scales):
+    """One scenario per scale factor, with every factor threshold multiplied by it."""
+    return [{'name': f'x{scale:g}', **{rule['factor']: [t * scale for t in rule['thresholds']] for rule in FACTORS}}
+            for scale in scales]
+
+
+class AssessmentGrid:
+    """Factor levels, scores and verdict tiers for every (artist, scenario) cell.
+
+    `levels[a, s, f]` is the index of the band factor f falls in (0 = best), `score` and `pct` the totals
+    and `tiers[a, s]` the index into TIERS.
+    """
+
+    def __init__(self, artists, scenarios, levels, cutoffs):
+        self.artists = list(artists)
+        self.scenarios = list(scenarios)
+        self.levels = levels
+        self.score = np.zeros(levels.shape[:2])
+        for f, rule in enumerate(FACTORS):
+            self.score += np.asarray(rule['scores'], dtype=float)[levels[:, :, f]]
+        self.pct = (self.score / MAX_SCORE) * 100
+        # Cutoffs descend, so the number of cutoffs a cell falls short of is its tier
+        self.tiers = (self.pct[:, :, None] < cutoffs[None, :, :]).sum(axis=2, dtype=np.int8)
+
+    @property
+    def shape(self):
+        return self.score.shape
+
+    def factor_scores(self):
+        """(artists, scenarios, factors) score of every factor."""
+        return np.stack([np.asarray(rule['scores'], dtype=float)[self.levels[:, :, f]]
+                         for f, rule in enumerate(FACTORS)], axis=2)
+
+    def factors(self, artist=0, scenario=0):
+        """(label, score, note) of each factor for one cell, as PART 10 prints them."""
+        cell = self.levels[artist, scenario]
+        return [(rule['labels'][level], rule['scores'][level], rule['notes'][level]) for rule, level in zip(FACTORS, cell)]
+
+    def verdict(self, artist=0, scenario=0, name=None):
+        """(verdict, description) of one cell; `name` fills the description (default: the artist label)."""
+        verdict, description = TIERS[self.tiers[artist, scenario]]
+        return verdict, description.format(artist=self.artists[artist] if name is None else name)
+
+    def to_frame(self):
+        """One row per cell: artist, scenario, each factor's score, score, pct and verdict."""
+        artists, scenarios = np.meshgrid(np.arange(len(self.artists)), np.arange(len(self.scenarios)), indexing='ij')
+        frame = pd.DataFrame({'artist': np.asarray(self.artists, dtype=object)[artists.ravel()],
+                              'scenario': np.asarray(self.scenarios, dtype=object)[scenarios.ravel()]})
+        for rule, scores in zip(FACTORS, np.moveaxis(self.factor_scores(), 2, 0)):
+            frame[rule['factor']] = scores.ravel()
+        frame['score'] = self.score.ravel()
+        frame['pct'] = self.pct.ravel()
+        frame['verdict'] = pd.Categorical.from_codes(self.tiers.ravel(), categories=[tier for tier, _ in TIERS])
+        return frame
+
+    def tier_counts(self):
+        """Artists per verdict tier under each scenario."""
+        counts = np.stack([(self.tiers == tier).sum(axis=0) for tier in range(len(TIERS))], axis=1)
+        return pd.DataFrame(counts, index=pd.Index(self.scenarios, name='scenario'), columns=[t for t, _ in TIERS])
+
+
+def assess(metrics, scenarios=None, artists=None):
+    """Score every artist under every scenario.
+
+    `metrics` maps each factor metric (see METRICS) to one value per artist, e.g. a roster frame.
+    Comparisons broadcast the (artists, 1) values against the (1, scenarios) thresholds one band at a
+    time, so memory stays at a few (artists x scenarios) arrays. Missing metrics fall in the lowest band.
+    """
+    values = {metric: np.atleast_1d(np.asarray(metrics[metric], dtype=float)) for metric in METRICS}
+    count = len(values[METRICS[0]])
+    names, thresholds, cutoffs = scenario_rules(scenarios)
+    levels = np.empty((count, len(names), len(FACTORS)), dtype=np.int8)
+    for f, rule in enumerate(FACTORS):
+        value = values[rule['metric']][:, None]
+        passed = np.zeros((count, len(names)), dtype=np.int8)
+        for band in range(3):
+            threshold = thresholds[None, :, f, band]
+            passed += (value >= threshold) if rule['inclusive'] else (value > threshold)
+        levels[:, :, f] = 3 - passed
+    if artists is None:
+        artists = metrics['artist'] if 'artist' in metrics else range(count)
+    return AssessmentGrid(artists, names, levels, cutoffs)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score a roster under threshold what-if scenarios.")
+    parser.add_argument('roster', help="CSV with an artist column and the metric columns (e.g. roster_summary.csv)")
+    parser.add_argument('--scenarios', default=None, help="JSON list of scenarios (factor -> thresholds, 'tiers', 'name')")
+    parser.add_argument('--scales', default=None, help="Comma-separated threshold scale factors, e.g. 0.5,0.75,1,1.5")
+    parser.add_argument('--output', default='assessment_grid.csv', help="CSV for the per-cell breakdown")
+    args = parser.parse_args()
+
+    roster = pd.read_csv(args.roster)
+    if 'status' in roster:
+        roster = roster[roster['status'] == 'ok']
+    scenarios = None
+    if args.scenarios:
+        with open(args.scenarios) as f:
+            scenarios = json.load(f)
+    if args.scales:
+        scenarios = (scenarios or []) + scaled_scenarios(float(scale) for scale in args.scales.split(','))
+    grid = assess(roster, scenarios)
+    grid.to_frame().to_csv(args.output, index=False)
+    print(f"✓ Scored {len(grid.artists)} artists x {len(grid.scenarios)} scenarios: {args.output}")
+    print(grid.tier_counts().to_string())
@@ -0,0 +1,254 @@
+"""
+Incremental Audience Timeline State
+Running follower/stream state that folds in newly appended timeline days instead of rescanning history
+"""
+
+import bisect
+import hashlib
+import io
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+import quality
+from rollup_cube import RollupCube
+
+METRICS = ('listeners', 'streams', 'followers')
+
+# Bytes before the consumed offset that must be unchanged for the file to count as appended-to
+CHECKPOINT_BYTES = 4096
+
+
+# Sortable text form of the window's dates (second resolution covers hourly timelines)
+DATE_FORMAT = '%Y-%m-%dT%H:%M:%S'
+
+
+def audience_cube(timeline=None):
+    """Daily rollup cube of a timeline: listeners and streams are summed, followers read at the edges."""
+    cube = RollupCube(sums=('listeners', 'streams'), lasts=('followers',))
+    if timeline is not None:
+        cube.extend(timeline)
+    return cube
+
+
+def cube_dir(state_path):
+    """Directory holding the rollup cube arrays of the state saved at `state_path`."""
+    return f'{os.path.splitext(state_path)[0]}.cube'
+
+
+def _checkpoint(data):
+    return hashlib.sha256(data[-CHECKPOINT_BYTES:]).hexdigest()
+
+
+class AudienceState:
+    """Trailing-window view of an audience timeline plus whole-history running counters.
+
+    Holds the window rows (bounded by `window_days`), the last follower count of every month,
+    running listener/stream sums over the window, the running quality profile of the whole history
+    the data quality section reports, and a daily rollup cube of the whole history for arbitrary windows.
+    """
+
+    def __init__(self, window_days=365):
+        self.window_days = window_days
+        self.as_of = None
+        self.window = {'date': [], **{metric: [] for metric in METRICS}}
+        self.window_sums = {'listeners': 0.0, 'streams': 0.0}
+        self.monthly_last_followers = {}
+        self.profile = None
+        self.first_date = None
+        self.last_date = None
+        self.rows = 0
+        self.cube = audience_cube()
+        # Position in the source file up to which rows have been folded in
+        self.source = {'header': None, 'offset': 0, 'checkpoint': None}
+
+    # ------------------------------------------------------------------
+    # Folding
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_frame(cls, audience_df, as_of, window_days=365):
+        """Build the state from a whole timeline frame."""
+        state = cls(window_days)
+        state.fold(audience_df)
+        state.advance(as_of)
+        return state
+
+    def fold(self, new_rows):
+        """Fold appended timeline rows (sorted by date, all later than the current last date)."""
+        self.profile = quality.fold_profile(self.profile, new_rows)
+        if len(new_rows) == 0:
+            return
+        dates = new_rows['date']
+        if self.last_date is not None and dates.iloc[0] <= pd.Timestamp(self.last_date):
+            raise ValueError("Appended audience rows must be later than the rows already folded in")
+
+        iso_dates = dates.dt.strftime(DATE_FORMAT).tolist()
+        self.window['date'].extend(iso_dates)
+        for metric in METRICS:
+            values = new_rows[metric]
+            self.window[metric].extend(values.tolist())
+        for metric in self.window_sums:
+            self.window_sums[metric] += float(np.nansum(new_rows[metric].to_numpy(dtype=float)))
+
+        with_followers = new_rows[new_rows['followers'].notna()]
+        monthly = with_followers.groupby(with_followers['date'].dt.strftime('%Y-%m'))['followers'].last()
+        self.monthly_last_followers.update(zip(monthly.index, monthly.tolist()))
+
+        self.cube.extend(new_rows)
+
+        self.first_date = self.first_date or iso_dates[0]
+        self.last_date = iso_dates[-1]
+        self.rows += len(new_rows)
+
+    def advance(self, as_of):
+        """Move the window to end at `as_of`, evicting rows that fell out of it."""
+        as_of = pd.Timestamp(as_of)
+        if self.as_of is not None and as_of < pd.Timestamp(self.as_of):
+            raise ValueError("The as-of date cannot move backwards; rebuild the state instead")
+        self.as_of = as_of.isoformat()
+
+        start = as_of - pd.Timedelta(days=self.window_days)
+        cut = bisect.bisect_left(self.window['date'], start.ceil('s').strftime(DATE_FORMAT))
+        if cut == 0:
+            return
+        for metric in self.window_sums:
+            self.window_sums[metric] -= float(np.nansum(np.asarray(self.window[metric][:cut], dtype=float)))
+        for column in self.window:
+            del self.window[column][:cut]
+
+    # ------------------------------------------------------------------
+    # Views used by PART 4 and the data quality section
+    # ------------------------------------------------------------------
+
+    def window_frame(self):
+        """The trailing-window rows as a timeline frame."""
+        frame = pd.DataFrame({metric: self.window[metric] for metric in METRICS})
+        frame.insert(0, 'date', pd.to_datetime(pd.Series(self.window['date'], dtype=object)))
+        return frame
+
+    def monthly_followers(self):
+        """Last follower count of every month touched by the window."""
+        if not self.window['date']:
+            return pd.Series(dtype=float, name='followers', index=pd.PeriodIndex([], freq='M', name='year_month'))
+        first_month = self.window['date'][0][:7]
+        months = sorted(month for month in self.monthly_last_followers if month >= first_month)
+        return pd.Series([self.monthly_last_followers[month] for month in months], name='followers',
+                         index=pd.PeriodIndex(months, freq='M', name='year_month'))
+
+    def history_profile(self):
+        """Quality profile of the whole timeline, with the dates after the as-of date and the rows of
+        the trailing window counted."""
+        # Rows after the as-of date are never evicted, so the window holds all of them
+        through = bisect.bisect_right(self.window['date'], pd.Timestamp(self.as_of).strftime(DATE_FORMAT))
+        return history_profile(self.profile, len(self.window['date']) - through, through, self.as_of,
+                               self.window_days)
+
+    @property
+    def date_range(self):
+        return (pd.Timestamp(self.first_date) if self.first_date else pd.NaT,
+                pd.Timestamp(self.last_date) if self.last_date else pd.NaT)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def to_dict(self, cube_dir=None):
+        return {**vars(self), 'cube': self.cube.to_dict(cube_dir)}
+
+    @classmethod
+    def from_dict(cls, data, cube_dir=None):
+        state = cls(data['window_days'])
+        vars(state).update(data)
+        # States saved before the cube was kept have none; update_state rebuilds them
+        state.cube = RollupCube.from_dict(data['cube'], cube_dir) if 'cube' in data else None
+        return state
+
+    def save(self, path):
+        """Write the state to `path`; the cube's arrays are appended to files next to it, so a refresh
+        writes only the days it folded in. The JSON file is the commit point."""
+        staging = f'{path}.{os.getpid()}.tmp'
+        with open(staging, 'w') as f:
+            json.dump(self.to_dict(cube_dir(path)), f)
+        os.replace(staging, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f), cube_dir(path))
+
+
+def history_profile(profile, after_as_of, window_rows, as_of, window_days):
+    """A timeline's running quality profile completed for one as-of date."""
+    profile = {**(profile or {'rows': 0, 'columns': {}}), 'window_rows': window_rows, 'window_days': window_days,
+               'as_of': pd.Timestamp(as_of).strftime('%Y-%m-%d')}
+    if 'date' in profile['columns']:
+        profile['columns'] = {**profile['columns'], 'date': {**profile['columns']['date'], 'out_of_range': after_as_of}}
+    return profile
+
+
+def read_complete_lines(path, offset=0):
+    """Bytes of `path` from `offset` through its last newline.
+
+    Only whole lines are consumed; a row still being written is picked up next time.
+    """
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        data = f.read()
+    return data[:data.rfind(b'\n') + 1]
+
+
+def track_source(data):
+    """Source record for CSV bytes consumed from the start of a file."""
+    return {'header': data[:data.find(b'\n') + 1].decode(), 'offset': len(data), 'checkpoint': _checkpoint(data)}
+
+
+def read_appended(csv_path, source):
+    """CSV text (header included) of the rows appended since `source` was recorded, advancing `source`.
+
+    Returns None when the file was rewritten rather than appended to, and b'' when nothing was appended.
+    """
+    if os.path.getsize(csv_path) < source['offset']:
+        return None
+    start = max(0, source['offset'] - CHECKPOINT_BYTES)
+    with open(csv_path, 'rb') as f:
+        f.seek(start)
+        prefix = f.read(source['offset'] - start)
+    if _checkpoint(prefix) != source['checkpoint']:
+        return None
+
+    appended = read_complete_lines(csv_path, source['offset'])
+    if not appended:
+        return b''
+    source['offset'] += len(appended)
+    source['checkpoint'] = _checkpoint(prefix + appended)
+    return source['header'].encode() + appended
+
+
+def update_state(csv_path, state_path, as_of, parser, window_days=365):
+    """Bring the persisted state for `csv_path` up to date and return it.
+
+    Only the bytes appended since the last update are parsed. The state is rebuilt from the full file
+    when none exists yet, the file was rewritten rather than appended to, or `as_of` moved backwards.
+    """
+    state = AudienceState.load(state_path) if os.path.exists(state_path) else None
+    as_of = pd.Timestamp(as_of)
+
+    # States saved before the cube or the quality profile were kept are rebuilt
+    if (state is not None and state.cube is not None and state.profile is not None and state.window_days == window_days
+            and pd.Timestamp(state.as_of) <= as_of):
+        appended = read_appended(csv_path, state.source)
+        if appended is not None:
+            if appended:
+                state.fold(parser(io.BytesIO(appended)))
+            state.advance(as_of)
+            state.save(state_path)
+            return state
+
+    data = read_complete_lines(csv_path)
+    state = AudienceState.from_frame(parser(io.BytesIO(data)), as_of, window_days)
+    state.source = track_source(data)
+    state.save(state_path)
+    return state
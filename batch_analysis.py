@@ -0,0 +1,181 @@
+"""
+Roster Batch Analysis
+Runs the per-artist business analysis for many artist catalogs across a process pool
+"""
+
+import os
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+import argparse
+import contextlib
+import csv
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+
+import dashboard
+import downsample
+import forecast
+import instrumentation
+import quality
+from worker_pool import pool_context
+
+# Modules every worker needs; the forkserver imports them once and forks warm workers from it
+WARM_MODULES = ['big_nose_analysis']
+
+# Also preloaded when the workers draw the dashboard; --no-plots runs never import them
+PLOT_MODULES = ['matplotlib.pyplot', 'seaborn']
+
+SUMMARY_FILE = 'roster_summary.csv'
+
+
+def read_manifest(manifest_path):
+    """Read a manifest CSV with `artist` and `data_dir` columns (optional `output_dir`)."""
+    with open(manifest_path, newline='', encoding='utf-8-sig') as f:
+        rows = [row for row in csv.DictReader(f) if row.get('artist')]
+    for row in rows:
+        if not row.get('data_dir'):
+            raise ValueError(f"Manifest row for {row['artist']!r} has no data_dir")
+    return rows
+
+
+def artist_output_dir(output_root, artist):
+    """Per-artist output directory under the roster output root."""
+    safe_name = ''.join(c if c.isalnum() or c in '-_' else '_' for c in artist.strip())
+    return os.path.join(output_root, safe_name)
+
+
+def assign_output_dirs(entries, output_root):
+    """One distinct output directory per manifest entry, in manifest order.
+
+    Names that map to the same directory ("A/B", "A B" and "A_B"; compared case-insensitively) get a
+    -2, -3, ... suffix after the first. Two entries naming the same explicit `output_dir` are an error.
+    """
+    def key(path):
+        return os.path.normcase(os.path.abspath(path)).casefold()
+
+    explicit = {}
+    for entry in entries:
+        if entry.get('output_dir'):
+            other = explicit.setdefault(key(entry['output_dir']), entry['artist'])
+            if other != entry['artist']:
+                raise ValueError(f"Manifest rows for {other!r} and {entry['artist']!r} share output_dir "
+                                 f"{entry['output_dir']!r}")
+    taken = set(explicit)
+    output_dirs = []
+    for entry in entries:
+        if entry.get('output_dir'):
+            output_dirs.append(entry['output_dir'])
+            continue
+        base = output_dir = artist_output_dir(output_root, entry['artist'])
+        suffix = 1
+        while key(output_dir) in taken:
+            suffix += 1
+            output_dir = f'{base}-{suffix}'
+        taken.add(key(output_dir))
+        output_dirs.append(output_dir)
+    return output_dirs
+
+
+def _analyze_artist(artist, data_dir, output_dir, options):
+    # Runs inside a worker; the analysis module is already imported by the forkserver
+    import big_nose_analysis
+
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, 'run_log.txt'), 'w') as log:
+        with contextlib.redirect_stdout(log):
+            try:
+                summary = big_nose_analysis.run_analysis(data_dir=data_dir, output_dir=output_dir, artist=artist,
+                                                         **options)
+            except Exception as exc:
+                traceback.print_exc(file=log)
+                return {'artist': artist, 'status': 'failed', 'error': f'{type(exc).__name__}: {exc}',
+                        'output_dir': output_dir}
+    summary.update({'status': 'ok', 'error': '', 'output_dir': output_dir})
+    return summary
+
+
+def run_batch(manifest_path, output_root, workers=None, **options):
+    """Analyze every artist in the manifest and write a roster-level summary table.
+
+    Extra keyword options (cache_dir, warehouse_path, as_of, memo_dir, state_dir, store_dir, metrics, plots,
+    figures, quality_gate, royalty_rollup, forecast_paths, load_workers) are passed to run_analysis for
+    every artist. Figures render and forecasts simulate inline in
+    each worker, since the pool already spreads artists across the cores.
+    """
+    entries = read_manifest(manifest_path)
+    os.makedirs(output_root, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    options.setdefault('plot_workers', 1)
+    options.setdefault('forecast_workers', 1)
+
+    preload = WARM_MODULES + (PLOT_MODULES if options.get('plots', True) else [])
+
+    print(f"Analyzing {len(entries)} artists with {workers} workers...")
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, mp_context=pool_context(preload)) as pool:
+        futures = {
+            pool.submit(_analyze_artist, entry['artist'], entry['data_dir'], output_dir, options): (entry['artist'], output_dir)
+            for entry, output_dir in zip(entries, assign_output_dirs(entries, output_root))
+        }
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except BrokenProcessPool as exc:
+                # A worker died (killed, out of memory, crashed in native code); the artists it and the
+                # rest of the broken pool still held fail instead of aborting the roster
+                artist, output_dir = futures[future]
+                result = {'artist': artist, 'status': 'failed', 'error': f'{type(exc).__name__}: {exc}',
+                          'output_dir': output_dir}
+            mark = '✓' if result['status'] == 'ok' else '✗'
+            print(f"{mark} {result['artist']}" + (f" ({result['error']})" if result['error'] else ''))
+            results.append(result)
+
+    summary_df = pd.DataFrame(results).sort_values('artist').reset_index(drop=True)
+    summary_path = os.path.join(output_root, SUMMARY_FILE)
+    summary_df.to_csv(summary_path, index=False)
+
+    failed = (summary_df['status'] != 'ok').sum()
+    print(f"\n✓ Saved roster summary: {summary_path} ({len(summary_df) - failed} ok, {failed} failed)")
+    return summary_df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the artist analysis for every catalog in a manifest.")
+    parser.add_argument('manifest', help="CSV with artist,data_dir[,output_dir] columns")
+    parser.add_argument('output_root', help="Directory for per-artist outputs and the roster summary")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--cache-dir', default=None, help="Shared ingest cache for cleaned input frames")
+    parser.add_argument('--as-of', default=None, help="Analysis date (YYYY-MM-DD) shared by every artist")
+    parser.add_argument('--warehouse', default=None, help="Shared SQLite warehouse the inputs are read from")
+    parser.add_argument('--memo-dir', default=None, help="Shared stage memo directory for selective recompute")
+    parser.add_argument('--state-dir', default=None, help="Incremental audience timeline state for every artist")
+    parser.add_argument('--store-dir', default=None, help="Memory-mapped audience time-series stores, one per artist")
+    parser.add_argument('--metrics', choices=sorted(instrumentation.FORMATS), default=None,
+                        help="Write per-stage metrics into every artist's output directory")
+    parser.add_argument('--no-plots', action='store_true', help="Skip the dashboard figure for every artist")
+    parser.add_argument('--figure-format', default='png', help="Dashboard image format (png, svg, pdf, jpg, ...)")
+    parser.add_argument('--dpi', type=dashboard.parse_dpi, default=300, help="Dashboard resolution for raster formats")
+    parser.add_argument('--panels', default=None, help="Comma-separated dashboard panels to draw (default: all)")
+    parser.add_argument('--separate-panels', action='store_true', help="Also write each panel as its own image")
+    parser.add_argument('--no-composite', action='store_true', help="Skip the composite dashboard image")
+    parser.add_argument('--downsample', choices=downsample.METHODS + ('none',), default='minmax',
+                        help="How the follower and stream charts reduce the timeline to the panel's pixel width")
+    parser.add_argument('--quality-gate', choices=quality.GATE_LEVELS, default='errors',
+                        help="Fail an artist on input errors (default), on warnings too, or never")
+    parser.add_argument('--royalty-rollup', action='store_true',
+                        help="Also keep per song, month and territory totals of the royalty statements")
+    parser.add_argument('--forecast-paths', type=int, default=forecast.DEFAULT_PATHS,
+                        help="Monte Carlo trajectories for each artist's forecast (0 skips it)")
+    parser.add_argument('--load-workers', type=int, default=None,
+                        help="Threads reading each artist's input files (default: one per file)")
+    args = parser.parse_args()
+    figures = {'format': args.figure_format, 'dpi': args.dpi, 'separate': args.separate_panels,
+               'composite': not args.no_composite, 'panels': args.panels.split(',') if args.panels else None,
+               'downsample': None if args.downsample == 'none' else args.downsample}
+    run_batch(args.manifest, args.output_root, workers=args.workers, cache_dir=args.cache_dir, as_of=args.as_of,
+              memo_dir=args.memo_dir, state_dir=args.state_dir, store_dir=args.store_dir, warehouse_path=args.warehouse,
+              metrics=args.metrics, plots=not args.no_plots, figures=figures, quality_gate=args.quality_gate,
+              royalty_rollup=args.royalty_rollup, forecast_paths=args.forecast_paths, load_workers=args.load_workers)
@@ -0,0 +1,201 @@
+"""
+Pipeline Scaling Benchmark
+Times and memory-profiles every input loader and analysis stage on synthetic data at several scales
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import big_nose_analysis as analysis
+import ingest_cache
+import royalty_statements
+from compact_frames import footprint
+from instrumentation import output_rows
+import synthetic_data
+
+# name: (songs, audience days, playlists)
+SCALES = {
+    'sample': (130, 1090, 100),
+    'medium': (100_000, 5 * 365, 10_000),
+    'large': (1_000_000, 10 * 365, 100_000),
+}
+
+AS_OF = '2025-12-23'
+SEED = 0
+
+
+# Timings below this many seconds are treated as noise when comparing against a baseline
+NOISE_SECONDS = 0.01
+
+
+def _measure(func, repeat):
+    """Best wall time over `repeat` calls, then one traced call for the peak Python allocation."""
+    seconds = []
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = func()
+            seconds.append(time.perf_counter() - start)
+        tracemalloc.start()
+        try:
+            func()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result, {'seconds': min(seconds), 'peak_mb': round(peak / 2**20, 3)}
+
+
+def dataset(data_root, scale, dims):
+    """Generate (or reuse) the synthetic dataset for one scale and return its data directory."""
+    songs, days, playlists = dims
+    data_dir = os.path.join(data_root, f'{scale}-{songs}-{days}-{playlists}-seed{SEED}')
+    marker = os.path.join(data_dir, '.complete')
+    expected = [os.path.join(data_dir, path.format(artist=synthetic_data.DEFAULT_ARTIST))
+                for path in analysis.INPUT_FILES.values()]
+    # Regenerate when the generator has since learned to write more inputs
+    if not (os.path.exists(marker) and all(os.path.exists(path) for path in expected)):
+        synthetic_data.generate(data_dir, songs=songs, days=days, playlists=playlists, seed=SEED, end_date=AS_OF)
+        open(marker, 'w').close()
+    return data_dir
+
+
+def bench_scale(scale, dims, data_root, repeat=1, skip=()):
+    """Benchmark the loaders and every planned stage for one scale."""
+    data_dir = dataset(data_root, scale, dims)
+    work_dir = tempfile.mkdtemp(prefix=f'bench-{scale}-')
+    try:
+        params = analysis.analysis_params(data_dir, os.path.join(work_dir, 'output'), synthetic_data.DEFAULT_ARTIST,
+                                          as_of=AS_OF)
+        os.makedirs(params['output_dir'])
+
+        loaders = {}
+        for name, parser in analysis.INPUT_PARSERS.items():
+            path = params[name]
+            frame, loaders[name] = _measure(lambda: parser(path), repeat)
+            loaders[name].update(rows=len(frame), bytes=os.path.getsize(path), frame_mb=round(footprint(frame) / 2**20, 3))
+            # A warm ingest-cache hit: the entry is written by the first call
+            cache_dir = os.path.join(work_dir, 'ingest_cache')
+            ingest_cache.load_frame(path, parser, cache_dir)
+            _, loaders[f'{name} (cache hit)'] = _measure(lambda: ingest_cache.load_frame(path, parser, cache_dir),
+                                                         repeat)
+        # The line-item statements are reduced in chunks rather than parsed into one frame
+        path = params['royalty_statements_path']
+        if os.path.exists(path):
+            for rollup in (False, True):
+                name = 'royalty_statements_path' + (' (rollup)' if rollup else '')
+                ledger, loaders[name] = _measure(lambda: royalty_statements.aggregate_statements(path, rollup), repeat)
+                frames = [ledger.songs(), ledger.rollup_frame()] if rollup else [ledger.songs()]
+                loaders[name].update(rows=ledger.line_items, bytes=os.path.getsize(path),
+                                     frame_mb=round(sum(footprint(frame) for frame in frames) / 2**20, 3))
+
+        stages = {}
+        values = dict(params)
+        for stage in analysis.STAGES.plan(params, skip=skip):
+            inputs = {name: values[name] for name in stage.inputs}
+            outputs, stages[stage.name] = _measure(lambda: stage.func(**inputs) or {}, repeat)
+            values.update(outputs)
+            rows = {name: output_rows(value) for name, value in outputs.items() if output_rows(value) is not None}
+            if rows:
+                stages[stage.name]['rows'] = rows
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    total = sum(result['seconds'] for result in stages.values())
+    return {'songs': dims[0], 'days': dims[1], 'playlists': dims[2], 'total_seconds': total,
+            'loaders': loaders, 'stages': stages}
+
+
+def environment():
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'as_of': AS_OF,
+        'seed': SEED,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Loaders and stages that got slower or allocate more than `tolerance` over the baseline."""
+    regressions = []
+    for scale, result in results['scales'].items():
+        old_scale = baseline.get('scales', {}).get(scale)
+        if not old_scale:
+            continue
+        for section in ('loaders', 'stages'):
+            for name, new in result[section].items():
+                old = old_scale[section].get(name)
+                if not old:
+                    continue
+                if new['seconds'] > old['seconds'] * (1 + tolerance) and new['seconds'] - old['seconds'] > NOISE_SECONDS:
+                    regressions.append(f"{scale} {name}: {old['seconds']:.4f}s -> {new['seconds']:.4f}s")
+                if new['peak_mb'] > old['peak_mb'] * (1 + tolerance) and new['peak_mb'] - old['peak_mb'] > 1:
+                    regressions.append(f"{scale} {name}: {old['peak_mb']:.1f} MB -> {new['peak_mb']:.1f} MB")
+    return regressions
+
+
+def parse_scale(text):
+    """`name` of a preset or `name=songs,days,playlists`."""
+    if '=' not in text:
+        if text not in SCALES:
+            raise argparse.ArgumentTypeError(f"Unknown scale {text!r}; presets are {', '.join(SCALES)}")
+        return text, SCALES[text]
+    name, dims = text.split('=', 1)
+    try:
+        songs, days, playlists = (int(value) for value in dims.split(','))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected name=songs,days,playlists, got {text!r}")
+    return name, (songs, days, playlists)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the analysis pipeline on synthetic data.")
+    parser.add_argument('--scale', action='append', type=parse_scale,
+                        help=f"Preset ({', '.join(SCALES)}) or name=songs,days,playlists; repeatable (default: sample)")
+    parser.add_argument('--data-root', default=os.path.join(tempfile.gettempdir(), 'big_nose_benchmark'),
+                        help="Where generated datasets are kept and reused between runs")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed calls per loader/stage (best is kept)")
+    parser.add_argument('--skip', action='append', default=[], help="Stage to leave out, e.g. plot_dashboard")
+    parser.add_argument('--output', default='benchmark_results.json', help="JSON file for the results")
+    parser.add_argument('--baseline', default=None, help="Earlier results JSON to check for regressions")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed slowdown/growth over the baseline")
+    args = parser.parse_args()
+
+    results = {'environment': environment(), 'repeat': args.repeat, 'skip': args.skip, 'scales': {}}
+    for name, dims in args.scale or [('sample', SCALES['sample'])]:
+        print(f"Benchmarking {name}: {dims[0]:,} songs, {dims[1]:,} days, {dims[2]:,} playlists")
+        result = bench_scale(name, dims, args.data_root, args.repeat, args.skip)
+        results['scales'][name] = result
+        for section in ('loaders', 'stages'):
+            for stage_name, measured in result[section].items():
+                print(f"  {stage_name:<36} {measured['seconds']:>10.4f}s {measured['peak_mb']:>10.1f} MB")
+        print(f"  {'total (stages)':<36} {result['total_seconds']:>10.4f}s")
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"✓ Saved {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"✓ No regressions over {args.baseline} (tolerance {args.tolerance:.0%})")
@@ -5,593 +5,910 @@ From Raw Data to Business Insights
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
-# Set style for professional visualizations
-plt.style.use('seaborn-v0_8-darkgrid')
-sns.set_palette("husl")
-
 # Configuration
 DATA_DIR = "***"
 OUTPUT_DIR = "***"
+ARTIST = "Big Nose"
 
 import os
-os.makedirs(OUTPUT_DIR, exist_ok=True)
-
-print("="*80)
-print("BIG NOSE ARTIST - COMPREHENSIVE BUSINESS ANALYSIS")
-print("="*80)
-print("\nLoading and processing data...\n")
+import argparse
+import ingest_cache
+import instrumentation
+import assessment
+import audience_state
+import csv
+import compact_frames
+import concentration
+import dashboard
+import decay_curves
+import downsample
+import forecast
+import playlist_attribution
+import quality
+import royalty_statements
+import song_potential
+from song_catalog import SongCatalog
+from ranking import RankingIndex
+from rollup_cube import RollupCube
+import timeseries_store
+import warehouse
+from pipeline import StageGraph
+
+# Input exports per artist, relative to the artist's data directory
+INPUT_FILES = {
+    'earnings_path': 'Earnings_Per_Songs/{artist}-earnings-per-song.csv',
+    'songs_1year_path': 'Spotify_Analysis/{artist}-songs-1year.csv',
+    'audience_path': 'Spotify_Analysis/{artist}-audience-timeline.csv',
+    'playlists_path': 'Spotify_Analysis/{artist}-playlists-1year.csv',
+    'songs_all_path': 'Earnings_Per_Songs/{artist}-songs-all.csv',
+    # Optional: the distributor's per-title totals, keyed by `Title`
+    'earnings_summary_path': 'Earnings_Per_Songs/{artist}-earnings-per-songs.csv',
+    # Optional: the distributor's line-item statements (song x store x territory x month); when present
+    # their totals replace the per-song export's amounts
+    'royalty_statements_path': 'Earnings_Per_Songs/{artist}-royalty-statements.csv',
+}
+
+# Each PART below is a stage: its parameters name the values it reads, `outputs` the values it produces
+STAGES = StageGraph()
 
 # ============================================================================
-# PART 1: DATA LOADING & CLEANING
+# INPUT PARSERS (read + type cleaning; results are cacheable by content hash)
 # ============================================================================
 
-# Load earnings per song data
-earnings_df = pd.read_csv(f"{DATA_DIR}/Earnings_Per_Songs/Big Nose-earnings-per-song.csv")
-print(f"✓ Loaded earnings data: {len(earnings_df)} songs")
+def parse_earnings(path, compact=True):
+    """Parse the per-song earnings export with typed dates and amounts."""
+    df = pd.read_csv(path)
+    df['release_date'] = pd.to_datetime(df['release_date'], errors='coerce')
+    df['Amount'] = df['Amount'].astype(str).str.replace('$', '').str.replace(',', '').astype(float)
+    df['listeners'] = pd.to_numeric(df['listeners'], errors='coerce')
+    df['streams'] = pd.to_numeric(df['streams'], errors='coerce')
+    df['saves'] = pd.to_numeric(df['saves'], errors='coerce')
+    return compact_frames.compact(df) if compact else df
+
+
+def parse_audience(path):
+    """Parse the daily audience timeline."""
+    df = pd.read_csv(path)
+    df['date'] = pd.to_datetime(df['date'])
+    return df
+
+
+def _split_title_artist(fields):
+    # The export writes neither field quoted: commas inside a title keep their following space
+    # ("Fine, I'll Wait"), while artist credits are joined by a bare comma ("Groovetide,Big Nose")
+    split = 1
+    while split < len(fields) - 1 and fields[split].startswith(' '):
+        split += 1
+    return [','.join(fields[:split]), ', '.join(fields[split:])]
+
+
+def parse_earnings_summary(path, compact=True):
+    """Parse the per-title earnings summary; unquoted commas are folded back into `Title` or `Artist`."""
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        rows = list(csv.reader(f))
+    header, rows = rows[0], [row for row in rows[1:] if row]
+    trailing = len(header) - 2  # Title and Artist lead, Type/Amount/Notes trail
+    records = [_split_title_artist(row[:len(row) - trailing]) + row[len(row) - trailing:] for row in rows]
+    df = pd.DataFrame(records, columns=header)
+    df['Amount'] = df['Amount'].str.replace('$', '').str.replace(',', '').astype(float)
+    return compact_frames.compact(df) if compact else df
+
+
+def parse_plain(path, compact=True):
+    """Parse an export that needs no cleaning beyond the compact schema."""
+    df = pd.read_csv(path)
+    return compact_frames.compact(df) if compact else df
+
+
+INPUT_PARSERS = {
+    'earnings_path': parse_earnings,
+    'songs_1year_path': parse_plain,
+    'audience_path': parse_audience,
+    'playlists_path': parse_plain,
+    'songs_all_path': parse_plain,
+    'earnings_summary_path': parse_earnings_summary,
+}
+
+
+def load_input(path, parser, cache_dir=None, warehouse_path=None, artist=None, table=None):
+    """Parse an input file, going through the warehouse or the ingest cache when one is configured.
+
+    With a warehouse, the artist's rows of `table` are read from it while the file is unchanged.
+    """
+    if warehouse_path:
+        return warehouse.Warehouse(warehouse_path).load(artist, table, path, parser)
+    if cache_dir:
+        return ingest_cache.load_frame(path, parser, cache_dir)
+    return parser(path)
 
-# Load songs 1 year performance data
-songs_1year_df = pd.read_csv(f"{DATA_DIR}/Spotify_Analysis/Big Nose-songs-1year.csv")
-print(f"✓ Loaded 1-year songs data: {len(songs_1year_df)} songs")
 
-# Load audience timeline data
-audience_df = pd.read_csv(f"{DATA_DIR}/Spotify_Analysis/Big Nose-audience-timeline.csv")
-audience_df['date'] = pd.to_datetime(audience_df['date'])
-print(f"✓ Loaded audience timeline: {len(audience_df)} days")
+# ============================================================================
+# PART 1: DATA LOADING & CLEANING
+# ============================================================================
 
-# Load playlists data
-playlists_df = pd.read_csv(f"{DATA_DIR}/Spotify_Analysis/Big Nose-playlists-1year.csv")
-print(f"✓ Loaded playlists data: {len(playlists_df)} playlists")
+# The loaders only read run parameters, so they start together on a thread pool (`load_workers`) and
+# each frame is handed on as soon as it is parsed
+
+@STAGES.stage(outputs=('earnings_raw',), concurrent=True)
+def load_earnings(earnings_path, royalty_statements_path, cache_dir, warehouse_path, artist):
+    # The per-song export may be left out when line-item royalty statements are delivered instead
+    if not os.path.exists(earnings_path) and os.path.exists(royalty_statements_path):
+        return {'earnings_raw': None}
+    # Load earnings per song data
+    earnings_raw = load_input(earnings_path, parse_earnings, cache_dir, warehouse_path, artist, 'earnings')
+    print(f"✓ Loaded earnings data: {len(earnings_raw)} songs")
+    return {'earnings_raw': earnings_raw}
+
+
+@STAGES.stage(outputs=('songs_1year_df', 'songs_1year_rank'), concurrent=True)
+def load_songs_1year(songs_1year_path, cache_dir, warehouse_path, artist):
+    # Load songs 1 year performance data
+    songs_1year_df = load_input(songs_1year_path, parse_plain, cache_dir, warehouse_path, artist, 'songs_1year')
+    print(f"✓ Loaded 1-year songs data: {len(songs_1year_df)} songs")
+    return {'songs_1year_df': songs_1year_df, 'songs_1year_rank': RankingIndex(songs_1year_df)}
+
+
+@STAGES.stage(outputs=('audience_window',), concurrent=True)
+def load_audience(audience_path, audience_state_path, audience_store_dir, cache_dir, warehouse_path, artist, as_of):
+    # Load audience timeline data into a trailing-window view; with a state file or a time-series store
+    # only newly appended days are parsed
+    if audience_store_dir:
+        store = timeseries_store.TimeSeriesStore(audience_store_dir)
+        store.sync_from_csv(audience_path, parse_audience)
+        audience_window = timeseries_store.StoreWindow(store, as_of)
+    elif audience_state_path:
+        audience_window = audience_state.update_state(audience_path, audience_state_path, as_of, parse_audience)
+    else:
+        audience_window = audience_state.AudienceState.from_frame(
+            load_input(audience_path, parse_audience, cache_dir, warehouse_path, artist, 'audience'), as_of)
+    print(f"✓ Loaded audience timeline: {audience_window.rows} days")
+    return {'audience_window': audience_window}
+
+
+@STAGES.stage(outputs=('playlists_df',), concurrent=True)
+def load_playlists(playlists_path, cache_dir, warehouse_path, artist):
+    # Load playlists data
+    playlists_df = load_input(playlists_path, parse_plain, cache_dir, warehouse_path, artist, 'playlists')
+    print(f"✓ Loaded playlists data: {len(playlists_df)} playlists")
+    return {'playlists_df': playlists_df}
+
+
+@STAGES.stage(outputs=('songs_all_df',), concurrent=True)
+def load_songs_all(songs_all_path, cache_dir, warehouse_path, artist):
+    # Load all songs data
+    songs_all_df = load_input(songs_all_path, parse_plain, cache_dir, warehouse_path, artist, 'songs_all')
+    print(f"✓ Loaded all songs data: {len(songs_all_df)} songs")
+    return {'songs_all_df': songs_all_df}
+
+
+@STAGES.stage(outputs=('earnings_summary_df',), concurrent=True)
+def load_earnings_summary(earnings_summary_path, cache_dir, warehouse_path, artist):
+    # Load the per-title earnings summary when the export is present
+    if not os.path.exists(earnings_summary_path):
+        return {'earnings_summary_df': None}
+    earnings_summary_df = load_input(earnings_summary_path, parse_earnings_summary, cache_dir, warehouse_path, artist,
+                                     'earnings_summary')
+    print(f"✓ Loaded earnings summary: {len(earnings_summary_df)} titles")
+    return {'earnings_summary_df': earnings_summary_df}
+
+
+@STAGES.stage(outputs=('royalty_ledger',), concurrent=True)
+def load_royalty_statements(royalty_statements_path, royalty_rollup):
+    # Reduce the line-item royalty statements chunk by chunk when they are present
+    if not os.path.exists(royalty_statements_path):
+        return {'royalty_ledger': None}
+    royalty_ledger = royalty_statements.aggregate_statements(royalty_statements_path, rollup=royalty_rollup)
+    print(f"✓ Aggregated royalty statements: {royalty_ledger.line_items:,} line items into {royalty_ledger.rows} songs")
+    return {'royalty_ledger': royalty_ledger}
 
-# Load all songs data
-songs_all_df = pd.read_csv(f"{DATA_DIR}/Earnings_Per_Songs/Big Nose-songs-all.csv")
-print(f"✓ Loaded all songs data: {len(songs_all_df)} songs")
 
 # ============================================================================
 # DATA CLEANING & PREPARATION
 # ============================================================================
 
-print("\n" + "="*80)
-print("DATA QUALITY ASSESSMENT")
-print("="*80)
-
-# Clean earnings data
-earnings_df['release_date'] = pd.to_datetime(earnings_df['release_date'], errors='coerce')
-earnings_df['Amount'] = earnings_df['Amount'].astype(str).str.replace('$', '').str.replace(',', '').astype(float)
-earnings_df['listeners'] = pd.to_numeric(earnings_df['listeners'], errors='coerce')
-earnings_df['streams'] = pd.to_numeric(earnings_df['streams'], errors='coerce')
-earnings_df['saves'] = pd.to_numeric(earnings_df['saves'], errors='coerce')
-
-# Filter to Big Nose songs only (exclude collaborations where Big Nose is not primary)
-earnings_df = earnings_df[earnings_df['Artist'].str.contains('Big Nose', na=False)]
+@STAGES.stage(outputs=('earnings_df', 'earnings_rank', 'earnings_cube'))
+def prepare_earnings(earnings_raw, royalty_ledger, songs_all_df, artist, as_of):
+    if royalty_ledger is not None:
+        # Statement totals are the amounts; the per-song export (or the lifetime songs export) adds the metadata
+        metadata = earnings_raw if earnings_raw is not None else songs_all_df.rename(columns={'song': 'Song Title'})
+        earnings_raw = royalty_ledger.earnings_frame(metadata)
+
+    # Filter to the artist's songs only (exclude collaborations where the artist is not primary)
+    earnings_df = earnings_raw[compact_frames.category_contains(earnings_raw['Artist'], artist)].copy()
+
+    # Calculate years since release
+    earnings_df['years_since_release'] = (as_of - earnings_df['release_date']).dt.days / 365.25
+    earnings_df['release_year'] = earnings_df['release_date'].dt.year
+
+    # Release-date rollups of the earnings, so any release window is a prefix-sum difference
+    earnings_cube = RollupCube.from_frame(earnings_df.assign(song_count=earnings_df['Song Title'].notna()),
+                                          'release_date', sums=('Amount', 'song_count', 'streams', 'listeners', 'saves'))
+    return {'earnings_df': earnings_df, 'earnings_rank': RankingIndex(earnings_df), 'earnings_cube': earnings_cube}
+
+
+@STAGES.stage(outputs=('song_catalog',))
+def build_song_catalog(earnings_df, songs_1year_df, songs_all_df, earnings_summary_df, artist):
+    # One integer ID per song across every source; the earnings export is registered first
+    song_catalog = SongCatalog()
+    song_catalog.register('earnings', earnings_df['Song Title'])
+    song_catalog.register('songs_1year', songs_1year_df['song'])
+    song_catalog.register('songs_all', songs_all_df['song'])
+    if earnings_summary_df is not None:
+        own = compact_frames.category_contains(earnings_summary_df['Artist'], artist)
+        song_catalog.register('earnings_summary', earnings_summary_df['Title'].where(own))
+    return {'song_catalog': song_catalog}
+
+
+@STAGES.stage(outputs=('quality_report',))
+def assess_data_quality(earnings_df, audience_window, songs_1year_df, playlists_df, songs_all_df, as_of,
+                        quality_gate):
+    print("\n" + "="*80)
+    print("DATA QUALITY ASSESSMENT")
+    print("="*80)
+
+    # Profile every input once; the printed figures below are read from the profiles
+    quality_report = quality.profile_inputs({
+        'earnings': earnings_df,
+        'songs_1year': songs_1year_df,
+        'audience': audience_window.history_profile(),
+        'playlists': playlists_df,
+        'songs_all': songs_all_df,
+    }, as_of)
+    release_dates = quality_report.column('earnings', 'release_date')
+    amounts = quality_report.column('earnings', 'Amount')
+
+    # Data quality metrics
+    print(f"\n1. Earnings Data Quality:")
+    print(f"   - Total songs: {quality_report['earnings']['rows']}")
+    print(f"   - Missing release dates: {release_dates['nulls']}")
+    print(f"   - Missing amounts: {amounts['nulls']}")
+    print(f"   - Date range: {release_dates.get('min', pd.NaT)} to {release_dates.get('max', pd.NaT)}")
+    print(f"   - Total earnings: ${amounts['sum']:,.2f}")
+
+    print(f"\n2. Audience Timeline Data Quality:")
+    first_date, last_date = audience_window.date_range
+    print(f"   - Date range: {first_date} to {last_date}")
+    for metric in ('listeners', 'streams', 'followers'):
+        print(f"   - Missing {metric}: {quality_report.column('audience', metric)['nulls']}")
+
+    print(f"\n3. Songs 1-Year Data Quality:")
+    print(f"   - Total songs: {quality_report['songs_1year']['rows']}")
+    print(f"   - Total streams (1 year): {quality_report.column('songs_1year', 'streams')['sum']:,}")
+    print(f"   - Total listeners (1 year): {quality_report.column('songs_1year', 'listeners')['sum']:,}")
+    print(f"   - Total saves (1 year): {quality_report.column('songs_1year', 'saves')['sum']:,}")
+
+    print(f"\n4. Quality Gate ({quality_gate}):")
+    print(f"   - Inputs profiled: {len(quality_report.profiles)} "
+          f"({sum(len(p['columns']) for p in quality_report.profiles.values())} columns)")
+    for issue in quality_report.errors:
+        print(f"   - ERROR {issue}")
+    for issue in quality_report.warnings:
+        print(f"   - Warning: {issue}")
+    quality_report.gate(quality_gate)
+    return {'quality_report': quality_report}
 
-# Calculate years since release
-earnings_df['years_since_release'] = (datetime.now() - earnings_df['release_date']).dt.days / 365.25
-earnings_df['release_year'] = earnings_df['release_date'].dt.year
-
-# Data quality metrics
-print(f"\n1. Earnings Data Quality:")
-print(f"   - Total songs: {len(earnings_df)}")
-print(f"   - Missing release dates: {earnings_df['release_date'].isna().sum()}")
-print(f"   - Missing amounts: {earnings_df['Amount'].isna().sum()}")
-print(f"   - Date range: {earnings_df['release_date'].min()} to {earnings_df['release_date'].max()}")
-print(f"   - Total earnings: ${earnings_df['Amount'].sum():,.2f}")
-
-print(f"\n2. Audience Timeline Data Quality:")
-print(f"   - Date range: {audience_df['date'].min()} to {audience_df['date'].max()}")
-print(f"   - Missing listeners: {audience_df['listeners'].isna().sum()}")
-print(f"   - Missing streams: {audience_df['streams'].isna().sum()}")
-print(f"   - Missing followers: {audience_df['followers'].isna().sum()}")
-
-print(f"\n3. Songs 1-Year Data Quality:")
-print(f"   - Total songs: {len(songs_1year_df)}")
-print(f"   - Total streams (1 year): {songs_1year_df['streams'].sum():,}")
-print(f"   - Total listeners (1 year): {songs_1year_df['listeners'].sum():,}")
-print(f"   - Total saves (1 year): {songs_1year_df['saves'].sum():,}")
 
 # ============================================================================
 # PART 2: EXPLORATORY DATA ANALYSIS
 # ============================================================================
 
-print("\n" + "="*80)
-print("EXPLORATORY DATA ANALYSIS")
-print("="*80)
+@STAGES.stage(outputs=('total_earnings', 'avg_earnings_per_song', 'median_earnings_per_song', 'top_songs'))
+def analyze_overview(earnings_df, earnings_rank):
+    print("\n" + "="*80)
+    print("EXPLORATORY DATA ANALYSIS")
+    print("="*80)
+
+    # Calculate key metrics
+    total_earnings = earnings_df['Amount'].sum()
+    avg_earnings_per_song = earnings_df['Amount'].mean()
+    median_earnings_per_song = earnings_df['Amount'].median()
 
-# Calculate key metrics
-total_earnings = earnings_df['Amount'].sum()
-avg_earnings_per_song = earnings_df['Amount'].mean()
-median_earnings_per_song = earnings_df['Amount'].median()
+    print(f"\nKey Financial Metrics:")
+    print(f"   - Total Earnings: ${total_earnings:,.2f}")
+    print(f"   - Average per song: ${avg_earnings_per_song:,.2f}")
+    print(f"   - Median per song: ${median_earnings_per_song:,.2f}")
+    print(f"   - Top 5 songs account for: ${earnings_rank.top_sum('Amount', 5):,.2f} ({earnings_rank.top_sum('Amount', 5)/total_earnings*100:.1f}%)")
 
-print(f"\nKey Financial Metrics:")
-print(f"   - Total Earnings: ${total_earnings:,.2f}")
-print(f"   - Average per song: ${avg_earnings_per_song:,.2f}")
-print(f"   - Median per song: ${median_earnings_per_song:,.2f}")
-print(f"   - Top 5 songs account for: ${earnings_df.nlargest(5, 'Amount')['Amount'].sum():,.2f} ({earnings_df.nlargest(5, 'Amount')['Amount'].sum()/total_earnings*100:.1f}%)")
+    # Top performing songs
+    top_songs = earnings_rank.top('Amount', 10, ['Song Title', 'Amount', 'listeners', 'streams', 'saves', 'release_date'])
+    print(f"\nTop 10 Earning Songs:")
+    for idx, row in top_songs.iterrows():
+        print(f"   {row['Song Title']}: ${row['Amount']:.2f} ({row['streams']:,.0f} streams)")
+
+    return {'total_earnings': total_earnings, 'avg_earnings_per_song': avg_earnings_per_song,
+            'median_earnings_per_song': median_earnings_per_song, 'top_songs': top_songs}
 
-# Top performing songs
-top_songs = earnings_df.nlargest(10, 'Amount')[['Song Title', 'Amount', 'listeners', 'streams', 'saves', 'release_date']]
-print(f"\nTop 10 Earning Songs:")
-for idx, row in top_songs.iterrows():
-    print(f"   {row['Song Title']}: ${row['Amount']:.2f} ({row['streams']:,.0f} streams)")
 
 # ============================================================================
 # PART 3: EARNINGS ANALYSIS (5 YEARS)
 # ============================================================================
 
-print("\n" + "="*80)
-print("EARNINGS ANALYSIS - 5 YEAR TREND")
-print("="*80)
-
-# Filter to last 5 years
-five_years_ago = datetime.now() - timedelta(days=5*365)
-earnings_5yr = earnings_df[earnings_df['release_date'] >= five_years_ago].copy()
-
-# Group by year
-earnings_by_year = earnings_5yr.groupby('release_year').agg({
-    'Amount': 'sum',
-    'Song Title': 'count',
-    'streams': 'sum',
-    'listeners': 'sum',
-    'saves': 'sum'
-}).rename(columns={'Song Title': 'song_count'})
-
-print(f"\nEarnings by Year (Last 5 Years):")
-for year, row in earnings_by_year.iterrows():
-    print(f"   {year}: ${row['Amount']:,.2f} ({row['song_count']} songs, {row['streams']:,.0f} streams)")
+@STAGES.stage(outputs=('earnings_by_year',))
+def analyze_earnings_trend(earnings_cube, as_of):
+    print("\n" + "="*80)
+    print("EARNINGS ANALYSIS - 5 YEAR TREND")
+    print("="*80)
+
+    # Yearly rollups of the songs released in the last 5 years (the first year clipped at the cutoff)
+    five_years_ago = as_of - timedelta(days=5*365)
+    earnings_by_year = earnings_cube.rollup('year', five_years_ago.ceil('D'))
+    earnings_by_year = earnings_by_year[earnings_by_year['song_count'] > 0]
+    earnings_by_year = earnings_by_year[['Amount', 'song_count', 'streams', 'listeners', 'saves']].astype({'song_count': int})
+    earnings_by_year.index = pd.Index(earnings_by_year.index.year, name='release_year')
+
+    print(f"\nEarnings by Year (Last 5 Years):")
+    for year, row in earnings_by_year.iterrows():
+        print(f"   {year}: ${row['Amount']:,.2f} ({row['song_count']:.0f} songs, {row['streams']:,.0f} streams)")
+
+    # Calculate growth rates
+    if len(earnings_by_year) > 1:
+        years = sorted(earnings_by_year.index)
+        for i in range(1, len(years)):
+            prev_earnings = earnings_by_year.loc[years[i-1], 'Amount']
+            curr_earnings = earnings_by_year.loc[years[i], 'Amount']
+            growth = ((curr_earnings - prev_earnings) / prev_earnings * 100) if prev_earnings > 0 else 0
+            print(f"   {years[i-1]} to {years[i]}: {growth:+.1f}% earnings growth")
+
+    return {'earnings_by_year': earnings_by_year}
+
+
+@STAGES.stage(outputs=('concentration_table', 'pareto_curve', 'earnings_gini', 'earnings_hhi'))
+def analyze_concentration(earnings_df, earnings_rank):
+    print("\n" + "="*80)
+    print("REVENUE CONCENTRATION")
+    print("="*80)
+
+    # Pareto, Gini and HHI of earnings and streams for the catalog, each release year and each rolling window,
+    # all read from the ranking's sorted order
+    concentration_table, pareto_curve = concentration.concentration(earnings_df, earnings_rank)
+    overall = concentration_table[concentration_table['scope'] == 'all'].set_index('metric')
+    earnings_gini = overall['gini'].get('Amount', np.nan)
+    earnings_hhi = overall['hhi'].get('Amount', np.nan)
+
+    print(f"\nCatalog concentration:")
+    for metric, row in overall.dropna(subset=['gini']).iterrows():
+        label = 'Earnings' if metric == 'Amount' else metric.capitalize()
+        print(f"   - {label}: top 5 songs {row['top5_share']:.1%}, {row['songs_for_80pct']} of {row['songs']} songs "
+              f"make 80%, Gini {row['gini']:.2f}, HHI {row['hhi']:.3f} ({row['effective_songs']:.1f} effective songs)")
+
+    earnings = concentration_table[(concentration_table['metric'] == 'Amount') & concentration_table['gini'].notna()]
+    print(f"\nEarnings concentration by release year:")
+    for _, row in earnings[earnings['scope'] == 'cohort'].iterrows():
+        print(f"   {row['start_year']}: Gini {row['gini']:.2f}, top 5 songs {row['top5_share']:.1%} ({row['songs']} songs)")
+    rolling = earnings[earnings['scope'] == 'rolling']
+    if len(rolling):
+        print(f"\nRolling {concentration.WINDOW_YEARS}-year release windows (earnings Gini):")
+        for _, row in rolling.iterrows():
+            print(f"   {row['start_year']}-{row['end_year']}: {row['gini']:.2f}")
+
+    return {'concentration_table': concentration_table, 'pareto_curve': pareto_curve,
+            'earnings_gini': earnings_gini, 'earnings_hhi': earnings_hhi}
 
-# Calculate growth rates
-if len(earnings_by_year) > 1:
-    years = sorted(earnings_by_year.index)
-    for i in range(1, len(years)):
-        prev_earnings = earnings_by_year.loc[years[i-1], 'Amount']
-        curr_earnings = earnings_by_year.loc[years[i], 'Amount']
-        growth = ((curr_earnings - prev_earnings) / prev_earnings * 100) if prev_earnings > 0 else 0
-        print(f"   {years[i-1]} to {years[i]}: {growth:+.1f}% earnings growth")
 
 # ============================================================================
 # PART 4: FOLLOWER GROWTH ANALYSIS (LAST YEAR)
 # ============================================================================
 
-print("\n" + "="*80)
-print("FOLLOWER GROWTH ANALYSIS - LAST YEAR")
-print("="*80)
+@STAGES.stage(outputs=('audience_1yr', 'initial_followers', 'final_followers', 'follower_growth',
+                       'follower_growth_pct', 'monthly_followers', 'weekly_audience'))
+def analyze_follower_growth(audience_window, as_of):
+    print("\n" + "="*80)
+    print("FOLLOWER GROWTH ANALYSIS - LAST YEAR")
+    print("="*80)
 
-# Filter to last year
-one_year_ago = datetime.now() - timedelta(days=365)
-audience_1yr = audience_df[audience_df['date'] >= one_year_ago].copy()
+    # Last year of the timeline, kept up to date by load_audience
+    audience_1yr = audience_window.window_frame()
 
-# Calculate follower growth
-initial_followers = audience_1yr['followers'].iloc[0] if len(audience_1yr) > 0 else 0
-final_followers = audience_1yr['followers'].iloc[-1] if len(audience_1yr) > 0 else 0
-follower_growth = final_followers - initial_followers
-follower_growth_pct = (follower_growth / initial_followers * 100) if initial_followers > 0 else 0
+    # Calculate follower growth
+    initial_followers = audience_1yr['followers'].iloc[0] if len(audience_1yr) > 0 else 0
+    final_followers = audience_1yr['followers'].iloc[-1] if len(audience_1yr) > 0 else 0
+    follower_growth = final_followers - initial_followers
+    follower_growth_pct = (follower_growth / initial_followers * 100) if initial_followers > 0 else 0
 
-print(f"\nFollower Growth Metrics:")
-print(f"   - Starting followers (1 year ago): {initial_followers:,}")
-print(f"   - Current followers: {final_followers:,}")
-print(f"   - Net growth: {follower_growth:+,}")
-print(f"   - Growth rate: {follower_growth_pct:+.1f}%")
+    print(f"\nFollower Growth Metrics:")
+    print(f"   - Starting followers (1 year ago): {initial_followers:,}")
+    print(f"   - Current followers: {final_followers:,}")
+    print(f"   - Net growth: {follower_growth:+,}")
+    print(f"   - Growth rate: {follower_growth_pct:+.1f}%")
+
+    # Monthly follower growth
+    audience_1yr['year_month'] = audience_1yr['date'].dt.to_period('M')
+    monthly_followers = audience_window.monthly_followers()
+    print(f"\nMonthly Follower Count:")
+    for month, followers in monthly_followers.items():
+        print(f"   {month}: {followers:,}")
+
+    # Calendar-week rollups of the same year, read from the timeline cube
+    weekly_audience = audience_window.cube.rollup('week', audience_1yr['date'].min(), as_of)
+
+    return {'audience_1yr': audience_1yr, 'initial_followers': initial_followers, 'final_followers': final_followers,
+            'follower_growth': follower_growth, 'follower_growth_pct': follower_growth_pct,
+            'monthly_followers': monthly_followers, 'weekly_audience': weekly_audience}
 
-# Monthly follower growth
-audience_1yr['year_month'] = audience_1yr['date'].dt.to_period('M')
-monthly_followers = audience_1yr.groupby('year_month')['followers'].last()
-print(f"\nMonthly Follower Count:")
-for month, followers in monthly_followers.items():
-    print(f"   {month}: {followers:,}")
 
 # ============================================================================
 # PART 5: PERFORMANCE METRICS (LAST YEAR)
 # ============================================================================
 
-print("\n" + "="*80)
-print("PERFORMANCE METRICS - LAST YEAR")
-print("="*80)
+@STAGES.stage(outputs=('total_streams_1yr', 'total_listeners_1yr', 'total_saves_1yr', 'top_performers_1yr'))
+def analyze_performance(songs_1year_df, songs_1year_rank):
+    print("\n" + "="*80)
+    print("PERFORMANCE METRICS - LAST YEAR")
+    print("="*80)
+
+    # Aggregate metrics from songs 1 year data
+    total_streams_1yr = songs_1year_df['streams'].sum()
+    total_listeners_1yr = songs_1year_df['listeners'].sum()
+    total_saves_1yr = songs_1year_df['saves'].sum()
+
+    print(f"\n1-Year Performance Summary:")
+    print(f"   - Total Streams: {total_streams_1yr:,}")
+    print(f"   - Total Listeners: {total_listeners_1yr:,}")
+    print(f"   - Total Saves: {total_saves_1yr:,}")
+    print(f"   - Average streams per song: {total_streams_1yr / len(songs_1year_df):,.0f}")
+    print(f"   - Save rate: {(total_saves_1yr / total_streams_1yr * 100):.2f}%")
+
+    # Top performing songs in last year
+    top_performers_1yr = songs_1year_rank.top('streams', 10)
+    print(f"\nTop 10 Performing Songs (Last Year):")
+    for idx, row in top_performers_1yr.iterrows():
+        print(f"   {row['song']}: {row['streams']:,} streams, {row['listeners']:,} listeners, {row['saves']} saves")
+
+    return {'total_streams_1yr': total_streams_1yr, 'total_listeners_1yr': total_listeners_1yr,
+            'total_saves_1yr': total_saves_1yr, 'top_performers_1yr': top_performers_1yr}
+
+
+@STAGES.stage(outputs=('song_metrics',))
+def analyze_song_economics(song_catalog, earnings_df, songs_1year_df, songs_all_df):
+    print("\n" + "="*80)
+    print("CROSS-SOURCE SONG METRICS")
+    print("="*80)
+
+    # Per-song columns from each source, aligned on the catalog's song IDs
+    song_metrics = song_catalog.frame()
+    song_metrics['amount'] = song_catalog.aligned('earnings', earnings_df['Amount'])
+    song_metrics['streams_1yr'] = song_catalog.aligned('songs_1year', songs_1year_df['streams'])
+    song_metrics['lifetime_streams'] = song_catalog.aligned('songs_all', songs_all_df['streams'])
+    lifetime = song_metrics['lifetime_streams'].where(song_metrics['lifetime_streams'] > 0)
+    song_metrics['revenue_per_1k_streams'] = song_metrics['amount'] / lifetime * 1000
+    song_metrics['recent_share'] = song_metrics['streams_1yr'] / lifetime
+
+    both = song_metrics['amount'].notna() & lifetime.notna()
+    print(f"\nSong catalog: {len(song_catalog)} songs")
+    for source in song_catalog.sources:
+        print(f"   - {source}: {song_catalog.matched(source)} songs")
+    print(f"   - Earnings matched to lifetime streams: {both.sum()} songs")
+    if both.any():
+        rate = song_metrics.loc[both, 'amount'].sum() / song_metrics.loc[both, 'lifetime_streams'].sum() * 1000
+        print(f"   - Catalog revenue per 1,000 lifetime streams: ${rate:,.2f}")
+        print(f"   - Median 1-year share of lifetime streams: {song_metrics['recent_share'].median():.1%}")
+
+    return {'song_metrics': song_metrics}
+
+
+def _half_life(rate):
+    return f"half-life {np.log(2) / rate:.1f} years" if rate > 0 else "no decay"
+
+
+def _decay_rate(row):
+    # A song rate clamped at the fit bound is only a bound: its last-year share is out of the curve's reach
+    if row.get('saturated', False):
+        return f"{'at least' if row['decay_rate'] > 0 else 'at most'} {row['decay_rate']:.2f}/year, fit bound"
+    return f"{row['decay_rate']:.2f}/year"
+
+
+@STAGES.stage(outputs=('song_decay', 'cohort_decay', 'catalog_decay_rate', 'top_decay_songs'))
+def fit_release_decay(song_catalog, song_metrics, songs_1year_df, songs_all_df, as_of):
+    print("\n" + "="*80)
+    print("RELEASE-AGE DECAY")
+    print("="*80)
+
+    # Exponential stream decay of every song from its lifetime and last-year streams, and of each release year
+    release_days = song_potential.release_days(song_catalog, songs_1year_df, songs_all_df)
+    song_decay, cohort_decay, catalog_decay_rate = decay_curves.fit_decay(song_metrics, release_days, as_of)
+
+    horizon = decay_curves.HORIZON_YEARS
+    print(f"\nSongs with their own decay curve (older than a year, {decay_curves.MIN_STREAMS}+ lifetime streams): "
+          f"{(song_decay['rate_source'] == 'song').sum()} of {len(song_decay)}")
+    if song_decay['saturated'].any():
+        print(f"   - Clamped at +/-{decay_curves.MAX_RATE:.0f}/year (left out of the cohort rates): "
+              f"{song_decay['saturated'].sum()}")
+    if not np.isnan(catalog_decay_rate):
+        print(f"   - Catalog decay rate: {catalog_decay_rate:.2f}/year ({_half_life(catalog_decay_rate)})")
+    print(f"\nBy release year (expected streams and earnings over the next {horizon} years):")
+    for year, row in cohort_decay.iterrows():
+        rate = f"{row['decay_rate']:.2f}/year, {_half_life(row['decay_rate'])}" if pd.notna(row['decay_rate']) else "catalog rate"
+        clamped = f" ({row['saturated_songs']:.0f} clamped)" if row['saturated_songs'] else ""
+        unmatched = row['remaining_streams'] - row['matched_streams']
+        matched = f" ({row['matched_streams']:,.0f} with earnings)" if unmatched >= 0.5 else ""
+        print(f"   {year}: {row['songs']:.0f} songs{clamped}, {rate}, {row['remaining_streams']:,.0f} streams{matched}, "
+              f"${row['remaining_value']:,.2f}")
+    print(f"   - Expected remaining streams (next {horizon} years): {song_decay['remaining_streams'].sum():,.0f}, "
+          f"{cohort_decay['matched_streams'].sum():,.0f} of them from songs with earnings")
+    print(f"   - Expected remaining earnings (next {horizon} years): ${song_decay['remaining_value'].sum():,.2f}")
+    top_decay_songs = RankingIndex(song_decay, ('remaining_value',)).top('remaining_value', 5)
+
+    return {'song_decay': song_decay, 'cohort_decay': cohort_decay, 'catalog_decay_rate': catalog_decay_rate,
+            'top_decay_songs': top_decay_songs}
+
+
+@STAGES.stage(outputs=('high_potential_songs',))
+def detect_high_potential(song_catalog, songs_1year_df, songs_all_df, as_of):
+    print("\n" + "="*80)
+    print("HIGH-POTENTIAL SONGS")
+    print("="*80)
+
+    # Save rate, replay depth and momentum of every song, scored against the rest of the catalog
+    song_signals, high_potential_songs = song_potential.detect(song_catalog, songs_1year_df, songs_all_df, as_of)
+    scored = song_signals['potential'].notna().sum()
+    print(f"\nSongs scored (at least {song_potential.MIN_STREAMS} streams in the last year): {scored}")
+    print(f"   - Candidates (potential >= {song_potential.MIN_SCORE:.1f}, below-median streams): {len(high_potential_songs)}")
+    for song_id, row in high_potential_songs.head(10).iterrows():
+        print(f"   {row['title']}: potential {row['potential']:.2f}, {row['streams_1yr']:,.0f} streams, "
+              f"{row['save_rate']:.2%} save rate, {row['streams_per_listener']:.2f} streams/listener, "
+              f"momentum {row['momentum']:.2f}")
+
+    return {'high_potential_songs': high_potential_songs}
+
 
-# Aggregate metrics from songs 1 year data
-total_streams_1yr = songs_1year_df['streams'].sum()
-total_listeners_1yr = songs_1year_df['listeners'].sum()
-total_saves_1yr = songs_1year_df['saves'].sum()
+# ============================================================================
+# PART 6: RECENT METRICS ANALYSIS
+# ============================================================================
 
-print(f"\n1-Year Performance Summary:")
-print(f"   - Total Streams: {total_streams_1yr:,}")
-print(f"   - Total Listeners: {total_listeners_1yr:,}")
-print(f"   - Total Saves: {total_saves_1yr:,}")
-print(f"   - Average streams per song: {total_streams_1yr / len(songs_1year_df):,.0f}")
-print(f"   - Save rate: {(total_saves_1yr / total_streams_1yr * 100):.2f}%")
+@STAGES.stage(outputs=('monthly_active_listeners', 'previously_active_listeners', 'programmed_listeners',
+                       'total_reach', 'engagement_rate', 'organic_rate', 'audience_windows'))
+def analyze_recent_metrics(audience_window, as_of):
+    print("\n" + "="*80)
+    print("RECENT METRICS ANALYSIS (Last 28 Days)")
+    print("="*80)
+
+    # User provided metrics
+    monthly_active_listeners = 733
+    previously_active_listeners = 12766
+    programmed_listeners = 205368
+
+    total_reach = monthly_active_listeners + previously_active_listeners + programmed_listeners
+
+    print(f"\nListener Categories (Last 28 Days):")
+    print(f"   - Monthly Active Listeners: {monthly_active_listeners:,}")
+    print(f"   - Previously Active Listeners: {previously_active_listeners:,}")
+    print(f"   - Programmed Listeners: {programmed_listeners:,}")
+    print(f"   - Total Reach: {total_reach:,}")
+
+    # Calculate engagement metrics
+    engagement_rate = (monthly_active_listeners / total_reach * 100) if total_reach > 0 else 0
+    organic_rate = ((monthly_active_listeners + previously_active_listeners) / total_reach * 100) if total_reach > 0 else 0
+
+    print(f"\nEngagement Analysis:")
+    print(f"   - Engagement Rate (Active/Total): {engagement_rate:.2f}%")
+    print(f"   - Organic Engagement Rate: {organic_rate:.2f}%")
+    print(f"   - Programmed vs Organic Ratio: {programmed_listeners / (monthly_active_listeners + previously_active_listeners):.2f}x")
+
+    # Trailing and calendar windows of the timeline, each a constant-time lookup in the rollup cube
+    cube = audience_window.cube
+    audience_windows = {
+        'last_28_days': cube.trailing(28, as_of),
+        'previous_28_days': cube.trailing(28, as_of - timedelta(days=28)),
+        'trailing_90_days': cube.trailing(90, as_of),
+        'quarter_to_date': cube.window(pd.Period(as_of, freq='Q').start_time, as_of),
+    }
+    print(f"\nAudience Windows (timeline rollups):")
+    for name, window in audience_windows.items():
+        label = name.replace('_', ' ').capitalize()
+        if window['days'] == 0:
+            print(f"   - {label}: no timeline days")
+            continue
+        print(f"   - {label} ({window['start']:%Y-%m-%d} to {window['end']:%Y-%m-%d}): {window['streams']:,.0f} streams, "
+              f"{window['followers_last'] - window['followers_first']:+,.0f} followers")
+
+    return {'monthly_active_listeners': monthly_active_listeners,
+            'previously_active_listeners': previously_active_listeners,
+            'programmed_listeners': programmed_listeners, 'total_reach': total_reach,
+            'engagement_rate': engagement_rate, 'organic_rate': organic_rate, 'audience_windows': audience_windows}
 
-# Top performing songs in last year
-top_performers_1yr = songs_1year_df.nlargest(10, 'streams')
-print(f"\nTop 10 Performing Songs (Last Year):")
-for idx, row in top_performers_1yr.iterrows():
-    print(f"   {row['song']}: {row['streams']:,} streams, {row['listeners']:,} listeners, {row['saves']} saves")
 
 # ============================================================================
-# PART 6: RECENT METRICS ANALYSIS
+# PLAYLIST ATTRIBUTION
 # ============================================================================
 
-print("\n" + "="*80)
-print("RECENT METRICS ANALYSIS (Last 28 Days)")
-print("="*80)
+@STAGES.stage(outputs=('playlist_attribution',))
+def attribute_playlists(playlists_df, audience_window, as_of):
+    print("\n" + "="*80)
+    print(f"PLAYLIST ATTRIBUTION ({playlist_attribution.WINDOW_DAYS} DAYS BEFORE VS AFTER EACH PLACEMENT)")
+    print("="*80)
 
-# User provided metrics
-monthly_active_listeners = 733
-previously_active_listeners = 12766
-programmed_listeners = 205368
+    # Every placement's pre/post windows are read from the timeline cube at once
+    playlist_attribution_df = playlist_attribution.attribute_playlists(playlists_df, audience_window.cube, as_of)
+    measured = playlist_attribution_df['stream_lift'].notna()
+    print(f"\nPlacements measured against the timeline: {measured.sum()} of {len(playlist_attribution_df)}")
+    if measured.any():
+        lifted = playlist_attribution_df.loc[measured, 'stream_lift'] > 0
+        print(f"   - With higher daily streams after being added: {lifted.sum()}")
+        print(f"\nTop 5 Placements by Attributed Streams:")
+        for idx, row in playlist_attribution_df[measured].head(5).iterrows():
+            print(f"   {row['rank']}. {row['title']} (added {row['date_added']:%Y-%m-%d}): "
+                  f"{row['stream_lift']:+,.0f} streams/day, {row['attributed_streams']:+,.0f} attributed streams, "
+                  f"{row['follower_lift']:+,.1f} followers, {row['overlapping']} overlapping placements")
 
-total_reach = monthly_active_listeners + previously_active_listeners + programmed_listeners
+    return {'playlist_attribution': playlist_attribution_df}
 
-print(f"\nListener Categories (Last 28 Days):")
-print(f"   - Monthly Active Listeners: {monthly_active_listeners:,}")
-print(f"   - Previously Active Listeners: {previously_active_listeners:,}")
-print(f"   - Programmed Listeners: {programmed_listeners:,}")
-print(f"   - Total Reach: {total_reach:,}")
 
-# Calculate engagement metrics
-engagement_rate = (monthly_active_listeners / total_reach * 100) if total_reach > 0 else 0
-organic_rate = ((monthly_active_listeners + previously_active_listeners) / total_reach * 100) if total_reach > 0 else 0
+# ============================================================================
+# FORECAST (NEXT 12 MONTHS)
+# ============================================================================
+
+@STAGES.stage(outputs=('forecast_bands',))
+def forecast_outlook(weekly_audience, song_metrics, forecast_paths, forecast_workers):
+    print("\n" + "="*80)
+    print("FORECAST - NEXT 12 MONTHS (MONTE CARLO)")
+    print("="*80)
+
+    # Trajectories resample blocks of last year's complete weeks; revenue applies the lifetime
+    # per-stream rate of the cross-source song metrics
+    forecast_bands = forecast.forecast(weekly_audience, song_metrics, paths=forecast_paths,
+                                       workers=forecast_workers)
+    if forecast_bands is None:
+        print("\nForecast skipped" if forecast_paths <= 0 else "\nNot enough timeline weeks in the last year to forecast")
+        return {'forecast_bands': None}
+
+    print(f"\nSimulated trajectories: {forecast_paths:,} (5th / median / 95th percentile)")
+    for months, bands in forecast_bands.groupby('months', sort=False):
+        bands = bands.set_index('metric')
+        followers, streams, revenue = (bands.loc[metric] for metric in forecast.FORECAST_METRICS)
+        print(f"   {months} months:")
+        print(f"      - Followers: {followers['p5']:,.0f} / {followers['p50']:,.0f} / {followers['p95']:,.0f}")
+        print(f"      - Streams: {streams['p5']:,.0f} / {streams['p50']:,.0f} / {streams['p95']:,.0f}")
+        if pd.notna(revenue['p50']):
+            print(f"      - Revenue: ${revenue['p5']:,.2f} / ${revenue['p50']:,.2f} / ${revenue['p95']:,.2f}")
+
+    return {'forecast_bands': forecast_bands}
 
-print(f"\nEngagement Analysis:")
-print(f"   - Engagement Rate (Active/Total): {engagement_rate:.2f}%")
-print(f"   - Organic Engagement Rate: {organic_rate:.2f}%")
-print(f"   - Programmed vs Organic Ratio: {programmed_listeners / (monthly_active_listeners + previously_active_listeners):.2f}x")
 
 # ============================================================================
 # PART 7: VISUALIZATIONS
 # ============================================================================
 
-print("\n" + "="*80)
-print("GENERATING VISUALIZATIONS")
-print("="*80)
-
-# Create figure with multiple subplots
-fig = plt.figure(figsize=(20, 24))
-
-# 1. Earnings Over Time (5 years)
-ax1 = plt.subplot(4, 2, 1)
-earnings_by_year_plot = earnings_5yr.groupby('release_year')['Amount'].sum()
-ax1.bar(earnings_by_year_plot.index, earnings_by_year_plot.values, color='#2ecc71')
-ax1.set_title('Total Earnings by Release Year (Last 5 Years)', fontsize=14, fontweight='bold')
-ax1.set_xlabel('Year')
-ax1.set_ylabel('Earnings ($)')
-ax1.grid(True, alpha=0.3)
-for i, v in enumerate(earnings_by_year_plot.values):
-    ax1.text(earnings_by_year_plot.index[i], v, f'${v:,.0f}', ha='center', va='bottom', fontsize=9)
-
-# 2. Top Earning Songs
-ax2 = plt.subplot(4, 2, 2)
-top_10_earnings = earnings_df.nlargest(10, 'Amount')
-ax2.barh(range(len(top_10_earnings)), top_10_earnings['Amount'].values, color='#3498db')
-ax2.set_yticks(range(len(top_10_earnings)))
-ax2.set_yticklabels([s[:30] + '...' if len(s) > 30 else s for s in top_10_earnings['Song Title'].values], fontsize=8)
-ax2.set_title('Top 10 Earning Songs (All Time)', fontsize=14, fontweight='bold')
-ax2.set_xlabel('Earnings ($)')
-ax2.grid(True, alpha=0.3, axis='x')
-
-# 3. Follower Growth Over Time
-ax3 = plt.subplot(4, 2, 3)
-audience_1yr_sampled = audience_1yr[::7]  # Sample weekly for clarity
-ax3.plot(audience_1yr_sampled['date'], audience_1yr_sampled['followers'], linewidth=2, color='#e74c3c')
-ax3.set_title('Follower Growth (Last Year)', fontsize=14, fontweight='bold')
-ax3.set_xlabel('Date')
-ax3.set_ylabel('Followers')
-ax3.grid(True, alpha=0.3)
-ax3.tick_params(axis='x', rotation=45)
-
-# 4. Streams Over Time (Last Year)
-ax4 = plt.subplot(4, 2, 4)
-audience_1yr_sampled = audience_1yr[::7]
-ax4.plot(audience_1yr_sampled['date'], audience_1yr_sampled['streams'], linewidth=2, color='#9b59b6')
-ax4.set_title('Daily Streams (Last Year)', fontsize=14, fontweight='bold')
-ax4.set_xlabel('Date')
-ax4.set_ylabel('Streams')
-ax4.grid(True, alpha=0.3)
-ax4.tick_params(axis='x', rotation=45)
-
-# 5. Top Performing Songs (1 Year)
-ax5 = plt.subplot(4, 2, 5)
-top_10_streams = songs_1year_df.nlargest(10, 'streams')
-ax5.barh(range(len(top_10_streams)), top_10_streams['streams'].values, color='#f39c12')
-ax5.set_yticks(range(len(top_10_streams)))
-ax5.set_yticklabels([s[:30] + '...' if len(s) > 30 else s for s in top_10_streams['song'].values], fontsize=8)
-ax5.set_title('Top 10 Songs by Streams (Last Year)', fontsize=14, fontweight='bold')
-ax5.set_xlabel('Streams')
-ax5.grid(True, alpha=0.3, axis='x')
-
-# 6. Earnings vs Streams Correlation
-ax6 = plt.subplot(4, 2, 6)
-# Merge earnings with streams data
-earnings_with_streams = earnings_df[earnings_df['streams'].notna() & (earnings_df['streams'] > 0)]
-if len(earnings_with_streams) > 0:
-    ax6.scatter(earnings_with_streams['streams'], earnings_with_streams['Amount'], alpha=0.6, s=50, color='#1abc9c')
-    ax6.set_title('Earnings vs Streams Correlation', fontsize=14, fontweight='bold')
-    ax6.set_xlabel('Streams')
-    ax6.set_ylabel('Earnings ($)')
-    ax6.set_xscale('log')
-    ax6.grid(True, alpha=0.3)
-
-# 7. Listener Categories (Recent)
-ax7 = plt.subplot(4, 2, 7)
-categories = ['Monthly Active', 'Previously Active', 'Programmed']
-values = [monthly_active_listeners, previously_active_listeners, programmed_listeners]
-colors = ['#2ecc71', '#3498db', '#95a5a6']
-ax7.pie(values, labels=categories, autopct='%1.1f%%', colors=colors, startangle=90)
-ax7.set_title('Listener Distribution (Last 28 Days)', fontsize=14, fontweight='bold')
-
-# 8. Songs Released Over Time
-ax8 = plt.subplot(4, 2, 8)
-songs_by_year = earnings_df.groupby('release_year').size()
-ax8.bar(songs_by_year.index, songs_by_year.values, color='#e67e22')
-ax8.set_title('Number of Songs Released by Year', fontsize=14, fontweight='bold')
-ax8.set_xlabel('Year')
-ax8.set_ylabel('Number of Songs')
-ax8.grid(True, alpha=0.3, axis='y')
-
-plt.tight_layout()
-plt.savefig(f'{OUTPUT_DIR}/comprehensive_analysis.png', dpi=300, bbox_inches='tight')
-print(f"✓ Saved visualization: {OUTPUT_DIR}/comprehensive_analysis.png")
+@STAGES.stage(outputs=(), artifacts=dashboard.output_files)
+def plot_dashboard(earnings_by_year, earnings_df, earnings_rank, audience_1yr, songs_1year_rank, monthly_active_listeners,
+                   previously_active_listeners, programmed_listeners, output_dir, figures, plot_workers):
+    print("\n" + "="*80)
+    print("GENERATING VISUALIZATIONS")
+    print("="*80)
+
+    options = dashboard.figure_options(figures)
+    data = {name: dashboard.panel_data(name, earnings_by_year, earnings_df, earnings_rank, audience_1yr,
+                                       songs_1year_rank, monthly_active_listeners, previously_active_listeners,
+                                       programmed_listeners, options)
+            for name in dashboard.selected_panels(options)}
+    for path in dashboard.render_dashboard(output_dir, data, options, workers=plot_workers):
+        print(f"✓ Saved visualization: {path}")
+
+    return {}
+
 
 # ============================================================================
 # PART 8: BUSINESS INSIGHTS & RECOMMENDATIONS
 # ============================================================================
 
-print("\n" + "="*80)
-print("BUSINESS INSIGHTS & ANALYSIS")
-print("="*80)
-
-insights = []
+@STAGES.stage(outputs=('insights', 'top_5_pct', 'songs_per_year', 'save_rate'))
+def generate_insights(earnings_df, earnings_rank, total_earnings, follower_growth_pct, engagement_rate,
+                      total_saves_1yr, total_streams_1yr, earnings_gini):
+    print("\n" + "="*80)
+    print("BUSINESS INSIGHTS & ANALYSIS")
+    print("="*80)
 
-# Insight 1: Earnings Concentration
-top_5_pct = (earnings_df.nlargest(5, 'Amount')['Amount'].sum() / total_earnings * 100)
-insights.append({
-    'category': 'Revenue Concentration',
-    'finding': f'Top 5 songs generate {top_5_pct:.1f}% of total earnings',
-    'implication': 'High dependency on few hits; need diversification strategy'
-})
+    insights = []
 
-# Insight 2: Follower Growth
-if follower_growth_pct > 0:
+    # Insight 1: Earnings Concentration
+    top_5_pct = (earnings_rank.top_sum('Amount', 5) / total_earnings * 100)
+    gini = f' (Gini {earnings_gini:.2f})' if pd.notna(earnings_gini) else ''
     insights.append({
-        'category': 'Audience Growth',
-        'finding': f'Follower growth of {follower_growth_pct:.1f}% in last year',
-        'implication': 'Positive growth trajectory; maintain engagement strategies'
+        'category': 'Revenue Concentration',
+        'finding': f'Top 5 songs generate {top_5_pct:.1f}% of total earnings{gini}',
+        'implication': 'High dependency on few hits; need diversification strategy'
     })
-else:
+
+    # Insight 2: Follower Growth
+    if follower_growth_pct > 0:
+        insights.append({
+            'category': 'Audience Growth',
+            'finding': f'Follower growth of {follower_growth_pct:.1f}% in last year',
+            'implication': 'Positive growth trajectory; maintain engagement strategies'
+        })
+    else:
+        insights.append({
+            'category': 'Audience Growth',
+            'finding': f'Follower decline of {abs(follower_growth_pct):.1f}% in last year',
+            'implication': 'Need to revitalize audience acquisition and retention'
+        })
+
+    # Insight 3: Engagement Analysis
+    if engagement_rate < 1:
+        insights.append({
+            'category': 'Engagement',
+            'finding': f'Low engagement rate ({engagement_rate:.2f}%) - high programmed listener ratio',
+            'implication': 'Focus on converting programmed listeners to active fans'
+        })
+
+    # Insight 4: Content Velocity
+    songs_per_year = earnings_df.groupby('release_year').size().mean()
     insights.append({
-        'category': 'Audience Growth',
-        'finding': f'Follower decline of {abs(follower_growth_pct):.1f}% in last year',
-        'implication': 'Need to revitalize audience acquisition and retention'
+        'category': 'Content Strategy',
+        'finding': f'Average {songs_per_year:.1f} songs released per year',
+        'implication': 'Maintain consistent release schedule to build momentum'
     })
 
-# Insight 3: Engagement Analysis
-if engagement_rate < 1:
+    # Insight 5: Save Rate
+    save_rate = (total_saves_1yr / total_streams_1yr * 100) if total_streams_1yr > 0 else 0
     insights.append({
-        'category': 'Engagement',
-        'finding': f'Low engagement rate ({engagement_rate:.2f}%) - high programmed listener ratio',
-        'implication': 'Focus on converting programmed listeners to active fans'
+        'category': 'Fan Engagement',
+        'finding': f'Save rate of {save_rate:.2f}% indicates moderate fan loyalty',
+        'implication': 'Improve save rate through better song quality and marketing'
     })
 
-# Insight 4: Content Velocity
-songs_per_year = earnings_df.groupby('release_year').size().mean()
-insights.append({
-    'category': 'Content Strategy',
-    'finding': f'Average {songs_per_year:.1f} songs released per year',
-    'implication': 'Maintain consistent release schedule to build momentum'
-})
-
-# Insight 5: Save Rate
-save_rate = (total_saves_1yr / total_streams_1yr * 100) if total_streams_1yr > 0 else 0
-insights.append({
-    'category': 'Fan Engagement',
-    'finding': f'Save rate of {save_rate:.2f}% indicates moderate fan loyalty',
-    'implication': 'Improve save rate through better song quality and marketing'
-})
-
-print("\nKey Insights:")
-for i, insight in enumerate(insights, 1):
-    print(f"\n{i}. {insight['category']}")
-    print(f"   Finding: {insight['finding']}")
-    print(f"   Implication: {insight['implication']}")
+    print("\nKey Insights:")
+    for i, insight in enumerate(insights, 1):
+        print(f"\n{i}. {insight['category']}")
+        print(f"   Finding: {insight['finding']}")
+        print(f"   Implication: {insight['implication']}")
+
+    return {'insights': insights, 'top_5_pct': top_5_pct, 'songs_per_year': songs_per_year, 'save_rate': save_rate}
+
 
 # ============================================================================
 # PART 9: RECOMMENDATIONS
 # ============================================================================
 
-print("\n" + "="*80)
-print("STRATEGIC RECOMMENDATIONS")
-print("="*80)
+@STAGES.stage(outputs=('recommendations',))
+def generate_recommendations(top_5_pct, engagement_rate, songs_per_year, playlists_df, playlist_attribution,
+                             high_potential_songs, concentration_table):
+    print("\n" + "="*80)
+    print("STRATEGIC RECOMMENDATIONS")
+    print("="*80)
+
+    recommendations = []
+
+    # Recommendation 1: Revenue Diversification, prioritized by how concentrated earnings are and where that is heading
+    earnings = concentration_table[(concentration_table['metric'] == 'Amount') & concentration_table['gini'].notna()]
+    overall = earnings[earnings['scope'] == 'all']
+    rolling = earnings[earnings['scope'] == 'rolling']
+    description = f'Top 5 songs account for {top_5_pct:.1f}% of earnings'
+    gini = overall['gini'].iloc[0] if len(overall) else np.nan
+    if len(overall):
+        row = overall.iloc[0]
+        description += f"; {row['songs_for_80pct']} of {row['songs']} songs make 80% of it (Gini {gini:.2f})"
+    if len(rolling) > 1:
+        first, latest = rolling.iloc[0], rolling.iloc[-1]
+        change = latest['gini'] - first['gini']
+        trend = 'rising' if change > 0.05 else 'falling' if change < -0.05 else 'steady'
+        description += (f", {trend} from {first['gini']:.2f} ({first['start_year']}-{first['end_year']} releases) "
+                        f"to {latest['gini']:.2f} ({latest['start_year']}-{latest['end_year']})")
+    concentrated = top_5_pct >= 50 or (pd.notna(gini) and gini >= concentration.HIGH_GINI)
+    recommendations.append({
+        'priority': 'HIGH' if concentrated else 'MEDIUM',
+        'title': 'Diversify Revenue Streams',
+        'description': f'{description}. Focus on promoting mid-tier songs and creating new hits.',
+        'expected_impact': 'Reduce revenue risk by 30-40%',
+        'timeline': '3-6 months'
+    })
 
-recommendations = []
+    # Recommendation 2: Audience Engagement
+    if engagement_rate < 1:
+        recommendations.append({
+            'priority': 'HIGH',
+            'title': 'Convert Programmed Listeners to Active Fans',
+            'description': f'Only {engagement_rate:.2f}% monthly active engagement. Implement playlist optimization and social media campaigns.',
+            'expected_impact': 'Increase active listeners by 50-100%',
+            'timeline': '2-4 months'
+        })
+
+    # Recommendation 3: Content Strategy
+    recommendations.append({
+        'priority': 'MEDIUM',
+        'title': 'Maintain Consistent Release Schedule',
+        'description': f'Current average of {songs_per_year:.1f} songs/year. Aim for monthly releases to maintain momentum.',
+        'expected_impact': 'Increase streams by 20-30%',
+        'timeline': 'Ongoing'
+    })
 
-# Recommendation 1: Revenue Diversification
-recommendations.append({
-    'priority': 'HIGH',
-    'title': 'Diversify Revenue Streams',
-    'description': f'Top 5 songs account for {top_5_pct:.1f}% of earnings. Focus on promoting mid-tier songs and creating new hits.',
-    'expected_impact': 'Reduce revenue risk by 30-40%',
-    'timeline': '3-6 months'
-})
+    # Recommendation 4: Playlist Optimization
+    top_playlist_streams = playlists_df['streams'].sum()
+    description = f'Currently featured in {len(playlists_df)} playlists generating {top_playlist_streams:,} streams. Focus on getting into larger playlists.'
+    # Name the placements that measurably lifted daily streams
+    lifted = playlist_attribution[playlist_attribution['attributed_streams'] > 0].head(3)
+    if len(lifted):
+        names = ', '.join(f"{row['title'].strip()} ({row['stream_lift']:+,.0f} streams/day)" for _, row in lifted.iterrows())
+        description += f' Strongest measured lift: {names}; pitch playlists like these.'
+    recommendations.append({
+        'priority': 'MEDIUM',
+        'title': 'Leverage Playlist Placements',
+        'description': description,
+        'expected_impact': 'Increase reach by 40-60%',
+        'timeline': '3-6 months'
+    })
 
-# Recommendation 2: Audience Engagement
-if engagement_rate < 1:
+    # Recommendation 5: Data-Driven Song Promotion
+    if len(high_potential_songs):
+        names = ', '.join(f"{row['title']} ({row['save_rate']:.2%} save rate)" for _, row in high_potential_songs.head(3).iterrows())
+        songs = '1 song shows' if len(high_potential_songs) == 1 else f'{len(high_potential_songs)} songs show'
+        description = f'{songs} strong fan interest on below-median streams, led by {names}. Amplify them.'
+    else:
+        description = 'No song currently combines strong save rate, replay depth and momentum with below-median streams. Re-check after the next releases.'
     recommendations.append({
-        'priority': 'HIGH',
-        'title': 'Convert Programmed Listeners to Active Fans',
-        'description': f'Only {engagement_rate:.2f}% monthly active engagement. Implement playlist optimization and social media campaigns.',
-        'expected_impact': 'Increase active listeners by 50-100%',
-        'timeline': '2-4 months'
+        'priority': 'MEDIUM',
+        'title': 'Promote High-Potential Songs',
+        'description': description,
+        'expected_impact': 'Increase streams for selected songs by 100-200%',
+        'timeline': '1-3 months'
     })
 
-# Recommendation 3: Content Strategy
-recommendations.append({
-    'priority': 'MEDIUM',
-    'title': 'Maintain Consistent Release Schedule',
-    'description': f'Current average of {songs_per_year:.1f} songs/year. Aim for monthly releases to maintain momentum.',
-    'expected_impact': 'Increase streams by 20-30%',
-    'timeline': 'Ongoing'
-})
-
-# Recommendation 4: Playlist Optimization
-top_playlist_streams = playlists_df['streams'].sum()
-recommendations.append({
-    'priority': 'MEDIUM',
-    'title': 'Leverage Playlist Placements',
-    'description': f'Currently featured in {len(playlists_df)} playlists generating {top_playlist_streams:,} streams. Focus on getting into larger playlists.',
-    'expected_impact': 'Increase reach by 40-60%',
-    'timeline': '3-6 months'
-})
-
-# Recommendation 5: Data-Driven Song Promotion
-recommendations.append({
-    'priority': 'MEDIUM',
-    'title': 'Promote High-Potential Songs',
-    'description': f'Identify songs with high save rates but low streams. These indicate strong fan interest that can be amplified.',
-    'expected_impact': 'Increase streams for selected songs by 100-200%',
-    'timeline': '1-3 months'
-})
-
-print("\nPrioritized Recommendations:")
-for i, rec in enumerate(recommendations, 1):
-    print(f"\n{i}. [{rec['priority']}] {rec['title']}")
-    print(f"   Description: {rec['description']}")
-    print(f"   Expected Impact: {rec['expected_impact']}")
-    print(f"   Timeline: {rec['timeline']}")
+    print("\nPrioritized Recommendations:")
+    for i, rec in enumerate(recommendations, 1):
+        print(f"\n{i}. [{rec['priority']}] {rec['title']}")
+        print(f"   Description: {rec['description']}")
+        print(f"   Expected Impact: {rec['expected_impact']}")
+        print(f"   Timeline: {rec['timeline']}")
+
+    return {'recommendations': recommendations}
+
 
 # ============================================================================
 # PART 10: UPCOMING ARTIST ASSESSMENT
 # ============================================================================
 
-print("\n" + "="*80)
-print("UPCOMING ARTIST ASSESSMENT")
-print("="*80)
-
-assessment_score = 0
-max_score = 10
-assessment_factors = []
-
-# Factor 1: Follower Growth
-if follower_growth_pct > 20:
-    score = 2
-    assessment_factors.append(('Strong Follower Growth', score, 'Excellent growth trajectory'))
-elif follower_growth_pct > 10:
-    score = 1.5
-    assessment_factors.append(('Moderate Follower Growth', score, 'Positive growth'))
-elif follower_growth_pct > 0:
-    score = 1
-    assessment_factors.append(('Slow Follower Growth', score, 'Needs improvement'))
-else:
-    score = 0
-    assessment_factors.append(('Declining Followers', score, 'Critical issue'))
-assessment_score += score
-
-# Factor 2: Stream Volume
-if total_streams_1yr > 500000:
-    score = 2
-    assessment_factors.append(('High Stream Volume', score, 'Strong performance'))
-elif total_streams_1yr > 200000:
-    score = 1.5
-    assessment_factors.append(('Moderate Stream Volume', score, 'Good performance'))
-elif total_streams_1yr > 100000:
-    score = 1
-    assessment_factors.append(('Low Stream Volume', score, 'Needs growth'))
-else:
-    score = 0.5
-    assessment_factors.append(('Very Low Stream Volume', score, 'Critical issue'))
-assessment_score += score
-
-# Factor 3: Engagement Rate
-if engagement_rate > 2:
-    score = 2
-    assessment_factors.append(('High Engagement', score, 'Strong fan base'))
-elif engagement_rate > 1:
-    score = 1.5
-    assessment_factors.append(('Moderate Engagement', score, 'Room for improvement'))
-elif engagement_rate > 0.5:
-    score = 1
-    assessment_factors.append(('Low Engagement', score, 'Needs focus'))
-else:
-    score = 0.5
-    assessment_factors.append(('Very Low Engagement', score, 'Critical issue'))
-assessment_score += score
-
-# Factor 4: Revenue Generation
-if total_earnings > 2000:
-    score = 2
-    assessment_factors.append(('Strong Revenue', score, 'Monetization working'))
-elif total_earnings > 1000:
-    score = 1.5
-    assessment_factors.append(('Moderate Revenue', score, 'Growing monetization'))
-elif total_earnings > 500:
-    score = 1
-    assessment_factors.append(('Low Revenue', score, 'Needs improvement'))
-else:
-    score = 0.5
-    assessment_factors.append(('Very Low Revenue', score, 'Critical issue'))
-assessment_score += score
-
-# Factor 5: Content Consistency
-if songs_per_year >= 12:
-    score = 2
-    assessment_factors.append(('High Content Velocity', score, 'Excellent consistency'))
-elif songs_per_year >= 6:
-    score = 1.5
-    assessment_factors.append(('Moderate Content Velocity', score, 'Good consistency'))
-elif songs_per_year >= 3:
-    score = 1
-    assessment_factors.append(('Low Content Velocity', score, 'Needs more releases'))
-else:
-    score = 0.5
-    assessment_factors.append(('Very Low Content Velocity', score, 'Critical issue'))
-assessment_score += score
-
-# Overall Assessment
-assessment_pct = (assessment_score / max_score) * 100
-
-print(f"\nAssessment Factors:")
-for factor, score, note in assessment_factors:
-    print(f"   • {factor}: {score}/2.0 - {note}")
-
-print(f"\n{'='*80}")
-print(f"OVERALL ASSESSMENT SCORE: {assessment_score:.1f}/10.0 ({assessment_pct:.1f}%)")
-print(f"{'='*80}")
-
-if assessment_pct >= 70:
-    verdict = "STRONG UPCOMING ARTIST"
-    verdict_desc = "Big Nose demonstrates strong indicators of an upcoming artist with solid growth potential. The artist shows consistent content creation, growing audience, and monetization success."
-elif assessment_pct >= 50:
-    verdict = "PROMISING UPCOMING ARTIST"
-    verdict_desc = "Big Nose shows promise as an upcoming artist with several positive indicators. However, there are areas that need attention to accelerate growth."
-elif assessment_pct >= 30:
-    verdict = "EMERGING ARTIST"
-    verdict_desc = "Big Nose is an emerging artist with potential, but requires strategic focus on key growth areas to reach upcoming artist status."
-else:
-    verdict = "EARLY STAGE ARTIST"
-    verdict_desc = "Big Nose is in early stages of development. Significant strategic improvements are needed across multiple areas."
-
-print(f"\nVERDICT: {verdict}")
-print(f"\n{verdict_desc}")
+@STAGES.stage(outputs=('assessment_score', 'assessment_pct', 'assessment_factors', 'verdict', 'verdict_desc'))
+def assess_artist(follower_growth_pct, total_streams_1yr, engagement_rate, total_earnings, songs_per_year, artist):
+    print("\n" + "="*80)
+    print("UPCOMING ARTIST ASSESSMENT")
+    print("="*80)
+
+    # The scoring rules live in assessment.FACTORS; this artist is the single cell of a 1 x 1 grid
+    grid = assessment.assess({'follower_growth_pct': follower_growth_pct, 'total_streams_1yr': total_streams_1yr,
+                              'engagement_rate': engagement_rate, 'total_earnings': total_earnings,
+                              'songs_per_year': songs_per_year}, artists=[artist])
+    assessment_factors = grid.factors()
+    assessment_score = grid.score[0, 0]
+    assessment_pct = grid.pct[0, 0]
+
+    print(f"\nAssessment Factors:")
+    for factor, score, note in assessment_factors:
+        print(f"   • {factor}: {score}/2.0 - {note}")
+
+    print(f"\n{'='*80}")
+    print(f"OVERALL ASSESSMENT SCORE: {assessment_score:.1f}/{assessment.MAX_SCORE:.1f} ({assessment_pct:.1f}%)")
+    print(f"{'='*80}")
+
+    verdict, verdict_desc = grid.verdict()
+    print(f"\nVERDICT: {verdict}")
+    print(f"\n{verdict_desc}")
+
+    return {'assessment_score': assessment_score, 'assessment_pct': assessment_pct,
+            'assessment_factors': assessment_factors, 'verdict': verdict, 'verdict_desc': verdict_desc}
+
 
 # ============================================================================
 # PART 11: EXPORT SUMMARY REPORT
 # ============================================================================
 
-print("\n" + "="*80)
-print("GENERATING SUMMARY REPORT")
-print("="*80)
-
-# Create summary report
-report = f"""
-BIG NOSE ARTIST - COMPREHENSIVE BUSINESS ANALYSIS REPORT
+def render_report(artist, verdict, verdict_desc, assessment_score, assessment_pct, total_earnings, total_streams_1yr,
+                  total_listeners_1yr, final_followers, follower_growth, follower_growth_pct,
+                  monthly_active_listeners, previously_active_listeners, programmed_listeners, total_reach,
+                  engagement_rate, top_songs, insights, recommendations, forecast_bands=None,
+                  high_potential_songs=None, song_decay=None, catalog_decay_rate=None, top_decay_songs=None):
+    """Text of the summary report."""
+    # Create summary report
+    report = f"""
+{artist.upper()} ARTIST - COMPREHENSIVE BUSINESS ANALYSIS REPORT
 Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 {'='*80}
 
 EXECUTIVE SUMMARY
 -----------------
-Artist: Big Nose
+Artist: {artist}
 Analysis Period: Last 5 years (earnings), Last 1 year (performance)
 Assessment: {verdict} ({assessment_score:.1f}/10.0)
 
@@ -610,31 +927,65 @@ Previously Active Listeners: {previously_active_listeners:,}
 Programmed Listeners: {programmed_listeners:,}
 Total Reach: {total_reach:,}
 Engagement Rate: {engagement_rate:.2f}%
-
+"""
+    if forecast_bands is not None:
+        report += f"""
+FORECAST (5th / Median / 95th Percentile)
+------------------------------------------
+"""
+        for (metric, months), row in forecast_bands.set_index(['metric', 'months']).iterrows():
+            if pd.isna(row['p50']):
+                continue
+            unit = '$' if metric == 'revenue' else ''
+            report += (f"{metric.capitalize()} ({months} months): {unit}{row['p5']:,.0f} / "
+                       f"{unit}{row['p50']:,.0f} / {unit}{row['p95']:,.0f}\n")
+
+    report += f"""
 TOP PERFORMING SONGS (Earnings)
 --------------------------------
 """
-for idx, row in top_songs.head(5).iterrows():
-    report += f"{row['Song Title']}: ${row['Amount']:.2f} ({row['streams']:,.0f} streams)\n"
+    for idx, row in top_songs.head(5).iterrows():
+        report += f"{row['Song Title']}: ${row['Amount']:.2f} ({row['streams']:,.0f} streams)\n"
 
-report += f"""
+    if song_decay is not None and song_decay['remaining_value'].notna().any():
+        report += f"""
+CATALOG DECAY (Next {decay_curves.HORIZON_YEARS} Years)
+------------------------------
+Catalog Decay Rate: {catalog_decay_rate:.2f}/year ({_half_life(catalog_decay_rate)})
+Expected Remaining Streams: {song_decay['remaining_streams'].sum():,.0f} \
+({song_decay['remaining_streams'].where(song_decay['earnings_matched'], 0).sum():,.0f} from songs with earnings)
+Expected Remaining Earnings: ${song_decay['remaining_value'].sum():,.2f}
+"""
+        for song_id, row in (top_decay_songs if top_decay_songs is not None else song_decay.iloc[:0]).iterrows():
+            report += f"{row['title']}: ${row['remaining_value']:,.2f} ({_decay_rate(row)})\n"
+
+    if high_potential_songs is not None and len(high_potential_songs):
+        report += f"""
+HIGH-POTENTIAL SONGS (Strong Fan Interest, Below-Median Streams)
+-----------------------------------------------------------------
+"""
+        for song_id, row in high_potential_songs.head(10).iterrows():
+            report += (f"{row['title']}: potential {row['potential']:.2f}, {row['streams_1yr']:,.0f} streams, "
+                       f"{row['save_rate']:.2%} save rate, momentum {row['momentum']:.2f}\n")
+
+    report += f"""
 KEY INSIGHTS
 ------------
 """
-for i, insight in enumerate(insights, 1):
-    report += f"{i}. {insight['category']}: {insight['finding']}\n   → {insight['implication']}\n\n"
+    for i, insight in enumerate(insights, 1):
+        report += f"{i}. {insight['category']}: {insight['finding']}\n   → {insight['implication']}\n\n"
 
-report += f"""
+    report += f"""
 STRATEGIC RECOMMENDATIONS
 --------------------------
 """
-for i, rec in enumerate(recommendations, 1):
-    report += f"{i}. [{rec['priority']}] {rec['title']}\n"
-    report += f"   {rec['description']}\n"
-    report += f"   Expected Impact: {rec['expected_impact']}\n"
-    report += f"   Timeline: {rec['timeline']}\n\n"
+    for i, rec in enumerate(recommendations, 1):
+        report += f"{i}. [{rec['priority']}] {rec['title']}\n"
+        report += f"   {rec['description']}\n"
+        report += f"   Expected Impact: {rec['expected_impact']}\n"
+        report += f"   Timeline: {rec['timeline']}\n\n"
 
-report += f"""
+    report += f"""
 ASSESSMENT CONCLUSION
 ----------------------
 {verdict_desc}
@@ -643,23 +994,213 @@ Overall Score: {assessment_score:.1f}/10.0 ({assessment_pct:.1f}%)
 
 {'='*80}
 """
+    return report
+
+
+# Always rerun: the report is cheap and carries the generation time
+@STAGES.stage(outputs=(), memoize=False)
+def export_report(artist, verdict, verdict_desc, assessment_score, assessment_pct, total_earnings, total_streams_1yr,
+                  total_listeners_1yr, final_followers, follower_growth, follower_growth_pct,
+                  monthly_active_listeners, previously_active_listeners, programmed_listeners, total_reach,
+                  engagement_rate, top_songs, insights, recommendations, earnings_df, audience_1yr, song_metrics,
+                  quality_report, royalty_ledger, forecast_bands, playlist_attribution, high_potential_songs,
+                  song_decay, cohort_decay, catalog_decay_rate, top_decay_songs, concentration_table, pareto_curve,
+                  output_dir, plots, figures):
+    print("\n" + "="*80)
+    print("GENERATING SUMMARY REPORT")
+    print("="*80)
+
+    report = render_report(artist, verdict, verdict_desc, assessment_score, assessment_pct, total_earnings,
+                           total_streams_1yr, total_listeners_1yr, final_followers, follower_growth,
+                           follower_growth_pct, monthly_active_listeners, previously_active_listeners,
+                           programmed_listeners, total_reach, engagement_rate, top_songs, insights, recommendations,
+                           forecast_bands, high_potential_songs, song_decay, catalog_decay_rate, top_decay_songs)
+
+    # Save report
+    with open(f'{output_dir}/analysis_report.txt', 'w') as f:
+        f.write(report)
+
+    print(f"✓ Saved report: {output_dir}/analysis_report.txt")
+
+    # Save detailed data exports
+    earnings_df.to_csv(f'{output_dir}/earnings_analysis.csv', index=False)
+    audience_1yr.to_csv(f'{output_dir}/audience_1year.csv', index=False)
+    song_metrics.to_csv(f'{output_dir}/song_metrics.csv')
+    quality_report.save(f'{output_dir}/quality_report.json')
+    royalty_rollup = royalty_ledger.rollup_frame() if royalty_ledger is not None else None
+    if royalty_rollup is not None:
+        royalty_rollup.to_csv(f'{output_dir}/royalties_by_month_territory.csv', index=False)
+    if forecast_bands is not None:
+        forecast_bands.to_csv(f'{output_dir}/forecast.csv', index=False)
+    playlist_attribution.to_csv(f'{output_dir}/playlist_attribution.csv', index=False)
+    high_potential_songs.to_csv(f'{output_dir}/high_potential_songs.csv')
+    song_decay.to_csv(f'{output_dir}/song_decay.csv')
+    cohort_decay.to_csv(f'{output_dir}/decay_cohorts.csv')
+    concentration_table.to_csv(f'{output_dir}/concentration.csv', index=False)
+    if pareto_curve is not None:
+        pareto_curve.to_csv(f'{output_dir}/pareto_curve.csv', index=False)
+
+    print(f"\n{'='*80}")
+    print("ANALYSIS COMPLETE!")
+    print(f"{'='*80}")
+    print(f"\nOutput files saved to: {output_dir}/")
+    if plots:
+        for name in dashboard.output_files(figures):
+            print(f"  - {name} (visualizations)")
+    print(f"  - analysis_report.txt (summary report)")
+    print(f"  - earnings_analysis.csv (detailed earnings data)")
+    print(f"  - audience_1year.csv (audience timeline data)")
+    print(f"  - song_metrics.csv (cross-source per-song metrics)")
+    print(f"  - quality_report.json (input data profile)")
+    print(f"  - playlist_attribution.csv (ranked playlist placement lift)")
+    print(f"  - high_potential_songs.csv (ranked high-potential songs)")
+    print(f"  - song_decay.csv (per-song decay curves and remaining value)")
+    print(f"  - decay_cohorts.csv (decay by release year)")
+    print(f"  - concentration.csv (Gini, HHI and top shares per cohort and rolling window)")
+    if pareto_curve is not None:
+        print(f"  - pareto_curve.csv (share of earnings and streams by top share of songs)")
+    if royalty_rollup is not None:
+        print(f"  - royalties_by_month_territory.csv (royalty statement rollup)")
+    if forecast_bands is not None:
+        print(f"  - forecast.csv (forecast percentile bands)")
+
+    return {}
 
-# Save report
-with open(f'{OUTPUT_DIR}/analysis_report.txt', 'w') as f:
-    f.write(report)
-
-print(f"✓ Saved report: {OUTPUT_DIR}/analysis_report.txt")
 
-# Save detailed data exports
-earnings_df.to_csv(f'{OUTPUT_DIR}/earnings_analysis.csv', index=False)
-audience_1yr.to_csv(f'{OUTPUT_DIR}/audience_1year.csv', index=False)
-
-print(f"\n{'='*80}")
-print("ANALYSIS COMPLETE!")
-print(f"{'='*80}")
-print(f"\nOutput files saved to: {OUTPUT_DIR}/")
-print(f"  - comprehensive_analysis.png (visualizations)")
-print(f"  - analysis_report.txt (summary report)")
-print(f"  - earnings_analysis.csv (detailed earnings data)")
-print(f"  - audience_1year.csv (audience timeline data)")
+# ============================================================================
+# RUNNER
+# ============================================================================
 
+# Key metrics run_analysis returns (and the roster summary lists) for each artist
+SUMMARY_METRICS = ('total_earnings', 'total_streams_1yr', 'total_listeners_1yr', 'final_followers', 'follower_growth',
+                   'follower_growth_pct', 'engagement_rate', 'save_rate', 'songs_per_year', 'earnings_gini',
+                   'earnings_hhi', 'assessment_score', 'verdict')
+
+
+def analysis_params(data_dir, output_dir, artist, cache_dir=None, as_of=None, state_dir=None, store_dir=None,
+                    plots=True, figures=None, plot_workers=None, quality_gate='errors',
+                    royalty_rollup=False, forecast_paths=forecast.DEFAULT_PATHS, forecast_workers=None,
+                    warehouse_path=None):
+    """Parameters the stage graph starts from for one artist."""
+    # Trailing windows are measured from the end of the as-of day, as for a run made during that day
+    as_of = pd.Timestamp(as_of if as_of is not None else datetime.now().date()).normalize()
+    params = {
+        'artist': artist,
+        'as_of': as_of + pd.Timedelta(days=1, microseconds=-1),
+        'output_dir': output_dir,
+        'plots': plots,
+        'quality_gate': quality_gate,
+        'royalty_rollup': royalty_rollup,
+        'figures': dashboard.figure_options(figures),
+        'plot_workers': plot_workers,
+        'forecast_paths': forecast_paths,
+        'forecast_workers': forecast_workers,
+        'cache_dir': cache_dir,
+        'warehouse_path': warehouse_path,
+        'audience_state_path': os.path.join(state_dir, f'{artist}-audience-state.json') if state_dir else None,
+        'audience_store_dir': os.path.join(store_dir, artist) if store_dir else None,
+    }
+    params.update({name: os.path.join(data_dir, path.format(artist=artist)) for name, path in INPUT_FILES.items()})
+    if state_dir:
+        os.makedirs(state_dir, exist_ok=True)
+    return params
+
+
+def run_analysis(data_dir=DATA_DIR, output_dir=OUTPUT_DIR, artist=ARTIST, cache_dir=None, as_of=None,
+                 memo_dir=None, state_dir=None, store_dir=None, metrics=None, plots=True, figures=None,
+                 plot_workers=None, quality_gate='errors', royalty_rollup=False,
+                 forecast_paths=forecast.DEFAULT_PATHS, forecast_workers=None, load_workers=None,
+                 warehouse_path=None):
+    """Run PART 1 through PART 11 for one artist and return its key metrics.
+
+    With `memo_dir`, stage results are memoized by input fingerprints and `as_of` (default: today),
+    so a rerun only recomputes the stages downstream of changed inputs. With `state_dir`, the audience
+    timeline is tracked incrementally and a refresh only parses the days appended since the last run.
+    With `store_dir`, the timeline is kept in an append-only memory-mapped store and PART 4, the
+    follower/stream charts and the audience export read only the trailing-window slice.
+    With `metrics` ('json' or 'prometheus'), per-stage wall/CPU time, peak RSS and row counts are
+    written next to the report. With `plots=False` the dashboard is skipped and matplotlib/seaborn are
+    never imported. `figures` selects the dashboard format, DPI, panels and whether the composite and/or
+    separate panel images are written (see dashboard.DEFAULT_FIGURES); they render across `plot_workers`.
+    The input profile gates the run: `quality_gate` 'errors' (default) stops on unusable inputs,
+    'warnings' also on out-of-range values and duplicate titles, 'off' never stops.
+    When line-item royalty statements are present they are reduced in chunks to the per-song amounts;
+    `royalty_rollup` also keeps (and exports) their per song, month and territory totals.
+    The forecast simulates `forecast_paths` trajectories (0 skips it) across `forecast_workers` processes.
+    The input files are read concurrently on `load_workers` threads (default: one per file; 1 reads them
+    one after another). With `warehouse_path`, the inputs are read from (and refreshed into) that SQLite
+    warehouse instead of being parsed again (see warehouse.py).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    print("="*80)
+    print(f"{artist.upper()} ARTIST - COMPREHENSIVE BUSINESS ANALYSIS")
+    print("="*80)
+    print("\nLoading and processing data...\n")
+
+    params = analysis_params(data_dir, output_dir, artist, cache_dir, as_of, state_dir, store_dir, plots, figures,
+                             plot_workers, quality_gate, royalty_rollup, forecast_paths, forecast_workers,
+                             warehouse_path)
+    recorder = instrumentation.Recorder({'artist': artist}) if metrics else None
+    run = STAGES.run(params, memo_dir=memo_dir, file_params=INPUT_FILES,
+                     untracked=('cache_dir', 'warehouse_path', 'audience_state_path', 'audience_store_dir',
+                                'plot_workers', 'forecast_workers'),
+                     artifact_dir=output_dir, recorder=recorder, skip=() if plots else ('plot_dashboard',),
+                     workers=load_workers)
+    if memo_dir:
+        print(f"\nStages recomputed: {len(run.recomputed)}, reused from {memo_dir}: {len(run.reused)}")
+    if recorder:
+        print(f"✓ Saved stage metrics: {recorder.write(output_dir, metrics)}")
+
+    return {'artist': artist, **{name: run[name] for name in SUMMARY_METRICS}}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Comprehensive business analysis for one artist.")
+    parser.add_argument('--data-dir', default=DATA_DIR, help="Directory holding Earnings_Per_Songs/ and Spotify_Analysis/")
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help="Directory for the report, figures and exports")
+    parser.add_argument('--artist', default=ARTIST, help="Artist name used in the export file names")
+    parser.add_argument('--cache-dir', default=None,
+                        help=f"Reuse cleaned input frames cached here (e.g. {ingest_cache.DEFAULT_CACHE_DIR})")
+    parser.add_argument('--as-of', default=None, help="Analysis date (YYYY-MM-DD) for the trailing windows (default: today)")
+    parser.add_argument('--warehouse', default=None,
+                        help="Read the inputs from this SQLite warehouse, loading new or changed files into it")
+    parser.add_argument('--memo-dir', default=None, help="Memoize stage results here and recompute only what changed")
+    parser.add_argument('--state-dir', default=None,
+                        help="Persist the audience timeline state here and fold in only newly appended days")
+    parser.add_argument('--store-dir', default=None,
+                        help="Keep the audience timeline in an append-only memory-mapped store under this directory")
+    parser.add_argument('--metrics', choices=sorted(instrumentation.FORMATS), default=None,
+                        help="Write per-stage timing and memory metrics next to the report in this format")
+    parser.add_argument('--no-plots', action='store_true',
+                        help="Skip the dashboard figure (and the matplotlib/seaborn import)")
+    parser.add_argument('--figure-format', default='png', help="Dashboard image format (png, svg, pdf, jpg, ...)")
+    parser.add_argument('--dpi', type=dashboard.parse_dpi, default=300, help="Dashboard resolution for raster formats")
+    parser.add_argument('--panels', default=None,
+                        help=f"Comma-separated dashboard panels to draw (default: all of {', '.join(dashboard.PANELS)})")
+    parser.add_argument('--separate-panels', action='store_true', help="Also write each panel as its own image in panels/")
+    parser.add_argument('--no-composite', action='store_true', help=f"Skip {dashboard.COMPOSITE_NAME}.<format>")
+    parser.add_argument('--downsample', choices=downsample.METHODS + ('none',), default='minmax',
+                        help="How the follower and stream charts reduce the timeline to the panel's pixel width")
+    parser.add_argument('--plot-workers', type=int, default=None,
+                        help="Processes rendering the dashboard figures (default: CPU count; 1 renders inline)")
+    parser.add_argument('--quality-gate', choices=quality.GATE_LEVELS, default='errors',
+                        help="Stop the run on input errors (default), on warnings too, or never")
+    parser.add_argument('--royalty-rollup', action='store_true',
+                        help="Also keep per song, month and territory totals of the royalty statements")
+    parser.add_argument('--forecast-paths', type=int, default=forecast.DEFAULT_PATHS,
+                        help="Monte Carlo trajectories for the 3/6/12-month forecast (0 skips it)")
+    parser.add_argument('--forecast-workers', type=int, default=None,
+                        help="Processes simulating the forecast (default: CPU count; 1 simulates inline)")
+    parser.add_argument('--load-workers', type=int, default=None,
+                        help="Threads reading the input files (default: one per file; 1 reads them in turn)")
+    args = parser.parse_args()
+    figures = {'format': args.figure_format, 'dpi': args.dpi, 'separate': args.separate_panels,
+               'composite': not args.no_composite, 'panels': args.panels.split(',') if args.panels else None,
+               'downsample': None if args.downsample == 'none' else args.downsample}
+    run_analysis(data_dir=args.data_dir, output_dir=args.output_dir, artist=args.artist, cache_dir=args.cache_dir,
+                 as_of=args.as_of, memo_dir=args.memo_dir, state_dir=args.state_dir, store_dir=args.store_dir,
+                 metrics=args.metrics, plots=not args.no_plots, figures=figures, plot_workers=args.plot_workers,
+                 quality_gate=args.quality_gate, royalty_rollup=args.royalty_rollup,
+                 forecast_paths=args.forecast_paths, forecast_workers=args.forecast_workers,
+                 load_workers=args.load_workers, warehouse_path=args.warehouse)
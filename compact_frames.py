@@ -0,0 +1,100 @@
+"""
+Compact Frame Schema
+Nullable-integer counts, categorical labels, typed dates and interned titles for the loaded exports
+"""
+
+import argparse
+import inspect
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+COUNT_COLUMNS = ('listeners', 'streams', 'saves')
+CATEGORY_COLUMNS = ('Artist', 'Type', 'author')
+TITLE_COLUMNS = ('Song Title', 'song', 'Title')
+DATE_COLUMNS = ('release_date', 'date_added')
+
+# Counts never go below Int32: narrower types overflow silently in element-wise arithmetic
+COUNT_DTYPES = ('Int32', 'Int64')
+
+
+def downcast_counts(series):
+    """Whole-number counts as the narrowest nullable integer type; fractional values stay float."""
+    values = pd.to_numeric(series, errors='coerce')
+    present = values.dropna()
+    if len(present) and not (present == np.floor(present)).all():
+        return values
+    lo, hi = (present.min(), present.max()) if len(present) else (0, 0)
+    for dtype in COUNT_DTYPES:
+        info = np.iinfo(dtype.lower())
+        # Strict upper bound: as a float, the Int64 maximum rounds up to 2**63, which does not fit
+        if info.min <= lo and hi < info.max + 1:
+            return values.astype(dtype)
+    return values
+
+
+def intern_titles(series):
+    # One str object per distinct title, shared by every row and every frame that repeats it
+    return series.map(sys.intern, na_action='ignore')
+
+
+def compact(df):
+    """Apply the compact schema to whichever known columns `df` has."""
+    for name in df.columns:
+        if name in COUNT_COLUMNS:
+            df[name] = downcast_counts(df[name])
+        elif name in CATEGORY_COLUMNS:
+            df[name] = df[name].astype('category')
+        elif name in TITLE_COLUMNS:
+            df[name] = intern_titles(df[name])
+        elif name in DATE_COLUMNS:
+            df[name] = pd.to_datetime(df[name], errors='coerce')
+    return df
+
+
+def category_contains(series, text):
+    """`series.str.contains(text)` evaluated once per category and broadcast through the codes."""
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        return series.str.contains(text, na=False, regex=False)
+    matches = series.cat.categories.str.contains(text, regex=False)
+    # Missing values have code -1, which picks the trailing False
+    return pd.Series(np.append(matches, False)[series.cat.codes.to_numpy()], index=series.index)
+
+
+def footprint(df):
+    """Deep memory use of a frame in bytes."""
+    return int(df.memory_usage(deep=True).sum())
+
+
+def memory_report(paths, parsers):
+    """Default-typed versus compact footprint of every input with a compacting parser, in bytes."""
+    rows = []
+    for name, path in paths.items():
+        parser = parsers.get(name)
+        if parser is None or not os.path.exists(path) or 'compact' not in inspect.signature(parser).parameters:
+            continue
+        rows.append({'input': name, 'default_bytes': footprint(parser(path, compact=False)),
+                     'compact_bytes': footprint(parser(path))})
+    report = pd.DataFrame(rows)
+    report['saved_pct'] = (1 - report['compact_bytes'] / report['default_bytes']) * 100
+    return report
+
+
+if __name__ == "__main__":
+    import big_nose_analysis as analysis
+
+    parser = argparse.ArgumentParser(description="Report the default versus compact memory footprint of the inputs.")
+    parser.add_argument('--data-dir', default=analysis.DATA_DIR)
+    parser.add_argument('--artist', default=analysis.ARTIST)
+    args = parser.parse_args()
+    paths = {name: os.path.join(args.data_dir, path.format(artist=args.artist))
+             for name, path in analysis.INPUT_FILES.items()}
+    report = memory_report(paths, analysis.INPUT_PARSERS)
+    for row in report.itertuples():
+        print(f"   {row.input:<24} {row.default_bytes / 1024:>10,.1f} KB -> {row.compact_bytes / 1024:>10,.1f} KB "
+              f"({row.saved_pct:.0f}% smaller)")
+    total_before, total_after = report['default_bytes'].sum(), report['compact_bytes'].sum()
+    print(f"   {'total':<24} {total_before / 1024:>10,.1f} KB -> {total_after / 1024:>10,.1f} KB "
+          f"({(1 - total_after / total_before) * 100:.0f}% smaller)")
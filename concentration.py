@@ -0,0 +1,97 @@
+"""
+Revenue Concentration
+Pareto curve, Gini coefficient and HHI of earnings and streams per release-year cohort and rolling window
+"""
+
+import numpy as np
+import pandas as pd
+
+METRICS = ('Amount', 'streams')
+
+# Release years spanned by each rolling window
+WINDOW_YEARS = 3
+
+# Top-k song counts and top fractions of the catalog whose share of the total is reported
+TOP_COUNTS = (1, 5)
+TOP_FRACTIONS = (0.1, 0.2)
+
+# Share of the total the `songs_for_80pct` column counts songs up to
+PARETO_SHARE = 0.8
+
+# Gini at or above which earnings count as concentrated in a few songs
+HIGH_GINI = 0.6
+
+COLUMNS = ['scope', 'start_year', 'end_year', 'metric', 'songs', 'total', 'top1_share', 'top5_share',
+           'top10pct_share', 'top20pct_share', 'songs_for_80pct', 'gini', 'hhi', 'effective_songs']
+
+
+def summarize(values):
+    """Concentration figures of `values` sorted in descending order, from their running total.
+
+    With the descending cumulative sums C_1..C_n of n values totalling T, the top-k share is C_k / T,
+    the Gini coefficient 2 * sum(C) / (n * T) - (n + 1) / n, and the HHI the sum of squared shares
+    (`effective_songs` = 1 / HHI is the number of equal earners it corresponds to).
+    """
+    n = len(values)
+    cumulative = np.cumsum(values)
+    total = cumulative[-1] if n else 0.0
+    row = {'songs': n, 'total': total}
+    if n == 0 or total <= 0:
+        return row
+    shares = cumulative / total
+    for k in TOP_COUNTS:
+        row[f'top{k}_share'] = shares[min(k, n) - 1]
+    for fraction in TOP_FRACTIONS:
+        row[f'top{round(fraction * 100)}pct_share'] = shares[max(int(np.ceil(fraction * n)), 1) - 1]
+    row['songs_for_80pct'] = int(np.searchsorted(shares, PARETO_SHARE - 1e-12)) + 1
+    row['gini'] = 2 * cumulative.sum() / (n * total) - (n + 1) / n
+    row['hhi'] = float(np.sum((values / total) ** 2))
+    row['effective_songs'] = 1 / row['hhi']
+    return row
+
+
+def pareto_curve(values, points=100):
+    """Share of the total earned by the top 1%..100% of songs, from values sorted in descending order."""
+    n = len(values)
+    pct = np.arange(1, points + 1) * 100 / points
+    if n == 0 or values.sum() <= 0:
+        return pd.DataFrame({'songs_pct': pct, 'share': np.nan})
+    shares = np.cumsum(values) / values.sum()
+    return pd.DataFrame({'songs_pct': pct, 'share': shares[np.maximum(np.ceil(pct / 100 * n).astype(int), 1) - 1]})
+
+
+def concentration(frame, ranking, year_column='release_year', metrics=METRICS, window_years=WINDOW_YEARS):
+    """Concentration of each metric over the whole catalog, each release year and each rolling window.
+
+    The songs are taken once in the descending order `ranking` (a RankingIndex of `frame`) already
+    holds; any cohort or window is a mask over that order, which keeps it sorted, so every row is one
+    cumulative sum and no subset is sorted again. Missing values are left out and negative ones
+    (reversals) count as zero. Returns the table (scope 'all', 'cohort' or 'rolling', with the
+    inclusive release-year range) and the catalog's Pareto curve per metric.
+    """
+    rows, curves = [], []
+    for metric in metrics:
+        if metric not in ranking.order:
+            continue
+        order = ranking.order[metric]
+        values = frame[metric].to_numpy(dtype=float, na_value=np.nan)[order]
+        years = frame[year_column].to_numpy(dtype=float, na_value=np.nan)[order]
+        known = ~np.isnan(values)
+        values, years = np.maximum(values[known], 0), years[known]
+
+        rows.append({'scope': 'all', 'metric': metric, **summarize(values)})
+        curves.append(pareto_curve(values).assign(metric=metric))
+        dated = years[~np.isnan(years)].astype(int)
+        if len(dated) == 0:
+            continue
+        first, last = dated.min(), dated.max()
+        windows = [('cohort', year, year) for year in np.unique(dated)]
+        windows += [('rolling', end - window_years + 1, end) for end in range(first + window_years - 1, last + 1)]
+        for scope, start, end in windows:
+            rows.append({'scope': scope, 'start_year': start, 'end_year': end, 'metric': metric,
+                         **summarize(values[(years >= start) & (years <= end)])})
+
+    table = pd.DataFrame(rows).reindex(columns=COLUMNS)
+    table = table.astype({'start_year': 'Int64', 'end_year': 'Int64', 'songs': int, 'songs_for_80pct': 'Int64'})
+    curve = pd.concat(curves, ignore_index=True)[['metric', 'songs_pct', 'share']] if curves else None
+    return table, curve
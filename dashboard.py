@@ -0,0 +1,268 @@
+"""
+Dashboard Rendering
+The PART 7 panels as independent render jobs: composite figure, separate panel images, or both
+"""
+
+import argparse
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+import downsample
+from worker_pool import pool_context
+
+COMPOSITE_NAME = 'comprehensive_analysis'
+
+# Composite layout: two panels per row, each panel cell 10 x 6 inches (the original 20 x 24 for eight)
+PANEL_SIZE = (10, 6)
+
+# Modules the render workers need; the forkserver imports them once
+WORKER_MODULES = ['dashboard', 'matplotlib.pyplot', 'seaborn']
+
+DEFAULT_FIGURES = {'format': 'png', 'dpi': 300, 'panels': None, 'separate': False, 'composite': True,
+                   'downsample': 'minmax'}
+
+_pyplot = None
+
+
+def pyplot():
+    """matplotlib.pyplot with the report style, imported on first use so number-only runs skip it."""
+    global _pyplot
+    if _pyplot is None:
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+
+        # Set style for professional visualizations
+        plt.style.use('seaborn-v0_8-darkgrid')
+        sns.set_palette("husl")
+        _pyplot = plt
+    return _pyplot
+
+
+def _short_titles(titles):
+    return [s[:30] + '...' if len(s) > 30 else s for s in titles]
+
+
+# ============================================================================
+# PANELS (each draws one axes from its pre-aggregated data)
+# ============================================================================
+
+def draw_earnings_by_year(ax, data):
+    # 1. Earnings Over Time (5 years)
+    earnings_by_year_plot = data
+    ax.bar(earnings_by_year_plot.index, earnings_by_year_plot.values, color='#2ecc71')
+    ax.set_title('Total Earnings by Release Year (Last 5 Years)', fontsize=14, fontweight='bold')
+    ax.set_xlabel('Year')
+    ax.set_ylabel('Earnings ($)')
+    ax.grid(True, alpha=0.3)
+    for i, v in enumerate(earnings_by_year_plot.values):
+        ax.text(earnings_by_year_plot.index[i], v, f'${v:,.0f}', ha='center', va='bottom', fontsize=9)
+
+
+def draw_top_earning_songs(ax, data):
+    # 2. Top Earning Songs
+    ax.barh(range(len(data)), data['Amount'].values, color='#3498db')
+    ax.set_yticks(range(len(data)))
+    ax.set_yticklabels(_short_titles(data['Song Title'].values), fontsize=8)
+    ax.set_title('Top 10 Earning Songs (All Time)', fontsize=14, fontweight='bold')
+    ax.set_xlabel('Earnings ($)')
+    ax.grid(True, alpha=0.3, axis='x')
+
+
+def draw_follower_growth(ax, data):
+    # 3. Follower Growth Over Time
+    ax.plot(data['date'], data['followers'], linewidth=2, color='#e74c3c')
+    ax.set_title('Follower Growth (Last Year)', fontsize=14, fontweight='bold')
+    ax.set_xlabel('Date')
+    ax.set_ylabel('Followers')
+    ax.grid(True, alpha=0.3)
+    ax.tick_params(axis='x', rotation=45)
+
+
+def draw_daily_streams(ax, data):
+    # 4. Streams Over Time (Last Year)
+    ax.plot(data['date'], data['streams'], linewidth=2, color='#9b59b6')
+    ax.set_title('Daily Streams (Last Year)', fontsize=14, fontweight='bold')
+    ax.set_xlabel('Date')
+    ax.set_ylabel('Streams')
+    ax.grid(True, alpha=0.3)
+    ax.tick_params(axis='x', rotation=45)
+
+
+def draw_top_streamed_songs(ax, data):
+    # 5. Top Performing Songs (1 Year)
+    ax.barh(range(len(data)), data['streams'].values, color='#f39c12')
+    ax.set_yticks(range(len(data)))
+    ax.set_yticklabels(_short_titles(data['song'].values), fontsize=8)
+    ax.set_title('Top 10 Songs by Streams (Last Year)', fontsize=14, fontweight='bold')
+    ax.set_xlabel('Streams')
+    ax.grid(True, alpha=0.3, axis='x')
+
+
+def draw_earnings_vs_streams(ax, data):
+    # 6. Earnings vs Streams Correlation
+    if len(data) > 0:
+        ax.scatter(data['streams'], data['Amount'], alpha=0.6, s=50, color='#1abc9c')
+        ax.set_title('Earnings vs Streams Correlation', fontsize=14, fontweight='bold')
+        ax.set_xlabel('Streams')
+        ax.set_ylabel('Earnings ($)')
+        ax.set_xscale('log')
+        ax.grid(True, alpha=0.3)
+
+
+def draw_listener_distribution(ax, data):
+    # 7. Listener Categories (Recent)
+    categories = ['Monthly Active', 'Previously Active', 'Programmed']
+    colors = ['#2ecc71', '#3498db', '#95a5a6']
+    ax.pie(data, labels=categories, autopct='%1.1f%%', colors=colors, startangle=90)
+    ax.set_title('Listener Distribution (Last 28 Days)', fontsize=14, fontweight='bold')
+
+
+def draw_songs_by_year(ax, data):
+    # 8. Songs Released Over Time
+    ax.bar(data.index, data.values, color='#e67e22')
+    ax.set_title('Number of Songs Released by Year', fontsize=14, fontweight='bold')
+    ax.set_xlabel('Year')
+    ax.set_ylabel('Number of Songs')
+    ax.grid(True, alpha=0.3, axis='y')
+
+
+PANELS = {
+    'earnings_by_year': draw_earnings_by_year,
+    'top_earning_songs': draw_top_earning_songs,
+    'follower_growth': draw_follower_growth,
+    'daily_streams': draw_daily_streams,
+    'top_streamed_songs': draw_top_streamed_songs,
+    'earnings_vs_streams': draw_earnings_vs_streams,
+    'listener_distribution': draw_listener_distribution,
+    'songs_by_year': draw_songs_by_year,
+}
+
+
+def panel_data(name, earnings_by_year, earnings_df, earnings_rank, audience_1yr, songs_1year_rank,
+               monthly_active_listeners, previously_active_listeners, programmed_listeners, figures=None):
+    """The small aggregate a panel draws, so render jobs never ship the full frames.
+
+    The timeline panels are reduced to the panel's width in pixels with the `downsample` method of
+    `figures`, so their size stays flat however long or finely sampled the history is.
+    """
+    if name == 'earnings_by_year':
+        return earnings_by_year['Amount']
+    if name == 'top_earning_songs':
+        return earnings_rank.top('Amount', 10, ['Song Title', 'Amount'])
+    if name == 'follower_growth':
+        # Every follower reading of the window
+        followers = audience_1yr.set_index('date')['followers']
+        return timeline_points(followers, figures)
+    if name == 'daily_streams':
+        # Streams of each day of the window
+        streams = audience_1yr.groupby(audience_1yr['date'].dt.floor('D'))['streams'].sum(min_count=1)
+        return timeline_points(streams, figures)
+    if name == 'top_streamed_songs':
+        return songs_1year_rank.top('streams', 10, ['song', 'streams'])
+    if name == 'earnings_vs_streams':
+        return earnings_df.loc[earnings_df['streams'].notna() & (earnings_df['streams'] > 0), ['streams', 'Amount']]
+    if name == 'listener_distribution':
+        return [monthly_active_listeners, previously_active_listeners, programmed_listeners]
+    if name == 'songs_by_year':
+        return earnings_df.groupby('release_year').size()
+    raise KeyError(f"Unknown panel {name!r}; panels are {', '.join(PANELS)}")
+
+
+def point_budget(figures=None):
+    """Points a timeline panel needs: one per pixel column of the panel at the figure's DPI."""
+    options = figure_options(figures)
+    return int(PANEL_SIZE[0] * options['dpi'])
+
+
+def timeline_points(series, figures=None):
+    """A date-indexed series as the `date`/value frame a timeline panel draws, downsampled to its budget."""
+    method = figure_options(figures)['downsample']
+    series = series.dropna() if method is None else downsample.downsample(series, point_budget(figures), method)
+    return pd.DataFrame({'date': series.index, series.name: series.to_numpy()})
+
+
+# ============================================================================
+# RENDERING
+# ============================================================================
+
+def figure_options(figures=None):
+    """`figures` completed with the defaults and validated."""
+    options = {**DEFAULT_FIGURES, **(figures or {})}
+    unknown = [name for name in options['panels'] or () if name not in PANELS]
+    if unknown:
+        raise ValueError(f"Unknown panels {unknown}; panels are {', '.join(PANELS)}")
+    if not options['dpi'] >= 1:
+        raise ValueError(f"DPI must be at least 1, got {options['dpi']!r}")
+    if options['downsample'] not in downsample.METHODS + (None,):
+        raise ValueError(f"Unknown downsampling method {options['downsample']!r}; "
+                         f"choose from {', '.join(downsample.METHODS)} or None")
+    return options
+
+
+def parse_dpi(text):
+    """`--dpi` value: a positive integer."""
+    try:
+        dpi = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected an integer DPI, got {text!r}")
+    if dpi < 1:
+        raise argparse.ArgumentTypeError(f"DPI must be at least 1, got {dpi}")
+    return dpi
+
+
+def selected_panels(options):
+    return list(options['panels'] or PANELS)
+
+
+def output_files(figures=None):
+    """Files (relative to the output directory) a render with these options writes."""
+    options = figure_options(figures)
+    files = [f"{COMPOSITE_NAME}.{options['format']}"] if options['composite'] else []
+    if options['separate']:
+        files += [os.path.join('panels', f"{name}.{options['format']}") for name in selected_panels(options)]
+    return files
+
+
+def render_figure(path, panels, dpi, composite):
+    """Draw `panels` ([(name, data)]) into one figure and save it; runs in a pool worker or inline."""
+    plt = pyplot()
+    if composite:
+        rows, cols = math.ceil(len(panels) / 2), min(len(panels), 2)
+        fig = plt.figure(figsize=(PANEL_SIZE[0] * cols, PANEL_SIZE[1] * rows))
+    else:
+        rows, cols = 1, 1
+        fig = plt.figure(figsize=PANEL_SIZE)
+    for i, (name, data) in enumerate(panels, 1):
+        PANELS[name](fig.add_subplot(rows, cols, i), data)
+    fig.tight_layout()
+    fig.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close(fig)
+    return path
+
+
+def render_dashboard(output_dir, data, figures=None, workers=None):
+    """Render the composite and/or separate panel images and return their paths.
+
+    `data` maps panel names to their panel_data(). With more than one job and `workers` != 1,
+    the figures are rendered in parallel, one process per figure.
+    """
+    options = figure_options(figures)
+    panels = [(name, data[name]) for name in selected_panels(options)]
+    jobs = []
+    if options['composite']:
+        jobs.append((os.path.join(output_dir, f"{COMPOSITE_NAME}.{options['format']}"), panels, True))
+    if options['separate']:
+        os.makedirs(os.path.join(output_dir, 'panels'), exist_ok=True)
+        jobs += [(os.path.join(output_dir, 'panels', f"{name}.{options['format']}"), [(name, panel)], False)
+                 for name, panel in panels]
+
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    if workers <= 1:
+        return [render_figure(path, job_panels, options['dpi'], composite) for path, job_panels, composite in jobs]
+    with ProcessPoolExecutor(max_workers=workers, mp_context=pool_context(WORKER_MODULES)) as pool:
+        futures = [pool.submit(render_figure, path, job_panels, options['dpi'], composite)
+                   for path, job_panels, composite in jobs]
+        return [future.result() for future in futures]
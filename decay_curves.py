@@ -0,0 +1,191 @@
+"""
+Release-Age Decay Curves
+Exponential stream decay fitted for every song and release cohort at once, with the expected remaining value
+"""
+
+import numpy as np
+import pandas as pd
+
+# Songs need this many lifetime streams before their own decay rate is trusted
+MIN_STREAMS = 100
+
+# Decay rates (e-folds per year; negative rates are growth) are searched within +/- this bound
+MAX_RATE = 5.0
+
+# Ages beyond this many years are clipped, keeping exp(rate * age) finite
+MAX_AGE_YEARS = 100
+
+# Fitted songs a release-year cohort needs before its own rate is used for its newer songs
+MIN_COHORT_SONGS = 3
+
+# Bisection halvings of the rate bracket for the per-song fits
+BISECTION_STEPS = 60
+
+# Gauss-Newton steps of the cohort fits
+COHORT_STEPS = 25
+
+# Years of future streams counted in the expected remaining value
+HORIZON_YEARS = 10
+
+SONG_COLUMNS = ['title', 'release_year', 'age_years', 'lifetime_streams', 'streams_1yr', 'amount', 'earnings_matched',
+                'recent_share', 'decay_rate', 'rate_source', 'saturated', 'half_life_years', 'remaining_streams',
+                'remaining_value', 'lifetime_value']
+
+
+def recent_share(rate, age):
+    """Share of a song's lifetime streams earned in its last year under exponential decay at `rate`.
+
+    With daily streams proportional to exp(-rate * t), the share is expm1(rate) / expm1(rate * age),
+    which falls from 1 (fast growth) through 1 / age (flat) to 0 (fast decay) as the rate rises.
+    """
+    rate, age = np.broadcast_arrays(np.asarray(rate, dtype=float), np.asarray(age, dtype=float))
+    flat = np.abs(rate) < 1e-9
+    with np.errstate(divide='ignore', invalid='ignore'):
+        share = np.expm1(rate) / np.expm1(rate * age)
+    return np.where(flat, 1 / age, share)
+
+
+def _log_share_slope(rate, age):
+    # d log(recent_share) / d rate, with its series expansion near a flat rate
+    small = np.abs(rate) < 1e-4
+    safe = np.where(small, 1.0, rate)
+    with np.errstate(over='ignore'):
+        slope = 1 / -np.expm1(-safe) - age / -np.expm1(-safe * age)
+    return np.where(small, (1 - age) / 2 + rate * (1 - age ** 2) / 12, slope)
+
+
+def fit_song_rates(share, age):
+    """Decay rate reproducing each song's last-year share, for every song at once.
+
+    The share falls monotonically with the rate when the song is older than a year, so one vectorized
+    bisection over the bracket [-MAX_RATE, MAX_RATE] solves all songs together. Shares outside the
+    bracket's range (almost no streams last year, or nearly all of them) cannot be reproduced and end
+    at its bounds; `saturated` flags those rates.
+    """
+    lo = np.full(len(share), -MAX_RATE)
+    hi = np.full(len(share), MAX_RATE)
+    for _ in range(BISECTION_STEPS):
+        mid = (lo + hi) / 2
+        too_slow = recent_share(mid, age) > share
+        lo = np.where(too_slow, mid, lo)
+        hi = np.where(too_slow, hi, mid)
+    return (lo + hi) / 2
+
+
+def saturated(rates):
+    """Whether each fitted rate ended at a bound of the bisection bracket rather than on a solution."""
+    return np.abs(rates) >= MAX_RATE * (1 - 1e-9)
+
+
+def fit_cohort_rates(share, age, cohort, cohorts):
+    """Least-squares decay rate of each cohort: min over rate of sum((log share - log recent_share)^2).
+
+    Every cohort is one parameter, so all of them take the same Gauss-Newton step together: residuals
+    and slopes are summed per cohort with bincount. Cohorts without songs get NaN.
+    """
+    counts = np.bincount(cohort, minlength=cohorts)
+    rates = np.zeros(cohorts)
+    target = np.log(np.clip(share, 1e-12, 1))
+    for _ in range(COHORT_STEPS):
+        rate = rates[cohort]
+        residual = target - np.log(np.clip(recent_share(rate, age), 1e-300, None))
+        slope = _log_share_slope(rate, age)
+        step = np.bincount(cohort, weights=slope * residual, minlength=cohorts) / np.maximum(
+            np.bincount(cohort, weights=slope ** 2, minlength=cohorts), 1e-12)
+        rates = np.clip(rates + np.clip(step, -1, 1), -MAX_RATE, MAX_RATE)
+    return np.where(counts > 0, rates, np.nan)
+
+
+def remaining_streams(rate, age, recent_streams, horizon_years=HORIZON_YEARS):
+    """Streams expected over the next `horizon_years` from the last year's (or whole life's) streams.
+
+    Songs are projected at their decay rate floored at zero: a growing song is assumed to hold its
+    current pace rather than keep growing.
+    """
+    rate = np.maximum(rate, 0)
+    window = np.clip(age, 1 / 365.25, 1)
+    flat = rate < 1e-9
+    safe = np.where(flat, 1.0, rate)
+    decaying = recent_streams * -np.expm1(-safe * horizon_years) / np.expm1(safe * window)
+    return np.where(flat, recent_streams * horizon_years / window, decaying)
+
+
+def fit_decay(song_metrics, release_days, as_of, horizon_years=HORIZON_YEARS):
+    """Per-song decay table and per-cohort summary for the whole catalog.
+
+    `song_metrics` is the cross-source per-song table (lifetime and 1-year streams, earnings) and
+    `release_days` each song's release day. A song older than a year with MIN_STREAMS lifetime
+    streams gets its own rate (`rate_source` 'song'); newer or sparser songs take their release-year
+    cohort's least-squares rate ('cohort', with at least MIN_COHORT_SONGS fitted songs), or else the
+    whole catalog's ('catalog'). Song rates clamped at +/-MAX_RATE are flagged `saturated` and left
+    out of the cohort and catalog fits; the cohort table counts them separately. The remaining value
+    is the remaining streams at the song's own revenue per lifetime stream; as in the forecast, songs
+    without an earnings row earn nothing per stream (`earnings_matched` is False, and the cohort
+    table's `matched_streams` counts only the remaining streams of matched songs).
+    """
+    as_of_day = (pd.Timestamp(as_of) - pd.Timestamp(0)).days
+    age = np.clip((as_of_day - release_days) / 365.25, 0, MAX_AGE_YEARS)
+    lifetime = song_metrics['lifetime_streams'].to_numpy(dtype=float)
+    recent = song_metrics['streams_1yr'].to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        share = np.where(lifetime > 0, np.clip(recent / lifetime, 0, 1), np.nan)
+    known = ~np.isnan(release_days)
+    days = np.where(known, release_days, 0).astype(np.int64).astype('datetime64[D]')
+    release_year = np.where(known, days.astype('datetime64[Y]').astype(np.int64) + 1970, np.nan)
+
+    songs = pd.DataFrame({'title': song_metrics['title'], 'release_year': pd.array(release_year, dtype='Int64'),
+                          'age_years': age, 'lifetime_streams': lifetime, 'streams_1yr': recent,
+                          'amount': song_metrics['amount'], 'recent_share': share}, index=song_metrics.index)
+    fitted = (age > 1) & (lifetime >= MIN_STREAMS) & ~np.isnan(share)
+    rates = np.full(len(songs), np.nan)
+    rates[fitted] = fit_song_rates(share[fitted], age[fitted])
+    clamped = fitted & saturated(np.nan_to_num(rates))
+
+    # Cohort rates from the unsaturated fitted songs of each release year, plus the catalog as one more cohort
+    exact = fitted & ~clamped
+    years, cohort = np.unique(np.where(exact, release_year, -1).astype(np.int64), return_inverse=True)
+    catalog = len(years)
+    pooled_cohort = np.r_[cohort[exact], np.full(exact.sum(), catalog)]
+    pooled = fit_cohort_rates(np.r_[share[exact], share[exact]], np.r_[age[exact], age[exact]],
+                              pooled_cohort, catalog + 1)
+    sizes = np.bincount(cohort[exact], minlength=catalog)
+    cohort_rates = pd.Series(np.where(sizes >= MIN_COHORT_SONGS, pooled[:catalog], np.nan), index=years)
+    cohort_rates = cohort_rates.drop(-1, errors='ignore').dropna()
+    catalog_rate = pooled[catalog]
+
+    by_cohort = songs['release_year'].map(cohort_rates).to_numpy(dtype=float, na_value=np.nan)
+    source = np.where(fitted, 'song', np.where(~np.isnan(by_cohort), 'cohort', 'catalog'))
+    rates = np.where(fitted, rates, np.where(~np.isnan(by_cohort), by_cohort, catalog_rate))
+    songs['decay_rate'] = rates
+    songs['rate_source'] = np.where(np.isnan(rates), None, source)
+    songs['saturated'] = clamped
+    songs['half_life_years'] = np.where(rates > 0, np.log(2) / np.where(rates > 0, rates, 1), np.nan)
+
+    # Songs younger than a year have both windows covering their whole life
+    window_streams = np.where(age >= 1, recent, np.fmax(recent, lifetime))
+    songs['remaining_streams'] = remaining_streams(rates, age, window_streams, horizon_years)
+    amount = songs['amount'].to_numpy(dtype=float, na_value=np.nan)
+    matched = ~np.isnan(amount)
+    songs['earnings_matched'] = matched
+    # Without any earnings rows there is no revenue to project at all
+    if matched.any():
+        amount = np.where(matched, amount, 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        per_stream = np.where(lifetime > 0, amount / lifetime, 0)
+    songs['remaining_value'] = songs['remaining_streams'] * per_stream
+    songs['lifetime_value'] = amount + songs['remaining_value']
+    songs = songs[SONG_COLUMNS]
+
+    grouped = songs.groupby('release_year')
+    cohorts = pd.DataFrame({
+        'songs': grouped.size(),
+        'fitted_songs': ((songs['rate_source'] == 'song') & ~songs['saturated']).groupby(songs['release_year']).sum(),
+        'saturated_songs': songs['saturated'].groupby(songs['release_year']).sum(),
+        'decay_rate': cohort_rates.reindex(grouped.size().index),
+        'remaining_streams': grouped['remaining_streams'].sum(min_count=1),
+        'matched_streams': songs['remaining_streams'].where(songs['earnings_matched'], 0).groupby(
+            songs['release_year']).sum(),
+        'remaining_value': grouped['remaining_value'].sum(min_count=1),
+    })
+    cohorts['half_life_years'] = np.log(2) / cohorts['decay_rate'].where(cohorts['decay_rate'] > 0)
+    return songs, cohorts, catalog_rate
@@ -0,0 +1,75 @@
+"""
+Time Series Downsampling
+Shape-preserving reduction of long series to a plotting point budget (min/max bucketing and LTTB)
+"""
+
+import numpy as np
+import pandas as pd
+
+METHODS = ('minmax', 'lttb')
+
+# Smallest budget either method works with: the two endpoints plus one bucket's pair of extremes
+MIN_BUDGET = 4
+
+
+def minmax(y, budget):
+    """Positions of at most `budget` points: the minimum and maximum of each bucket, in time order.
+
+    The first and last points always stay. Every bucket keeps both of its extremes, so a spike is
+    never averaged away however long the series grows. Budgets below MIN_BUDGET are raised to it.
+    `y` must not contain NaN.
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    budget = max(int(budget), MIN_BUDGET)
+    if n <= budget:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, (budget - 2) // 2 + 1).astype(np.int64)
+    inner, starts = y[1:n - 1], edges[:-1] - 1
+    kept = [[0, n - 1]]
+    for reduce in (np.minimum, np.maximum):
+        # First position in each bucket holding the bucket's extreme
+        hits = np.flatnonzero(inner == np.repeat(reduce.reduceat(inner, starts), np.diff(edges)))
+        kept.append(hits[np.searchsorted(hits, starts)] + 1)
+    return np.unique(np.concatenate(kept))
+
+
+def lttb(x, y, budget):
+    """Positions of at most `budget` points chosen by Largest-Triangle-Three-Buckets.
+
+    Each bucket keeps the point forming the largest triangle with the point kept before it and the
+    next bucket's average, which follows the visual shape of the line closely. The loop runs once per
+    kept point, each step a vectorized pass over one bucket. Budgets below MIN_BUDGET are raised to it.
+    """
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    n = len(y)
+    budget = max(int(budget), MIN_BUDGET)
+    if n <= budget:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, budget - 1).astype(np.int64)
+    counts = np.diff(edges)
+    mean_x = np.add.reduceat(x[:n - 1], edges[:-1]) / counts
+    mean_y = np.add.reduceat(y[:n - 1], edges[:-1]) / counts
+    # The last bucket looks ahead to the final point
+    mean_x, mean_y = np.r_[mean_x[1:], x[-1]], np.r_[mean_y[1:], y[-1]]
+
+    keep = np.empty(budget, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(budget - 2):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs((x[a] - mean_x[i]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (mean_y[i] - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+
+def downsample(series, budget, method='minmax'):
+    """`series` (indexed by date) reduced to at most `budget` points; missing values are dropped first."""
+    if method not in METHODS:
+        raise ValueError(f"Unknown downsampling method {method!r}; choose from {', '.join(METHODS)}")
+    series = series.dropna()
+    if method == 'minmax':
+        return series.iloc[minmax(series.to_numpy(dtype=float), budget)]
+    seconds = (pd.DatetimeIndex(series.index) - pd.Timestamp(0)).total_seconds()
+    return series.iloc[lttb(seconds, series.to_numpy(dtype=float), budget)]
@@ -0,0 +1,124 @@
+"""
+Audience & Revenue Forecast
+Monte Carlo block-bootstrap trajectories of followers, streams and revenue, summarized as percentile bands
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from worker_pool import pool_context
+
+HORIZON_MONTHS = (3, 6, 12)
+PERCENTILES = (5, 25, 50, 75, 95)
+FORECAST_METRICS = ('followers', 'streams', 'revenue')
+
+DEFAULT_PATHS = 50_000
+SEED = 0
+
+# Trajectories per simulation job: fixed, so the result does not depend on the worker count
+CHUNK_PATHS = 12_500
+
+# Consecutive weeks are resampled together, keeping short-run momentum in the trajectories
+BLOCK_WEEKS = 4
+
+# Songs are pooled into at most this many groups before the revenue rate is bootstrapped, so a
+# trajectory's resample costs the same for any catalog size (smaller catalogs resample single songs)
+RATE_GROUPS = 512
+
+
+def _horizon_weeks(months):
+    return int(round(months * 52 / 12))
+
+
+def fit_model(weekly_audience, song_metrics):
+    """Bootstrap inputs from complete calendar weeks of the timeline and each song's lifetime earnings.
+
+    Returns None when fewer than two complete weeks are available.
+    """
+    weeks = weekly_audience[(weekly_audience['days'] == 7) & weekly_audience['followers'].notna()
+                            & weekly_audience['streams'].notna()]
+    if len(weeks) < 2:
+        return None
+    followers = weeks['followers'].to_numpy(dtype=float)
+    streams = weeks['streams'].to_numpy(dtype=float)
+    # Week-over-week follower change and log stream ratio, resampled jointly so they stay correlated
+    changes = np.column_stack([np.diff(followers), np.diff(np.log1p(streams))])
+
+    # Lifetime earnings over lifetime streams per song (the Amount column is lifetime money, so it is
+    # never divided by a 1-year stream count). Songs without an earnings row count as earning nothing:
+    # their streams are still in the audience timeline the rate is applied to. Every trajectory's
+    # revenue per stream is the pooled rate of a resample of the song groups
+    lifetime = song_metrics['lifetime_streams'].to_numpy(dtype=float, na_value=np.nan)
+    amount = song_metrics['amount'].to_numpy(dtype=float, na_value=np.nan)
+    streamed = lifetime > 0
+    if np.isnan(amount[streamed]).all():
+        streamed[:] = False
+    group = np.arange(streamed.sum()) % RATE_GROUPS
+    return {
+        'followers': float(weekly_audience['followers'].dropna().iloc[-1]),
+        'weekly_streams': streams[-1],
+        'changes': changes,
+        'earnings': np.bincount(group, weights=np.nan_to_num(amount[streamed])),
+        'earning_streams': np.bincount(group, weights=lifetime[streamed]),
+    }
+
+
+def historical_rate(model):
+    """Revenue per stream of the whole catalog, the centre of the bootstrapped rates (NaN without earnings)."""
+    streams = model['earning_streams'].sum()
+    return model['earnings'].sum() / streams if streams > 0 else np.nan
+
+
+def _simulate(model, paths, seed):
+    # (metrics, paths, horizons) values of one chunk of trajectories
+    rng = np.random.default_rng(seed)
+    weeks = _horizon_weeks(max(HORIZON_MONTHS))
+    history = model['changes']
+    block = min(BLOCK_WEEKS, len(history))
+    starts = rng.integers(0, len(history) - block + 1, size=(paths, -(-weeks // block)))
+    steps = history[(starts[:, :, None] + np.arange(block)).reshape(paths, -1)[:, :weeks]]
+
+    followers = np.maximum(model['followers'] + np.cumsum(steps[:, :, 0], axis=1), 0)
+    weekly_streams = np.expm1(np.log1p(model['weekly_streams']) + np.cumsum(steps[:, :, 1], axis=1))
+    streams = np.cumsum(np.maximum(weekly_streams, 0), axis=1)
+    groups = len(model['earnings'])
+    if groups:
+        sample = rng.integers(0, groups, size=(paths, groups))
+        rate = model['earnings'][sample].sum(axis=1) / model['earning_streams'][sample].sum(axis=1)
+        revenue = streams * rate[:, None]
+    else:
+        revenue = np.full_like(streams, np.nan)
+
+    columns = [_horizon_weeks(months) - 1 for months in HORIZON_MONTHS]
+    return np.stack([followers[:, columns], streams[:, columns], revenue[:, columns]])
+
+
+def forecast(weekly_audience, song_metrics, paths=DEFAULT_PATHS, workers=None, seed=SEED):
+    """Percentile bands of followers, cumulative streams and cumulative revenue at each horizon.
+
+    Trajectories are simulated in fixed-size chunks with independent seeds; with more than one chunk
+    and `workers` != 1 the chunks run in parallel, one process per core. Returns None when the timeline
+    is too short to fit.
+    """
+    model = fit_model(weekly_audience, song_metrics)
+    if model is None or paths <= 0:
+        return None
+    sizes = [min(CHUNK_PATHS, paths - start) for start in range(0, paths, CHUNK_PATHS)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    workers = min(workers or os.cpu_count() or 1, len(sizes))
+    if workers <= 1:
+        chunks = [_simulate(model, size, chunk_seed) for size, chunk_seed in zip(sizes, seeds)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=pool_context(['forecast'])) as pool:
+            chunks = list(pool.map(_simulate, [model] * len(sizes), sizes, seeds))
+    values = np.concatenate(chunks, axis=1)
+
+    bands = np.percentile(values, PERCENTILES, axis=1)
+    rows = [{'metric': metric, 'months': months,
+             **{f'p{p}': bands[i, m, h] for i, p in enumerate(PERCENTILES)}}
+            for m, metric in enumerate(FORECAST_METRICS) for h, months in enumerate(HORIZON_MONTHS)]
+    return pd.DataFrame(rows)
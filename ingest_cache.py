@@ -0,0 +1,218 @@
+"""
+Ingest Cache
+Content-hash-keyed columnar cache of the cleaned, typed input frames
+"""
+
+import functools
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Bump when the on-disk layout changes
+CACHE_VERSION = 3
+
+DEFAULT_CACHE_DIR = '.ingest_cache'
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _code_payload(code):
+    # Nested code objects (comprehensions, lambdas) repr with their memory address, so recurse instead
+    consts = [_code_payload(c) if hasattr(c, 'co_code') else repr(c) for c in code.co_consts]
+    return f"{code.co_code.hex()}|{code.co_names}|{'|'.join(consts)}"
+
+
+def _code_names(code):
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if hasattr(const, 'co_code'):
+            names |= _code_names(const)
+    return names
+
+
+def _local_module(obj, root):
+    # The project module `obj` is or was defined in (None for the standard library and site-packages)
+    module = obj if inspect.ismodule(obj) else sys.modules.get(getattr(obj, '__module__', None) or '')
+    path = getattr(module, '__file__', None)
+    return module if path and os.path.dirname(os.path.abspath(path)) == root else None
+
+
+@functools.lru_cache(maxsize=None)
+def _source_digest(path, mtime_ns, size):
+    return file_digest(path)
+
+
+def _module_digest(module, root, seen):
+    # Source of the module plus every project module it imports, transitively
+    if module.__name__ in seen:
+        return ''
+    seen.add(module.__name__)
+    stat = os.stat(module.__file__)
+    parts = [_source_digest(module.__file__, stat.st_mtime_ns, stat.st_size)]
+    for value in list(vars(module).values()):
+        imported = _local_module(value, root)
+        if imported is not None and imported is not module:
+            parts.append(_module_digest(imported, root, seen))
+    return '|'.join(parts)
+
+
+def _function_payload(func, root, seen):
+    # The function's own code, the same-module functions it calls (by code, so unrelated edits to its
+    # module keep the digest) and the full source of every other project module it reaches
+    if func in seen:
+        return ''
+    seen.add(func)
+    home = sys.modules.get(func.__module__)
+    parts = [f"{func.__qualname__}|{_code_payload(func.__code__)}"]
+    for name in sorted(_code_names(func.__code__)):
+        value = func.__globals__.get(name)
+        module = _local_module(value, root) if value is not None else None
+        if module is None:
+            continue
+        if module is not home:
+            parts.append(_module_digest(module, root, seen))
+        elif inspect.isfunction(value):
+            parts.append(_function_payload(value, root, seen))
+    return '|'.join(parts)
+
+
+def parser_digest(parser):
+    """Fingerprint of a parser's (or stage's) code, so edits to its logic invalidate old entries.
+
+    Covers the helpers it calls: functions of its own module by their code and other modules of the
+    project (compact_frames, forecast, ...) by their source, so editing a helper module invalidates
+    every entry computed with it.
+    """
+    home = sys.modules.get(parser.__module__)
+    root = os.path.dirname(os.path.abspath(home.__file__)) if getattr(home, '__file__', None) else None
+    payload = _function_payload(parser, root, set()) if root else f"{parser.__qualname__}|{_code_payload(parser.__code__)}"
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def cache_key(path, parser):
+    """Cache key for a file parsed by `parser`."""
+    combined = f"{CACHE_VERSION}|{parser_digest(parser)}|{file_digest(path)}"
+    return hashlib.sha256(combined.encode()).hexdigest()[:32]
+
+
+def _save_strings(entry_dir, name, values):
+    # Variable-width strings: one UTF-8 text buffer plus the character offset where each string starts,
+    # so every string costs its own length however long the longest one is
+    values = pd.Series(values, dtype=object).astype(str)
+    lengths = values.str.len().to_numpy(dtype=np.int64)
+    np.save(os.path.join(entry_dir, f'{name}.npy'), np.r_[0, np.cumsum(lengths)])
+    with open(os.path.join(entry_dir, f'{name}.utf8'), 'wb') as f:
+        f.write(''.join(values.tolist()).encode('utf-8'))
+    return f'{name}.npy'
+
+
+def _load_strings(entry_dir, file):
+    offsets = np.load(os.path.join(entry_dir, file)).tolist()
+    with open(os.path.join(entry_dir, file[:-len('.npy')] + '.utf8'), 'rb') as f:
+        text = f.read().decode('utf-8')
+    return np.array([text[start:end] for start, end in zip(offsets[:-1], offsets[1:])], dtype=object)
+
+
+def _write_frame(df, entry_dir):
+    columns = []
+    for i, name in enumerate(df.columns):
+        series = df[name]
+        column = {'name': name, 'dtype': str(series.dtype), 'file': f'{i}.npy'}
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # Codes as a plain integer array, categories as variable-width strings
+            column['kind'] = 'category'
+            np.save(os.path.join(entry_dir, column['file']), series.cat.codes.to_numpy())
+            column['categories'] = _save_strings(entry_dir, f'{i}.categories', series.cat.categories)
+        elif isinstance(series.dtype, pd.api.extensions.ExtensionDtype) and pd.api.types.is_numeric_dtype(series):
+            # Nullable numbers: the values with a separate null mask
+            column['kind'] = 'masked'
+            column['mask'] = f'{i}.na.npy'
+            mask = series.isna().to_numpy()
+            np.save(os.path.join(entry_dir, column['file']),
+                    series.to_numpy(dtype=series.dtype.numpy_dtype, na_value=0))
+            np.save(os.path.join(entry_dir, column['mask']), mask)
+        elif pd.api.types.is_numeric_dtype(series) or pd.api.types.is_datetime64_dtype(series):
+            column['kind'] = 'array'
+            np.save(os.path.join(entry_dir, column['file']), series.to_numpy())
+        else:
+            # Strings are stored variable-width with a separate null mask
+            column['kind'] = 'string'
+            mask = series.isna().to_numpy()
+            column['file'] = _save_strings(entry_dir, str(i), series.where(~mask, ''))
+            if mask.any():
+                column['mask'] = f'{i}.na.npy'
+                np.save(os.path.join(entry_dir, column['mask']), mask)
+        columns.append(column)
+
+    with open(os.path.join(entry_dir, 'meta.json'), 'w') as f:
+        json.dump({'version': CACHE_VERSION, 'rows': len(df), 'columns': columns}, f)
+
+
+def _load_array(path):
+    # Zero-length arrays cannot be memory-mapped
+    values = np.load(path, mmap_mode='r')
+    return values if values.size else np.load(path)
+
+
+def _read_frame(entry_dir):
+    with open(os.path.join(entry_dir, 'meta.json')) as f:
+        meta = json.load(f)
+
+    data = {}
+    for column in meta['columns']:
+        if column['kind'] == 'string':
+            values = _load_strings(entry_dir, column['file'])
+        else:
+            values = _load_array(os.path.join(entry_dir, column['file']))
+        if column['kind'] == 'category':
+            categories = _load_strings(entry_dir, column['categories'])
+            values = pd.Categorical.from_codes(values, categories=categories)
+        elif column['kind'] == 'masked':
+            array_type = pd.api.types.pandas_dtype(column['dtype']).construct_array_type()
+            values = array_type(values, np.load(os.path.join(entry_dir, column['mask'])))
+        elif column['kind'] == 'string':
+            if 'mask' in column:
+                values[np.load(os.path.join(entry_dir, column['mask']))] = np.nan
+            values = pd.Series(values, dtype=column['dtype'])
+        data[column['name']] = values
+    return pd.DataFrame(data, columns=[c['name'] for c in meta['columns']], copy=False)
+
+
+def load_frame(path, parser, cache_dir=DEFAULT_CACHE_DIR):
+    """Return `parser(path)`, reusing the cached columns when the file content is unchanged.
+
+    Numeric and datetime columns of a cache hit are memory-mapped rather than re-parsed.
+    """
+    entry_dir = os.path.join(cache_dir, cache_key(path, parser))
+    if os.path.exists(os.path.join(entry_dir, 'meta.json')):
+        return _read_frame(entry_dir)
+
+    df = parser(path)
+    os.makedirs(cache_dir, exist_ok=True)
+    staging_dir = tempfile.mkdtemp(dir=cache_dir, prefix='.staging-')
+    try:
+        _write_frame(df, staging_dir)
+        os.replace(staging_dir, entry_dir)
+    except OSError:
+        # Another process published the same entry first, or the write failed; the parsed frame is still good
+        shutil.rmtree(staging_dir, ignore_errors=True)
+    return df
+
+
+def clear_cache(cache_dir=DEFAULT_CACHE_DIR):
+    """Remove every cached entry."""
+    shutil.rmtree(cache_dir, ignore_errors=True)
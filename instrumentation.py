@@ -0,0 +1,126 @@
+"""
+Run Instrumentation
+Per-stage wall time, CPU time, peak RSS and row counts, written as JSON or Prometheus text
+"""
+
+import contextlib
+import json
+import os
+import resource
+import time
+from datetime import datetime
+
+import pandas as pd
+
+FORMATS = {'json': 'run_metrics.json', 'prometheus': 'run_metrics.prom'}
+
+METRIC_PREFIX = 'big_nose'
+
+
+def output_rows(value):
+    """Row count of a frame-like stage output, or None for scalars."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return len(value)
+    return getattr(value, 'rows', None)
+
+
+def _reset_peak_rss():
+    # Linux resets VmHWM (the peak RSS) when 5 is written to clear_refs; elsewhere the peak is process-wide
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_mb():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if os.uname().sysname == 'Darwin' else peak / 1024
+
+
+class Recorder:
+    """Collects one measurement per stage of a run.
+
+    Pipelines take an optional recorder and skip every measurement when it is None, so an
+    uninstrumented run pays nothing beyond that check.
+    """
+
+    def __init__(self, labels=None):
+        self.labels = dict(labels or {})
+        self.started = datetime.now().isoformat(timespec='seconds')
+        self.stages = []
+
+    @contextlib.contextmanager
+    def measure(self, name, status='computed', shared=False):
+        """Measure the enclosed block; the caller may add `rows` to the yielded record.
+
+        CPU time is the measuring thread's. A `shared` block runs alongside other stages, so the peak RSS
+        is not reset for it and is reported process-wide.
+        """
+        record = {'stage': name, 'status': status}
+        peak_is_local = not shared and _reset_peak_rss()
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield record
+        finally:
+            record['wall_seconds'] = time.perf_counter() - wall
+            record['cpu_seconds'] = time.thread_time() - cpu
+            record['peak_rss_mb'] = round(_peak_rss_mb(), 3)
+            record['peak_rss_scope'] = 'stage' if peak_is_local else 'process'
+            self.stages.append(record)
+
+    def to_dict(self):
+        return {
+            'labels': self.labels,
+            'started': self.started,
+            'wall_seconds': sum(record['wall_seconds'] for record in self.stages),
+            'cpu_seconds': sum(record['cpu_seconds'] for record in self.stages),
+            'peak_rss_mb': max((record['peak_rss_mb'] for record in self.stages), default=0.0),
+            'stages': self.stages,
+        }
+
+    def to_prometheus(self):
+        """Prometheus text exposition of the stage gauges."""
+        def label_text(extra):
+            labels = {**self.labels, **extra}
+            escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"') for value in labels.values())
+            return ','.join(f'{key}="{value}"' for key, value in zip(labels, escaped))
+
+        lines = []
+        for metric, field, help_text in (
+            ('stage_wall_seconds', 'wall_seconds', 'Wall-clock time of the stage'),
+            ('stage_cpu_seconds', 'cpu_seconds', 'CPU time of the stage'),
+            ('stage_peak_rss_bytes', 'peak_rss_mb', 'Peak resident set size while the stage ran'),
+        ):
+            lines.append(f'# HELP {METRIC_PREFIX}_{metric} {help_text}')
+            lines.append(f'# TYPE {METRIC_PREFIX}_{metric} gauge')
+            for record in self.stages:
+                value = record[field] * 2**20 if field == 'peak_rss_mb' else record[field]
+                labels = label_text({'stage': record['stage'], 'status': record['status']})
+                lines.append(f'{METRIC_PREFIX}_{metric}{{{labels}}} {value:.6g}')
+        lines.append(f'# HELP {METRIC_PREFIX}_stage_rows Rows in each frame output of the stage')
+        lines.append(f'# TYPE {METRIC_PREFIX}_stage_rows gauge')
+        for record in self.stages:
+            for output, rows in record.get('rows', {}).items():
+                labels = label_text({'stage': record['stage'], 'output': output})
+                lines.append(f'{METRIC_PREFIX}_stage_rows{{{labels}}} {rows}')
+        return '\n'.join(lines) + '\n'
+
+    def write(self, output_dir, fmt='json'):
+        """Write the metrics next to the report and return the file path."""
+        path = os.path.join(output_dir, FORMATS[fmt])
+        with open(path, 'w') as f:
+            if fmt == 'json':
+                json.dump(self.to_dict(), f, indent=2)
+            else:
+                f.write(self.to_prometheus())
+        return path
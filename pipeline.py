@@ -0,0 +1,314 @@
+"""
+Analysis Pipeline
+Declared stage graph with on-disk memoization and selective recompute
+"""
+
+import contextlib
+import hashlib
+import inspect
+import io
+import os
+import pickle
+import shutil
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from ingest_cache import file_digest, parser_digest
+from instrumentation import output_rows
+
+
+class Stage:
+    """One analysis step: reads the values named by its parameters, returns its declared outputs.
+
+    `artifacts` are files the stage writes into the artifact directory: a tuple of names, or a function
+    whose parameters name the values (typically run parameters) the file names depend on.
+    A `concurrent` stage (an I/O-bound loader) may run on a background thread, started with the run,
+    when all of its inputs are run parameters.
+    """
+
+    def __init__(self, func, outputs, artifacts=(), memoize=True, concurrent=False):
+        self.func = func
+        self.name = func.__name__
+        self.inputs = tuple(inspect.signature(func).parameters)
+        self.outputs = tuple(outputs)
+        self.artifacts = artifacts if callable(artifacts) else tuple(artifacts)
+        self.memoize = memoize
+        self.concurrent = concurrent
+
+    def __repr__(self):
+        return f"Stage({self.name}: {', '.join(self.inputs)} -> {', '.join(self.outputs)})"
+
+
+class StageGraph:
+    """Ordered registry of stages wired together by input/output names."""
+
+    def __init__(self):
+        self.stages = {}
+        self.producers = {}
+
+    def stage(self, outputs, artifacts=(), memoize=True, concurrent=False):
+        """Decorator registering a function as a stage."""
+        def register(func):
+            stage = Stage(func, outputs, artifacts=artifacts, memoize=memoize, concurrent=concurrent)
+            for name in stage.outputs:
+                if name in self.producers:
+                    raise ValueError(f"Output {name!r} of {stage.name} is already produced by {self.producers[name]}")
+                self.producers[name] = stage.name
+            self.stages[stage.name] = stage
+            return func
+        return register
+
+    def plan(self, params, targets=None, skip=()):
+        """Stages needed for `targets` (every stage by default), in dependency order."""
+        if targets is None:
+            pending = [name for name in self.stages if name not in skip]
+        else:
+            pending = [self._producer(name) for name in targets if name not in params]
+        needed = set()
+        while pending:
+            stage_name = pending.pop()
+            if stage_name in needed or stage_name in skip:
+                continue
+            needed.add(stage_name)
+            pending.extend(self._producer(name) for name in self.stages[stage_name].inputs if name not in params)
+        # Stages are registered after the stages they read from, so registration order is topological
+        return [stage for name, stage in self.stages.items() if name in needed]
+
+    def _producer(self, name):
+        if name not in self.producers:
+            raise KeyError(f"No stage produces {name!r} and it was not given as a parameter")
+        return self.producers[name]
+
+    def run(self, params, targets=None, skip=(), memo_dir=None, file_params=(), untracked=(),
+            artifact_dir=None, force=(), recorder=None, workers=None):
+        """Run the stages needed for `targets`, reusing memoized results whose inputs are unchanged.
+
+        `file_params` are parameters holding file paths; they are fingerprinted by content.
+        `untracked` parameters (output locations and the like) do not affect stage results.
+        With an instrumentation `recorder`, every computed or reused stage is measured.
+        Concurrent stages that must be computed start together on up to `workers` threads (default: one
+        each; 1 runs everything in order); a stage reading their outputs waits only for the ones it reads.
+        Printed output is replayed in stage order either way.
+        Returns a PipelineRun holding every value that was produced or loaded.
+        """
+        stages = self.plan(params, targets, skip)
+        run = PipelineRun(params, memo_dir, recorder, order=[stage.name for stage in stages])
+
+        fingerprints = {}
+        for name, value in params.items():
+            if name in untracked:
+                fingerprints[name] = 'untracked'
+            elif name in file_params:
+                fingerprints[name] = f'file:{file_digest(value)}' if os.path.exists(value) else 'file:missing'
+            else:
+                fingerprints[name] = f'value:{value!r}'
+
+        # Memo keys depend only on fingerprints, so every stage's key is known before anything runs
+        keys = {}
+        for stage in stages:
+            missing = [name for name in stage.inputs if name not in fingerprints]
+            if missing:
+                raise KeyError(f"{stage.name} needs {missing}, which were skipped or never produced")
+            payload = '|'.join([stage.name, parser_digest(stage.func)] +
+                               [f'{name}={fingerprints[name]}' for name in stage.inputs])
+            keys[stage.name] = hashlib.sha256(payload.encode()).hexdigest()[:32]
+            for name in stage.outputs:
+                fingerprints[name] = f'{stage.name}:{keys[stage.name]}'
+
+        def reusable(stage):
+            return memo_dir and stage.memoize and stage.name not in force and run.has_entry(stage, keys[stage.name])
+
+        ahead = [stage for stage in stages
+                 if stage.concurrent and all(name in params for name in stage.inputs) and not reusable(stage)]
+        workers = min(len(ahead) if workers is None else workers, len(ahead))
+        pool = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+        stdout, sys.stdout = sys.stdout, run.output
+        try:
+            for stage in ahead if pool else ():
+                run.start(pool, stage, keys[stage.name], artifact_dir)
+            for stage in stages:
+                if stage.name in run.started:
+                    continue
+                if reusable(stage):
+                    run.reuse(stage, keys[stage.name], artifact_dir)
+                else:
+                    run.execute(stage, keys[stage.name], artifact_dir)
+            run.collect()
+        finally:
+            if pool:
+                pool.shutdown(wait=True)
+            sys.stdout = stdout
+            run.flush(final=True)
+        return run
+
+
+class _StageOutput:
+    """sys.stdout stand-in that sends each thread's prints to the log of the stage it is running."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+
+    def write(self, text):
+        buffer = getattr(self.local, 'buffer', None)
+        return (self.stream if buffer is None else buffer).write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+    @contextlib.contextmanager
+    def capture(self, buffer):
+        previous = getattr(self.local, 'buffer', None)
+        self.local.buffer = buffer
+        try:
+            yield buffer
+        finally:
+            self.local.buffer = previous
+
+
+class PipelineRun:
+    """Values of one pipeline run; memoized outputs are unpickled only when something reads them.
+
+    Outputs of stages started on background threads are likewise waited for only when read. Stage
+    logs are printed in plan order, each once every earlier stage's log has been printed.
+    """
+
+    def __init__(self, params, memo_dir, recorder=None, order=()):
+        self.values = dict(params)
+        self.memo_dir = memo_dir
+        self.recorder = recorder
+        self.recomputed = []
+        self.reused = []
+        self.started = {}
+        self.output = _StageOutput(sys.stdout)
+        self._pending = {}
+        self._running = {}
+        self._order = list(order)
+        self._printed = 0
+        self._logs = {}
+
+    def _entry(self, stage, key):
+        return os.path.join(self.memo_dir, f'{stage.name}-{key}')
+
+    def _artifacts(self, stage):
+        if not callable(stage.artifacts):
+            return stage.artifacts
+        return tuple(stage.artifacts(**{name: self[name] for name in inspect.signature(stage.artifacts).parameters}))
+
+    def has_entry(self, stage, key):
+        entry = self._entry(stage, key)
+        return os.path.exists(entry + '.pkl') and all(
+            os.path.exists(os.path.join(entry + '.artifacts', name)) for name in self._artifacts(stage))
+
+    def __getitem__(self, name):
+        if name not in self.values and name in self._running:
+            stage, key, artifact_dir, future = self.started[self._running[name]]
+            for output in stage.outputs:
+                self._running.pop(output, None)
+            self._finish(stage, key, artifact_dir, future.result())
+        if name not in self.values and name in self._pending:
+            with open(self._pending.pop(name), 'rb') as f:
+                outputs = pickle.load(f)
+            for output, value in outputs.items():
+                self._pending.pop(output, None)
+                self.values[output] = value
+        return self.values[name]
+
+    def get(self, name, default=None):
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+    def _measure(self, stage, status, shared=False):
+        if self.recorder is None:
+            return contextlib.nullcontext()
+        return self.recorder.measure(stage.name, status, shared=shared)
+
+    def flush(self, final=False):
+        """Print the logs that are next in plan order; `final` prints every log still held back."""
+        while self._printed < len(self._order) and self._order[self._printed] in self._logs:
+            self.output.stream.write(self._logs.pop(self._order[self._printed]))
+            self._printed += 1
+        if final:
+            for name in self._order[self._printed:]:
+                self.output.stream.write(self._logs.pop(name, ''))
+            self._printed = len(self._order)
+
+    def _compute(self, stage, inputs, shared=False):
+        buffer = io.StringIO()
+        try:
+            with self.output.capture(buffer), self._measure(stage, 'computed', shared) as record:
+                outputs = stage.func(**inputs) or {}
+                if record is not None:
+                    record['rows'] = {name: output_rows(value) for name, value in outputs.items()
+                                      if output_rows(value) is not None}
+        finally:
+            self._logs[stage.name] = buffer.getvalue()
+        return outputs, buffer.getvalue()
+
+    def start(self, pool, stage, key, artifact_dir):
+        """Compute a stage whose inputs are all parameters on `pool`; its outputs resolve when read."""
+        inputs = {name: self.values[name] for name in stage.inputs}
+        future = pool.submit(self._compute, stage, inputs, True)
+        self.started[stage.name] = (stage, key, artifact_dir, future)
+        self._running.update((name, stage.name) for name in stage.outputs)
+
+    def collect(self):
+        """Wait for the started stages nothing has read yet."""
+        for stage, _, _, _ in list(self.started.values()):
+            for name in stage.outputs:
+                self[name]
+
+    def execute(self, stage, key, artifact_dir):
+        inputs = {name: self[name] for name in stage.inputs}
+        try:
+            result = self._compute(stage, inputs)
+        finally:
+            self.flush()
+        self._finish(stage, key, artifact_dir, result)
+
+    def _finish(self, stage, key, artifact_dir, result):
+        outputs, log = result
+        self.flush()
+        if set(outputs) != set(stage.outputs):
+            raise ValueError(f"{stage.name} returned {sorted(outputs)}, declared {sorted(stage.outputs)}")
+        self.values.update(outputs)
+        self.recomputed.append(stage.name)
+
+        if not (self.memo_dir and stage.memoize):
+            return
+        os.makedirs(self.memo_dir, exist_ok=True)
+        entry = self._entry(stage, key)
+        for name in self._artifacts(stage):
+            _copy_artifact(os.path.join(artifact_dir, name), os.path.join(entry + '.artifacts', name))
+        with open(entry + '.log', 'w') as f:
+            f.write(log)
+        # The pickle is written last and atomically: its presence marks the entry complete
+        staging = f'{entry}.pkl.{os.getpid()}.tmp'
+        with open(staging, 'wb') as f:
+            pickle.dump(outputs, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(staging, entry + '.pkl')
+
+    def reuse(self, stage, key, artifact_dir):
+        entry = self._entry(stage, key)
+        for name in stage.outputs:
+            self._pending[name] = entry + '.pkl'
+        with self._measure(stage, 'reused'):
+            for name in self._artifacts(stage):
+                _copy_artifact(os.path.join(entry + '.artifacts', name), os.path.join(artifact_dir, name))
+        if os.path.exists(entry + '.log'):
+            with open(entry + '.log') as f:
+                self._logs[stage.name] = f.read()
+        self._logs.setdefault(stage.name, '')
+        self.flush()
+        self.reused.append(stage.name)
+
+
+def _copy_artifact(source, target):
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    shutil.copy2(source, target)
@@ -0,0 +1,153 @@
+"""
+Data Quality Profiler
+Per-column nulls, ranges, totals and rule violations for every input, with a gate for the pipeline
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+TITLE_COLUMNS = ('Song Title', 'song', 'Title')
+
+# Columns whose values must be non-negative
+NON_NEGATIVE = ('Amount', 'listeners', 'streams', 'saves', 'followers')
+
+# Date columns that must not lie after the as-of date
+NOT_AFTER_AS_OF = ('release_date', 'date_added', 'date')
+
+# Columns without which the analysis cannot run, per input
+REQUIRED = {
+    'earnings': ('Song Title', 'Amount', 'release_date'),
+    'songs_1year': ('song', 'streams', 'listeners', 'saves'),
+    'audience': ('date', 'followers', 'streams'),
+    'playlists': ('streams',),
+    'songs_all': ('song', 'streams'),
+}
+
+GATE_LEVELS = ('errors', 'warnings', 'off')
+
+
+class DataQualityError(ValueError):
+    """Raised when the quality gate rejects the inputs."""
+
+
+def _profile_column(series, as_of):
+    profile = {'dtype': str(series.dtype)}
+    if pd.api.types.is_datetime64_any_dtype(series):
+        values = series.to_numpy()
+        missing = np.isnat(values)
+        present = values[~missing]
+        if len(present):
+            profile['min'], profile['max'] = pd.Timestamp(present.min()), pd.Timestamp(present.max())
+        if series.name in NOT_AFTER_AS_OF and as_of is not None:
+            profile['out_of_range'] = int((present > np.datetime64(pd.Timestamp(as_of))).sum())
+    elif pd.api.types.is_integer_dtype(series) or pd.api.types.is_float_dtype(series):
+        # One materialization per column; integers stay int64 so totals are exact
+        missing = series.isna().to_numpy()
+        dtype = np.int64 if pd.api.types.is_integer_dtype(series) else np.float64
+        values = series.to_numpy(dtype=dtype, na_value=0)
+        present = values[~missing]
+        profile['sum'] = present.sum()
+        if len(present):
+            profile['min'], profile['max'] = present.min(), present.max()
+        if series.name in NON_NEGATIVE:
+            profile['out_of_range'] = int((present < 0).sum())
+    else:
+        missing = series.isna().to_numpy()
+    profile['nulls'] = int(missing.sum())
+    return profile
+
+
+def profile_frame(df, as_of=None):
+    """Profile every column of one input frame."""
+    profile = {'rows': len(df), 'columns': {name: _profile_column(df[name], as_of) for name in df.columns}}
+    titles = [name for name in TITLE_COLUMNS if name in df.columns]
+    if titles:
+        profile['duplicate_titles'] = int(df[titles[0]].duplicated(keep='first').sum())
+    return profile
+
+
+def _json_value(value):
+    # NumPy scalars as plain numbers, timestamps as ISO text
+    return value.item() if isinstance(value, np.generic) else str(value)
+
+
+def fold_profile(profile, frame):
+    """Running profile of a frame read in consecutive chunks: `profile` (None before the first chunk)
+    with the chunk `frame` folded in.
+
+    The result holds only JSON values, so it can be persisted with the state it describes. Date checks
+    against an as-of date are left to the reader, which knows the as-of date of each run.
+    """
+    addition = json.loads(json.dumps(profile_frame(frame), default=_json_value))
+    if profile is None:
+        return addition
+    columns = {}
+    for name, column in addition['columns'].items():
+        merged = dict(column)
+        before = profile['columns'].get(name, {})
+        for key in ('nulls', 'sum', 'out_of_range'):
+            if key in before:
+                merged[key] = before[key] + column.get(key, 0)
+        for key, pick in (('min', min), ('max', max)):
+            if key in before:
+                merged[key] = pick(before[key], column[key]) if key in column else before[key]
+        columns[name] = merged
+    return {'rows': profile['rows'] + addition['rows'], 'columns': columns}
+
+
+class QualityReport:
+    """Profiles of every input plus the issues found, split into errors and warnings."""
+
+    def __init__(self, profiles):
+        self.profiles = profiles
+        self.errors = []
+        self.warnings = []
+        for frame, profile in profiles.items():
+            columns = profile['columns']
+            if profile['rows'] == 0:
+                self.errors.append(f"{frame}: no rows")
+            elif profile.get('window_rows') == 0:
+                self.warnings.append(f"{frame}: no rows in the {profile['window_days']} days up to {profile['as_of']}")
+            for name in REQUIRED.get(frame, ()):
+                if name not in columns:
+                    self.errors.append(f"{frame}: missing column {name!r}")
+                elif profile['rows'] and columns[name]['nulls'] == profile['rows']:
+                    self.errors.append(f"{frame}: column {name!r} is entirely empty")
+            for name, column in columns.items():
+                if column.get('out_of_range'):
+                    self.warnings.append(f"{frame}: {column['out_of_range']} out-of-range values in {name!r}")
+            if profile.get('duplicate_titles'):
+                self.warnings.append(f"{frame}: {profile['duplicate_titles']} duplicate titles")
+
+    def __getitem__(self, frame):
+        return self.profiles[frame]
+
+    def column(self, frame, name):
+        return self.profiles[frame]['columns'][name]
+
+    def gate(self, level='errors'):
+        """Raise DataQualityError for errors (and warnings too at level 'warnings')."""
+        if level not in GATE_LEVELS:
+            raise ValueError(f"Unknown quality gate level {level!r}; choose from {', '.join(GATE_LEVELS)}")
+        blocking = [] if level == 'off' else self.errors + (self.warnings if level == 'warnings' else [])
+        if blocking:
+            raise DataQualityError("Input data failed the quality gate:\n  " + "\n  ".join(blocking))
+
+    def to_dict(self):
+        return {'errors': self.errors, 'warnings': self.warnings, 'profiles': self.profiles}
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2, default=_json_value)
+
+
+def profile_inputs(frames, as_of=None):
+    """Profile every named input frame (None entries are skipped) into a QualityReport.
+
+    An entry may also be a profile already, such as the audience history profile the state and store
+    keep with `fold_profile`.
+    """
+    return QualityReport({name: df if isinstance(df, dict) else profile_frame(df, as_of)
+                          for name, df in frames.items() if df is not None})
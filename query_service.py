@@ -0,0 +1,420 @@
+"""
+Analysis Query Service
+Long-lived local HTTP service answering metric, top-k, window, insight and assessment queries from warm stage values
+"""
+
+import os
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+import big_nose_analysis
+import quality
+from batch_analysis import read_manifest
+from ranking import RANKED_METRICS
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+# Computed results kept by the LRU cache
+CACHE_SIZE = 1024
+
+# As-of dates whose stage values each artist keeps warm
+WARM_DATES = 4
+
+# Stages that write files; queries never run them
+SKIPPED_STAGES = ('plot_dashboard', 'export_report')
+
+# Stage values each endpoint reads
+ENDPOINT_VALUES = {
+    'metrics': big_nose_analysis.SUMMARY_METRICS,
+    'top': ('songs_1year_rank', 'earnings_rank'),
+    'window': ('audience_window',),
+    'insights': ('insights', 'recommendations'),
+    'assessment': ('assessment_score', 'assessment_pct', 'assessment_factors', 'verdict', 'verdict_desc'),
+}
+
+# The quality gate runs before any endpoint answers, as it does before a report is written
+GATED_VALUES = ('quality_report',)
+
+
+class QueryError(ValueError):
+    """A query the service cannot answer: `status` is the HTTP status to reply with."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _jsonable(value):
+    # Frames become row records; numpy scalars, timestamps and non-finite floats become plain JSON values
+    if isinstance(value, pd.DataFrame):
+        return json.loads(value.to_json(orient='records', date_format='iso'))
+    if isinstance(value, dict):
+        return {str(key): _jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(item) for item in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if value is pd.NaT:
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def _as_of(query):
+    try:
+        return pd.Timestamp(query.get('as_of') or datetime.now().date()).normalize()
+    except ValueError:
+        raise QueryError(f"Invalid as_of {query['as_of']!r}; use YYYY-MM-DD")
+
+
+def _positive_int(query, name, default):
+    try:
+        value = int(query.get(name, default))
+    except ValueError:
+        value = 0
+    if value < 1:
+        raise QueryError(f"{name} must be a positive integer, got {query[name]!r}")
+    return value
+
+
+def _choice(query, name, choices, default=None):
+    value = query.get(name, default)
+    if value is not None and value not in choices:
+        raise QueryError(f"Unknown {name} {value!r}; choose from {', '.join(choices)}")
+    return value
+
+
+# ============================================================================
+# WARM STAGE VALUES
+# ============================================================================
+
+class ArtistSession:
+    """One artist's inputs and every stage value computed from them so far, per as-of date.
+
+    Values are computed by the analysis stage graph on demand: a query names the values it reads and
+    only the stages producing the ones not yet held run, each value computed once per as-of date.
+    The loaders that do not read the as-of date (every input but the audience timeline) are shared
+    across dates. Changed input files (by size and modification time) drop every held value and bump
+    `generation`. The held values are read and replaced under the session's lock.
+    """
+
+    def __init__(self, artist, data_dir, options=None):
+        self.artist = artist
+        self.data_dir = data_dir
+        self.options = dict(options or {})
+        self.paths = {name: path for name, path in self._params(None).items()
+                      if name in big_nose_analysis.INPUT_FILES}
+        self.signature = self.file_signature()
+        self.generation = 0
+        self.dates = OrderedDict()
+        self.lock = threading.Lock()
+
+    def _params(self, as_of):
+        return big_nose_analysis.analysis_params(self.data_dir, None, self.artist, as_of=as_of, plots=False,
+                                                 **self.options)
+
+    def file_signature(self):
+        """Size and modification time of every input file (None for absent optional files)."""
+        signature = {}
+        for name, path in self.paths.items():
+            try:
+                stat = os.stat(path)
+                signature[name] = (stat.st_size, stat.st_mtime_ns)
+            except FileNotFoundError:
+                signature[name] = None
+        return signature
+
+    def refresh(self):
+        """Drop the held values when an input file changed; returns the generation the values belong to."""
+        signature = self.file_signature()
+        with self.lock:
+            if signature != self.signature:
+                self.signature = signature
+                self.generation += 1
+                self.dates.clear()
+            return self.generation
+
+    def _shared(self):
+        # Loader outputs that do not depend on the as-of date, from any date already loaded
+        if not self.dates:
+            return {}
+        values = next(iter(self.dates.values()))
+        return {name: values[name] for stage in big_nose_analysis.STAGES.stages.values()
+                if stage.concurrent and 'as_of' not in stage.inputs
+                for name in stage.outputs if name in values}
+
+    def values(self, names, as_of):
+        """The named stage values at `as_of`, running only the stages for values not yet held."""
+        key = as_of.strftime('%Y-%m-%d')
+        with self.lock:
+            if key not in self.dates:
+                self.dates[key] = self._shared()
+                while len(self.dates) > WARM_DATES:
+                    self.dates.popitem(last=False)
+            self.dates.move_to_end(key)
+            held = self.dates[key]
+
+            missing = [name for name in GATED_VALUES + tuple(names) if name not in held]
+            if missing:
+                params = {**self._params(as_of), **held}
+                # Stage logs are not printed; values given as parameters are never fingerprinted
+                with contextlib.redirect_stdout(io.StringIO()):
+                    run = big_nose_analysis.STAGES.run(params, targets=missing, skip=SKIPPED_STAGES,
+                                                       untracked=tuple(params))
+                held.update(run.values)
+            return {name: held[name] for name in names}
+
+
+# ============================================================================
+# RESULT CACHE
+# ============================================================================
+
+class ResultCache:
+    """Bounded least-recently-used map from a normalized query to its encoded JSON result."""
+
+    def __init__(self, size=CACHE_SIZE):
+        self.size = size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            body = self.entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key, body):
+        with self.lock:
+            self.entries[key] = body
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, artist):
+        """Drop every cached result of `artist`."""
+        with self.lock:
+            for key in [key for key in self.entries if key[1] == artist]:
+                del self.entries[key]
+
+    def stats(self):
+        with self.lock:
+            return {'entries': len(self.entries), 'size': self.size, 'hits': self.hits, 'misses': self.misses}
+
+
+# ============================================================================
+# ENDPOINTS
+# ============================================================================
+
+def query_metrics(values, query):
+    """run_analysis's key metrics, or only `metric`."""
+    metric = _choice(query, 'metric', big_nose_analysis.SUMMARY_METRICS)
+    names = (metric,) if metric else big_nose_analysis.SUMMARY_METRICS
+    return {'metrics': {name: values[name] for name in names}}
+
+
+def query_top(values, query):
+    """The `k` songs with the highest `metric`: earnings ('Amount') or 1-year streams, listeners or saves."""
+    metric = _choice(query, 'metric', RANKED_METRICS, 'streams')
+    k = _positive_int(query, 'k', 10)
+    rank = values['earnings_rank'] if metric == 'Amount' else values['songs_1year_rank']
+    return {'metric': metric, 'k': k, 'songs': rank.top(metric, k)}
+
+
+def query_window(values, query):
+    """Audience totals of the `window` days ending on the as-of date, read from the timeline cube."""
+    days = _positive_int(query, 'window', 30)
+    cube = values['audience_window'].cube
+    if cube.origin is None:
+        raise QueryError("The audience timeline has no dated rows", status=404)
+    window = cube.trailing(days, query['as_of'])
+    return {'window': days, 'start': window['start'], 'end': window['end'], 'days': window['days'],
+            'streams': window['streams'], 'listeners': window['listeners'],
+            'followers_start': window['followers_first'], 'followers_end': window['followers_last'],
+            'follower_growth': window['followers_last'] - window['followers_first']}
+
+
+def query_insights(values, query):
+    """PART 8 insights and PART 9 recommendations."""
+    return {'insights': values['insights'], 'recommendations': values['recommendations']}
+
+
+def query_assessment(values, query):
+    """PART 10 assessment: score, factor breakdown and verdict."""
+    return {'score': values['assessment_score'], 'max_score': big_nose_analysis.assessment.MAX_SCORE,
+            'pct': values['assessment_pct'], 'verdict': values['verdict'], 'verdict_desc': values['verdict_desc'],
+            'factors': [{'factor': factor, 'score': score, 'note': note}
+                        for factor, score, note in values['assessment_factors']]}
+
+
+ENDPOINTS = {
+    'metrics': query_metrics,
+    'top': query_top,
+    'window': query_window,
+    'insights': query_insights,
+    'assessment': query_assessment,
+}
+
+
+class QueryService:
+    """Answers endpoint queries for a roster of artists from warm stage values and an LRU result cache.
+
+    Queries are normalized (artist, endpoint, as-of date, sorted parameters) before the cache lookup;
+    a cached result is served while the artist's input files are unchanged (results are keyed on the
+    session's generation, so one computed from replaced files is never served). Computing a missing
+    result holds a lock, so concurrent requests never run the stage graph at the same time.
+    """
+
+    def __init__(self, artists, options=None, cache_size=CACHE_SIZE):
+        self.sessions = {row['artist']: ArtistSession(row['artist'], row['data_dir'], options) for row in artists}
+        self.cache = ResultCache(cache_size)
+        self.generations = {}
+        self.lock = threading.Lock()
+
+    def _session(self, query):
+        artist = query.get('artist')
+        if artist is None and len(self.sessions) == 1:
+            artist = next(iter(self.sessions))
+        if artist not in self.sessions:
+            raise QueryError(f"Unknown artist {artist!r}; see /artists", status=404)
+        return self.sessions[artist]
+
+    def answer(self, endpoint, query):
+        """Encoded JSON result of one query, from the cache when the inputs are unchanged."""
+        if endpoint == 'artists':
+            return json.dumps({'artists': sorted(self.sessions)}).encode()
+        if endpoint == 'stats':
+            return json.dumps(self.cache.stats()).encode()
+        if endpoint not in ENDPOINTS:
+            raise QueryError(f"Unknown endpoint /{endpoint}; choose from {', '.join(ENDPOINTS)}", status=404)
+
+        session = self._session(query)
+        query = {**query, 'artist': session.artist, 'as_of': _as_of(query)}
+        generation = session.refresh()
+        if generation != self.generations.get(session.artist, generation):
+            self.cache.invalidate(session.artist)
+        self.generations[session.artist] = generation
+        key = (endpoint, session.artist, generation, query['as_of'],
+               tuple(sorted((name, value) for name, value in query.items() if name not in ('artist', 'as_of'))))
+        body = self.cache.get(key)
+        if body is None:
+            with self.lock:
+                values = session.values(ENDPOINT_VALUES[endpoint], query['as_of'])
+            result = {'artist': session.artist, 'as_of': query['as_of'].strftime('%Y-%m-%d'),
+                      **ENDPOINTS[endpoint](values, query)}
+            body = json.dumps(_jsonable(result)).encode()
+            self.cache.put(key, body)
+        return body
+
+    def respond(self, endpoint, query):
+        """HTTP status and body for a query; failures become JSON error messages."""
+        try:
+            return 200, self.answer(endpoint, query)
+        except QueryError as exc:
+            status, message = exc.status, str(exc)
+        except quality.DataQualityError as exc:
+            status, message = 422, str(exc)
+        except FileNotFoundError as exc:
+            status, message = 404, f"Missing input: {exc.filename}"
+        except Exception as exc:
+            # Anything else is a bug, but the client still gets an answer and the service keeps running
+            traceback.print_exc()
+            status, message = 500, f"{type(exc).__name__}: {exc}"
+        return status, json.dumps({'error': message}).encode()
+
+    def warm(self, as_of=None):
+        """Compute every endpoint's values for each artist ahead of the first request."""
+        as_of = _as_of({'as_of': as_of})
+        names = tuple(dict.fromkeys(name for names in ENDPOINT_VALUES.values() for name in names))
+        for artist, session in self.sessions.items():
+            started = time.perf_counter()
+            try:
+                with self.lock:
+                    session.values(names, as_of)
+            except (quality.DataQualityError, FileNotFoundError) as exc:
+                print(f"✗ Could not warm {artist}: {type(exc).__name__}: {exc}")
+                continue
+            print(f"✓ Warmed {artist} ({time.perf_counter() - started:.2f}s)")
+
+
+# ============================================================================
+# HTTP SERVER
+# ============================================================================
+
+class QueryHandler(BaseHTTPRequestHandler):
+    """GET /<endpoint>?artist=...&as_of=...&metric=...&k=...&window=... -> JSON."""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        status, body = self.server.service.respond(url.path.strip('/'), query)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Dashboards poll; per-request access lines would drown the console
+        pass
+
+
+def serve(service, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """Serve `service` over HTTP until interrupted."""
+    server = ThreadingHTTPServer((host, port), QueryHandler)
+    server.service = service
+    print(f"✓ Serving {', '.join(ENDPOINTS)} for {len(service.sessions)} artist(s) on http://{host}:{port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the analysis metrics of one or more artists over local HTTP.")
+    parser.add_argument('--manifest', default=None, help="Roster manifest CSV (artist, data_dir) to serve")
+    parser.add_argument('--data-dir', default=big_nose_analysis.DATA_DIR,
+                        help="Data directory of the single artist served without a manifest")
+    parser.add_argument('--artist', default=big_nose_analysis.ARTIST, help="Artist served without a manifest")
+    parser.add_argument('--host', default=DEFAULT_HOST, help="Interface to listen on")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="Port to listen on")
+    parser.add_argument('--cache-size', type=int, default=CACHE_SIZE, help="Computed results kept in the LRU cache")
+    parser.add_argument('--cache-dir', default=None, help="Reuse cleaned input frames cached here")
+    parser.add_argument('--warehouse', default=None, help="Read the inputs from this SQLite warehouse")
+    parser.add_argument('--quality-gate', choices=quality.GATE_LEVELS, default='errors',
+                        help="Refuse queries for artists whose inputs fail the gate at this level")
+    parser.add_argument('--no-warm', action='store_true', help="Compute values on the first request instead of at startup")
+    args = parser.parse_args()
+
+    artists = read_manifest(args.manifest) if args.manifest else [{'artist': args.artist, 'data_dir': args.data_dir}]
+    service = QueryService(artists, {'cache_dir': args.cache_dir, 'warehouse_path': args.warehouse,
+                                     'quality_gate': args.quality_gate}, args.cache_size)
+    if not args.no_warm:
+        service.warm()
+    serve(service, args.host, args.port)
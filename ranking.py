@@ -0,0 +1,59 @@
+"""
+Ranking Index
+Descending row order per metric, built once per frame and sliced for any top-k query
+"""
+
+import numpy as np
+import pandas as pd
+
+RANKED_METRICS = ('Amount', 'streams', 'listeners', 'saves')
+
+
+def _descending(values):
+    # Sort keys (negated values) and row positions; ties stay in row order and NaN sorts last, as in nlargest
+    keys = -values
+    order = np.argsort(keys, kind='stable')
+    return keys[order], order
+
+
+class RankingIndex:
+    """Top-k lookups over a frame's metric columns.
+
+    `top(metric, k)` returns the same rows, in the same order, as `frame.nlargest(k, metric)`, in O(k)
+    once the index is built. `append` merges new rows into the existing order instead of re-sorting.
+    """
+
+    def __init__(self, frame, metrics=RANKED_METRICS):
+        self.frame = frame
+        self.keys = {}
+        self.order = {}
+        for metric in metrics:
+            if metric in frame.columns:
+                self.keys[metric], self.order[metric] = _descending(frame[metric].to_numpy(dtype=float, na_value=np.nan))
+
+    def positions(self, metric, k):
+        """Row positions of the k largest values of `metric`."""
+        return self.order[metric][:k]
+
+    def top(self, metric, k, columns=None):
+        """Rows with the k largest values of `metric` (optionally only `columns`)."""
+        rows = self.frame.iloc[self.positions(metric, k)]
+        return rows if columns is None else rows[columns]
+
+    def top_sum(self, metric, k):
+        """Sum of the k largest values of `metric`."""
+        return self.frame[metric].iloc[self.positions(metric, k)].sum()
+
+    def append(self, new_rows):
+        """Add rows to the end of the frame, merging them into every metric order."""
+        offset = len(self.frame)
+        self.frame = pd.concat([self.frame, new_rows])
+        for metric in self.order:
+            keys, positions = _descending(new_rows[metric].to_numpy(dtype=float, na_value=np.nan))
+            # Existing rows come first among equal values, matching nlargest on the combined frame
+            at = np.searchsorted(self.keys[metric], keys, side='right')
+            self.keys[metric] = np.insert(self.keys[metric], at, keys)
+            self.order[metric] = np.insert(self.order[metric], at, positions + offset)
+
+    def __len__(self):
+        return len(self.frame)
@@ -0,0 +1,274 @@
+"""
+Time Rollup Cube
+Daily calendar grid with prefix sums and week/month/quarter/year rollups for constant-time windows
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+# Rollup levels and their calendar periods (weeks end on Sunday)
+LEVELS = {'day': 'D', 'week': 'W-SUN', 'month': 'M', 'quarter': 'Q', 'year': 'Y'}
+
+
+def _ffill(values, seed=np.nan):
+    filled = pd.Series(values, dtype=float).ffill().to_numpy()
+    return np.where(np.isnan(filled), seed, filled)
+
+
+class RollupCube:
+    """Metrics on a gap-free daily grid: `sums` are added up over a window, `lasts` are read at its edges.
+
+    Prefix sums over the grid answer any [start, end] window in O(1), since a date's grid position is its
+    day offset from the origin. The period boundaries of each rollup level are computed once per level,
+    so a rollup over a range costs one prefix-sum difference per period rather than a rescan of the days.
+    """
+
+    def __init__(self, sums=(), lasts=()):
+        self.sums = tuple(sums)
+        self.lasts = tuple(lasts)
+        self.origin = None
+        self.daily = {name: np.empty(0) for name in self.sums + self.lasts}
+        # Length of each array already written by `to_dict(array_dir)`, whose elements but the last are final
+        self._committed = {}
+        self._rebuild(0)
+
+    def __len__(self):
+        return len(next(iter(self.daily.values()))) if self.daily else 0
+
+    @classmethod
+    def from_frame(cls, frame, date_column='date', sums=(), lasts=()):
+        """Build the cube from rows dated by `date_column` (in any order; undated rows are ignored)."""
+        cube = cls(sums, lasts)
+        cube.extend(frame, date_column)
+        return cube
+
+    # ------------------------------------------------------------------
+    # Folding
+    # ------------------------------------------------------------------
+
+    def extend(self, frame, date_column='date'):
+        """Fold in rows dated on or after the cube's last day; days between are filled as empty."""
+        days = frame[date_column].dt.floor('D')
+        frame, days = frame[days.notna()], days[days.notna()]
+        if len(frame) == 0:
+            return
+        grouped = frame.groupby(days, sort=True)
+        daily = pd.concat([grouped[list(self.sums)].sum(min_count=1), grouped[list(self.lasts)].last()], axis=1)
+        if self.origin is None:
+            self.origin = daily.index[0]
+        positions = (daily.index - self.origin).days.to_numpy()
+        first, stored = positions[0], len(self)
+        if first < stored - 1:
+            raise ValueError("Rows folded into a rollup cube must not predate its last day")
+
+        size = positions[-1] + 1
+        for name in self.sums + self.lasts:
+            values = np.full(size, np.nan)
+            values[:stored] = self.daily[name]
+            new = daily[name].to_numpy(dtype=float, na_value=np.nan, copy=True)
+            if first == stored - 1:
+                # The first new day continues the last stored day
+                old = values[first]
+                if name in self.sums:
+                    new[0] = new[0] if np.isnan(old) else old + np.nan_to_num(new[0])
+                elif np.isnan(new[0]):
+                    new[0] = old
+            values[positions] = new
+            self.daily[name] = values
+        # From the continued day, or from the first empty day when the new rows start after a gap
+        self._rebuild(min(first, stored))
+
+    def _rebuild(self, start):
+        # Refresh the prefix sums and forward-filled edges from grid position `start` onwards
+        if start == 0:
+            self._prefix = {name: np.zeros(1) for name in self.sums}
+            self._present = {name: np.zeros(1, dtype=np.int64) for name in self.sums}
+            self._filled = {name: np.empty(0) for name in self.lasts}
+        for name in self.sums:
+            values = self.daily[name][start:]
+            self._prefix[name] = np.concatenate([self._prefix[name][:start + 1],
+                                                 self._prefix[name][start] + np.cumsum(np.nan_to_num(values))])
+            self._present[name] = np.concatenate([self._present[name][:start + 1],
+                                                  self._present[name][start] + np.cumsum(~np.isnan(values))])
+        for name in self.lasts:
+            seed = self._filled[name][start - 1] if start else np.nan
+            self._filled[name] = np.concatenate([self._filled[name][:start], _ffill(self.daily[name][start:], seed)])
+        self._levels = {}
+
+    # ------------------------------------------------------------------
+    # Windows
+    # ------------------------------------------------------------------
+
+    def _position(self, when):
+        return (pd.Timestamp(when).floor('D') - self.origin).days
+
+    def _span(self, start=None, end=None):
+        # Grid positions [lo, hi) of the days from `start` through `end`, clipped to the grid
+        if self.origin is None:
+            return 0, 0
+        lo = 0 if pd.isna(start) else min(max(self._position(start), 0), len(self))
+        hi = len(self) if pd.isna(end) else min(max(self._position(end) + 1, 0), len(self))
+        return lo, max(lo, hi)
+
+    def _window(self, lo, hi):
+        window = {'days': hi - lo}
+        for name in self.sums:
+            present = self._present[name][hi] - self._present[name][lo]
+            window[name] = self._prefix[name][hi] - self._prefix[name][lo] if present else np.nan
+        for name in self.lasts:
+            window[f'{name}_first'] = self._filled[name][lo] if hi > lo else np.nan
+            window[f'{name}_last'] = self._filled[name][hi - 1] if hi > lo else np.nan
+        return window
+
+    def window(self, start=None, end=None):
+        """Sums over the days from `start` through `end` (inclusive), and the last values at both edges.
+
+        `{name}_first` is the latest value known on the first day, `{name}_last` on the last day.
+        """
+        lo, hi = self._span(start, end)
+        window = self._window(lo, hi)
+        window['start'] = self.origin + pd.Timedelta(days=lo) if hi > lo else pd.NaT
+        window['end'] = self.origin + pd.Timedelta(days=hi - 1) if hi > lo else pd.NaT
+        return window
+
+    def windows(self, starts, ends):
+        """`window` for many [start, end] pairs at once, one row per pair (without the `start`/`end` keys).
+
+        Each bound becomes a grid position by its day offset, so every window is a pair of prefix-sum
+        lookups and the edges read the forward-filled values: no per-window filtering of the days.
+        """
+        starts, ends = pd.DatetimeIndex(starts).floor('D'), pd.DatetimeIndex(ends).floor('D')
+        # Undated pairs get empty windows
+        lo = hi = np.zeros(len(starts), dtype=np.int64)
+        if self.origin is not None:
+            dated = ~(starts.isna() | ends.isna())
+            first = np.where(dated, (starts - self.origin).days.fillna(0).to_numpy(dtype=np.int64), 0)
+            last = np.where(dated, (ends - self.origin).days.fillna(-1).to_numpy(dtype=np.int64) + 1, 0)
+            lo = np.clip(first, 0, len(self))
+            hi = np.maximum(np.clip(last, 0, len(self)), lo)
+        table = {'days': hi - lo}
+        for name in self.sums:
+            totals = self._prefix[name][hi] - self._prefix[name][lo]
+            present = self._present[name][hi] - self._present[name][lo]
+            table[name] = np.where(present > 0, totals, np.nan)
+            table[f'{name}_days'] = present
+        for name in self.lasts:
+            filled = np.r_[self._filled[name], np.nan]
+            table[f'{name}_first'] = np.where(hi > lo, filled[np.minimum(lo, len(self))], np.nan)
+            table[f'{name}_last'] = np.where(hi > lo, filled[hi - 1], np.nan)
+        return pd.DataFrame(table)
+
+    def trailing(self, days, as_of=None):
+        """The window of the `days` days ending on `as_of` (default: the last day of the grid)."""
+        end = pd.Timestamp(as_of).floor('D') if as_of is not None else self.origin + pd.Timedelta(days=len(self) - 1)
+        return self.window(end - pd.Timedelta(days=days - 1), end)
+
+    def period(self, level, when):
+        """The window of the calendar period (e.g. level 'quarter', when '2025Q3') containing `when`."""
+        period = pd.Period(when, freq=LEVELS[level])
+        return self.window(period.start_time, period.end_time)
+
+    # ------------------------------------------------------------------
+    # Rollups
+    # ------------------------------------------------------------------
+
+    def _boundaries(self, level):
+        # Period labels of the grid and the grid position each period starts at
+        if level not in self._levels:
+            days = pd.period_range(self.origin or pd.Timestamp(0), periods=len(self), freq='D')
+            periods = days.asfreq(LEVELS[level])
+            starts = np.flatnonzero(np.r_[len(periods) > 0, periods[1:] != periods[:-1]])
+            self._levels[level] = (periods[starts], starts)
+        return self._levels[level]
+
+    def rollup(self, level, start=None, end=None):
+        """One row per `level` period overlapping [start, end], edge periods clipped to the range.
+
+        Columns: `end` (the period's last day in range), `days` (grid days in range), the summed metrics
+        and `{name}` for each last-value metric (its value on `end`).
+        """
+        lo, hi = self._span(start, end)
+        labels, starts = self._boundaries(level)
+        first = max(np.searchsorted(starts, lo, 'right') - 1, 0)
+        last = np.searchsorted(starts, hi, 'left') if hi > lo else first
+        edges = np.clip(np.r_[starts[first:last], hi], lo, hi)
+        left, right = edges[:-1], edges[1:]
+        table = {'end': (self.origin or pd.Timestamp(0)) + pd.to_timedelta(right - 1, unit='D'), 'days': right - left}
+        for name in self.sums:
+            totals = self._prefix[name][right] - self._prefix[name][left]
+            present = self._present[name][right] - self._present[name][left]
+            table[name] = np.where(present > 0, totals, np.nan)
+        for name in self.lasts:
+            table[name] = self._filled[name][right - 1] if len(right) else np.empty(0)
+        return pd.DataFrame(table, index=labels[first:first + len(left)].rename(level))
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _arrays(self):
+        # Every array the cube keeps, by file name
+        arrays = {}
+        for name in self.sums:
+            arrays.update({f'{name}.daily': self.daily[name], f'{name}.prefix': self._prefix[name],
+                           f'{name}.present': self._present[name]})
+        for name in self.lasts:
+            arrays.update({f'{name}.daily': self.daily[name], f'{name}.filled': self._filled[name]})
+        return arrays
+
+    def to_dict(self, array_dir=None):
+        """JSON-ready form of the cube; with `array_dir`, the arrays are appended to files there instead.
+
+        Folding in new days only ever changes the last element of each array already held (a day
+        continued by rows of the same date) and appends the rest. So each file holds every element but
+        the last, which goes in the returned dict along with the array lengths; a save writes only the
+        elements added since the previous one, and the dict stays the commit point (trailing bytes
+        from an interrupted save are overwritten by the next).
+        """
+        data = {'sums': list(self.sums), 'lasts': list(self.lasts),
+                'origin': self.origin.isoformat() if self.origin is not None else None}
+        if array_dir is None:
+            data['daily'] = {name: values.tolist() for name, values in self.daily.items()}
+            return data
+
+        os.makedirs(array_dir, exist_ok=True)
+        data['arrays'] = {}
+        for file, values in self._arrays().items():
+            start = max(self._committed.get(file, 0) - 1, 0)
+            path = os.path.join(array_dir, f'{file}.bin')
+            with open(path, 'r+b' if os.path.exists(path) else 'wb') as f:
+                f.seek(start * values.itemsize)
+                f.truncate()
+                f.write(values[start:-1].astype(values.dtype.newbyteorder('<'), copy=False).tobytes())
+            data['arrays'][file] = {'dtype': values.dtype.str, 'length': len(values),
+                                    'last': values[-1].item() if len(values) else None}
+        self._committed = {file: array['length'] for file, array in data['arrays'].items()}
+        return data
+
+    @classmethod
+    def from_dict(cls, data, array_dir=None):
+        """Cube from `to_dict` output; array files are memory-mapped and nothing is recomputed."""
+        cube = cls(data['sums'], data['lasts'])
+        cube.origin = pd.Timestamp(data['origin']) if data['origin'] else None
+        if 'daily' in data:
+            cube.daily = {name: np.asarray(values, dtype=float) for name, values in data['daily'].items()}
+            cube._rebuild(0)
+            return cube
+
+        arrays = {}
+        for file, array in data['arrays'].items():
+            dtype, length = np.dtype(array['dtype']), array['length']
+            stored = (np.memmap(os.path.join(array_dir, f'{file}.bin'), dtype=dtype.newbyteorder('<'), mode='r',
+                                shape=(length - 1,)) if length > 1 else np.empty(0, dtype=dtype))
+            arrays[file] = np.append(stored, np.asarray([array['last']] if length else [], dtype=dtype))
+        for name in cube.sums:
+            cube.daily[name] = arrays[f'{name}.daily']
+            cube._prefix[name] = arrays[f'{name}.prefix']
+            cube._present[name] = arrays[f'{name}.present']
+        for name in cube.lasts:
+            cube.daily[name] = arrays[f'{name}.daily']
+            cube._filled[name] = arrays[f'{name}.filled']
+        cube._committed = {file: array['length'] for file, array in data['arrays'].items()}
+        return cube
@@ -0,0 +1,155 @@
+"""
+Royalty Statement Ledger
+Chunked reduction of line-item royalty statements to per-song earnings in bounded memory
+"""
+
+import numpy as np
+import pandas as pd
+
+import compact_frames
+
+# Distributor statement columns (one row per song, store, territory and month) and their names here
+STATEMENT_COLUMNS = {
+    'Title': 'Song Title',
+    'Artist': 'Artist',
+    'Sale Month': 'month',
+    'Store': 'store',
+    'Country of Sale': 'territory',
+    'Quantity': 'units',
+    'Earnings (USD)': 'Amount',
+}
+REQUIRED_COLUMNS = ('Title', 'Artist', 'Earnings (USD)')
+
+SONG_KEYS = ['Song Title', 'Artist']
+ROLLUP_KEYS = ['Song Title', 'month', 'territory']
+TOTALS = ['Amount', 'units']
+
+# Layout of the per-song earnings export that the statements are reduced to
+EARNINGS_COLUMNS = ('Song Title', 'Artist', 'Type', 'Amount', 'listeners', 'streams', 'saves', 'release_date', 'Notes')
+
+# Line items read per chunk: bounds the memory of a pass regardless of the statement's length
+CHUNK_ROWS = 500_000
+
+
+def _amounts(series):
+    if not pd.api.types.is_numeric_dtype(series):
+        series = series.str.replace('$', '', regex=False).str.replace(',', '', regex=False)
+    return pd.to_numeric(series, errors='coerce')
+
+
+def read_statements(path, chunk_rows=CHUNK_ROWS):
+    """Yield the line items of a statement file in typed chunks of at most `chunk_rows` rows."""
+    text = {name: str for name in ('Title', 'Artist', 'Sale Month', 'Store', 'Country of Sale')}
+    chunks = pd.read_csv(path, usecols=lambda name: name in STATEMENT_COLUMNS, dtype=text, chunksize=chunk_rows,
+                         encoding='utf-8-sig')
+    for chunk in chunks:
+        missing = [name for name in REQUIRED_COLUMNS if name not in chunk.columns]
+        if missing:
+            raise ValueError(f"{path} is missing statement columns {missing}")
+        chunk = chunk.rename(columns=STATEMENT_COLUMNS)
+        chunk['Amount'] = _amounts(chunk['Amount'])
+        chunk['units'] = pd.to_numeric(chunk['units'], errors='coerce') if 'units' in chunk else np.nan
+        yield chunk
+
+
+def _whole_units(frame):
+    # Sums over missing quantities come back as float; restore whole unit counts as nullable integers
+    frame['units'] = compact_frames.downcast_counts(frame['units'])
+    return frame
+
+
+class KeyedSums:
+    """Sums of the amount and unit columns per key, folded in from chunk-level partial sums.
+
+    Partials are buffered and merged with one concat + groupby once they outgrow the merged totals
+    (or `buffer_rows`), so memory stays within a small multiple of the distinct keys plus one buffer.
+    A missing key value is a key of its own, so no line item's amount is dropped from the totals.
+    """
+
+    def __init__(self, keys, buffer_rows=CHUNK_ROWS):
+        self.keys = keys
+        self.buffer_rows = buffer_rows
+        self._merged = None
+        self._pending = []
+        self._pending_rows = 0
+
+    def add(self, items):
+        """Add the line items of one chunk."""
+        part = items.groupby(self.keys, sort=False, dropna=False)[TOTALS].sum()
+        self._pending.append(part)
+        self._pending_rows += len(part)
+        if self._pending_rows > max(self.buffer_rows, 0 if self._merged is None else len(self._merged)):
+            self._merge()
+
+    def _merge(self):
+        parts = ([] if self._merged is None else [self._merged]) + self._pending
+        if parts:
+            self._merged = parts[0] if len(parts) == 1 else pd.concat(parts).groupby(level=self.keys, sort=False, dropna=False).sum()
+        self._pending, self._pending_rows = [], 0
+
+    def frame(self):
+        """The totals so far, one row per key."""
+        self._merge()
+        if self._merged is None:
+            return pd.DataFrame(columns=self.keys + TOTALS)
+        return _whole_units(self._merged.reset_index())
+
+
+class RoyaltyLedger:
+    """Running per-song totals of a line-item statement, optionally also per song, month and territory.
+
+    Chunks are folded in one at a time, so memory is bounded by one chunk plus the distinct keys.
+    """
+
+    def __init__(self, rollup=False):
+        self.line_items = 0
+        self.totals = KeyedSums(SONG_KEYS)
+        self.rollup = KeyedSums(ROLLUP_KEYS) if rollup else None
+
+    @property
+    def rows(self):
+        return len(self.totals.frame())
+
+    def add(self, chunk):
+        """Fold one chunk of line items into the running totals."""
+        self.line_items += len(chunk)
+        # Line items without a title cannot be attributed to a song
+        chunk = chunk[chunk['Song Title'].notna()]
+        self.totals.add(chunk)
+        if self.rollup is not None:
+            self.rollup.add(chunk.reindex(columns=ROLLUP_KEYS + TOTALS).fillna({'month': 'Unknown',
+                                                                                'territory': 'Unknown'}))
+
+    def songs(self):
+        """Per-song totals as a frame (Song Title, Artist, Amount, units)."""
+        return self.totals.frame()
+
+    def rollup_frame(self):
+        """Per song, month and territory totals, or None when the rollup was not kept."""
+        if self.rollup is None:
+            return None
+        return self.rollup.frame().sort_values(ROLLUP_KEYS, ignore_index=True)
+
+    def earnings_frame(self, metadata=None):
+        """The totals in the per-song earnings export's layout.
+
+        Statement totals supply `Amount` (and `Artist`); release dates, audience counts and notes are taken
+        from `metadata` (such as the per-song export) where the title and artist match, or the title alone
+        when `metadata` has no `Artist` column (the lifetime songs export).
+        """
+        frame = self.songs().drop(columns='units')
+        if metadata is not None:
+            keys = [name for name in SONG_KEYS if name in metadata.columns]
+            columns = [name for name in EARNINGS_COLUMNS if name not in frame.columns and name in metadata.columns]
+            details = metadata.drop_duplicates(keys)[keys + columns]
+            details = details.astype({name: frame[name].dtype for name in keys})
+            frame = frame.merge(details, on=keys, how='left')
+        return compact_frames.compact(frame[[name for name in EARNINGS_COLUMNS if name in frame.columns]])
+
+
+def aggregate_statements(path, rollup=False, chunk_rows=CHUNK_ROWS):
+    """Reduce a line-item statement file to a RoyaltyLedger without holding more than one chunk."""
+    ledger = RoyaltyLedger(rollup)
+    for chunk in read_statements(path, chunk_rows):
+        ledger.add(chunk)
+    return ledger
@@ -0,0 +1,66 @@
+"""
+Song Catalog
+Normalized song titles with integer IDs and a row-to-song join index for every input source
+"""
+
+import numpy as np
+import pandas as pd
+
+# Featured-artist credits are dropped from the title key: "Ghost Driver (feat. LUMRY)" == "Ghost Driver", while
+# words that merely end in one ("Defeat Me") are kept
+FEATURE_PATTERN = r'\s*[\(\[]?\s*\b(?:feat\.?|ft\.|featuring)\s.*$'
+
+
+def normalize_titles(titles):
+    """Join keys for song titles: NFKC, case-folded, featured credits dropped, whitespace collapsed."""
+    return (pd.Series(titles, dtype=object).astype(str)
+            .str.normalize('NFKC').str.casefold()
+            .str.replace(FEATURE_PATTERN, '', regex=True)
+            .str.replace(r'\s+', ' ', regex=True).str.strip())
+
+
+class SongCatalog:
+    """Every song seen in any source, keyed by a compact integer ID.
+
+    `sources[name]` holds the song ID of each row of that source (-1 for a missing title), so joining
+    two sources is an integer take over per-song arrays rather than a string merge.
+    """
+
+    def __init__(self):
+        self.keys = pd.Index([], dtype=object)
+        self.titles = []
+        self.sources = {}
+
+    def __len__(self):
+        return len(self.titles)
+
+    def register(self, source, titles):
+        """Assign IDs to the titles of one source (new titles get new IDs) and index its rows."""
+        codes, uniques = pd.factorize(pd.Series(titles, dtype=object).reset_index(drop=True))
+        keys = normalize_titles(uniques)
+        fresh = ~keys.isin(self.keys) & ~keys.duplicated()
+        # New songs take the next IDs; the first spelling seen becomes the display title
+        self.keys = self.keys.append(pd.Index(keys[fresh]))
+        self.titles.extend(pd.Series(uniques)[fresh.to_numpy()].tolist())
+        # Missing titles factorize to code -1, which picks the trailing -1
+        unique_ids = np.append(self.keys.get_indexer(keys), -1).astype(np.int32)
+        self.sources[source] = unique_ids[codes]
+        return self.sources[source]
+
+    def matched(self, source):
+        """Number of distinct catalog songs the source has rows for."""
+        ids = self.sources[source]
+        return len(np.unique(ids[ids >= 0]))
+
+    def aligned(self, source, values):
+        """Per-song sum of a source column, indexed by song ID (NaN for songs the source lacks)."""
+        ids = self.sources[source]
+        values = pd.Series(values).to_numpy(dtype=float, na_value=np.nan)
+        keep = (ids >= 0) & ~np.isnan(values)
+        totals = np.bincount(ids[keep], weights=values[keep], minlength=len(self))
+        present = np.bincount(ids[keep], minlength=len(self)) > 0
+        return np.where(present, totals, np.nan)
+
+    def frame(self):
+        """The catalog as a frame indexed by song ID."""
+        return pd.DataFrame({'title': self.titles}, index=pd.RangeIndex(len(self), name='song_id'))
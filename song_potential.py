@@ -0,0 +1,97 @@
+"""
+High-Potential Song Detection
+Catalog-wide save rate, replay depth and momentum, scored with robust z-scores against the rest of the catalog
+"""
+
+import numpy as np
+import pandas as pd
+
+# Songs need this many 1-year streams before their rates are trusted
+MIN_STREAMS = 100
+
+# Robust z-score a candidate's potential must reach
+MIN_SCORE = 1.0
+
+# MAD-to-standard-deviation factor for normally distributed values
+MAD_SCALE = 1.4826
+
+# Signals of fan interest, each scored on a log scale so ratios count the same up and down
+SIGNALS = ('save_rate', 'streams_per_listener', 'momentum')
+
+
+def robust_z(values):
+    """(x - median) / (1.4826 * MAD), with the median and MAD taken over the finite values.
+
+    Infinite values keep their sign (a zero rate on a log scale scores -inf), NaN stays NaN, and every
+    score is 0 when the spread is zero.
+    """
+    values = np.asarray(values, dtype=float)
+    finite = np.isfinite(values)
+    if not finite.any():
+        return np.full(len(values), np.nan)
+    median = np.median(values[finite])
+    mad = MAD_SCALE * np.median(np.abs(values[finite] - median))
+    z = (values - median) / mad if mad > 0 else np.zeros(len(values))
+    return np.where(np.isnan(values), np.nan, z)
+
+
+def release_days(song_catalog, songs_1year_df, songs_all_df):
+    """Release day of every catalog song (days since the epoch, NaN when unknown) from either source.
+
+    The 1-year export wins where both carry a date.
+    """
+    release = np.full(len(song_catalog), np.nan)
+    for source, frame in (('songs_all', songs_all_df), ('songs_1year', songs_1year_df)):
+        days = (pd.to_datetime(frame['release_date'], errors='coerce') - pd.Timestamp(0)).dt.days
+        days = days.to_numpy(dtype=float, na_value=np.nan)
+        ids = song_catalog.sources[source]
+        keep = (ids >= 0) & ~np.isnan(days)
+        release[ids[keep]] = days[keep]
+    return release
+
+
+def song_signals(song_catalog, songs_1year_df, songs_all_df, as_of):
+    """Per-song 1-year and lifetime totals plus the potential signals, indexed by catalog song ID.
+
+    `save_rate` is saves per 1-year stream, `streams_per_listener` the 1-year replay depth and
+    `momentum` the 1-year share of lifetime streams times the song's age in years (capped below at one
+    year), about 1 for a song streaming at a steady pace and above 1 for one that is picking up.
+    """
+    signals = song_catalog.frame()
+    for column in ('streams', 'listeners', 'saves'):
+        signals[f'{column}_1yr'] = song_catalog.aligned('songs_1year', songs_1year_df[column])
+    signals['lifetime_streams'] = song_catalog.aligned('songs_all', songs_all_df['streams'])
+
+    release = release_days(song_catalog, songs_1year_df, songs_all_df)
+    age_years = ((pd.Timestamp(as_of) - pd.Timestamp(0)).days - release) / 365.25
+
+    streams = signals['streams_1yr'].where(signals['streams_1yr'] >= MIN_STREAMS)
+    lifetime = signals['lifetime_streams'].where(signals['lifetime_streams'] > 0)
+    signals['save_rate'] = signals['saves_1yr'] / streams
+    signals['streams_per_listener'] = streams / signals['listeners_1yr'].where(signals['listeners_1yr'] > 0)
+    signals['momentum'] = (streams / lifetime).clip(upper=1) * np.maximum(age_years, 1)
+    return signals
+
+
+def detect(song_catalog, songs_1year_df, songs_all_df, as_of, min_score=MIN_SCORE):
+    """Ranked high-potential songs: strong fan-interest signals on below-median 1-year streams.
+
+    Each signal is log-scaled and robust z-scored against every song with enough streams; `potential`
+    is the mean of the available signal scores. Candidates score at least `min_score` and have 1-year
+    streams below the catalog median, so the list is of songs the audience responds to but that have
+    not yet been pushed. Returns the full signal table and the ranked candidates.
+    """
+    signals = song_signals(song_catalog, songs_1year_df, songs_all_df, as_of)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scores = np.column_stack([robust_z(np.log(signals[name].to_numpy(dtype=float, na_value=np.nan)))
+                                  for name in SIGNALS])
+        streams_z = robust_z(np.log(signals['streams_1yr'].where(signals['streams_1yr'] >= MIN_STREAMS)
+                                    .to_numpy(dtype=float, na_value=np.nan)))
+    for name, column in zip(SIGNALS, scores.T):
+        signals[f'{name}_z'] = column
+    counted = (~np.isnan(scores)).sum(axis=1)
+    signals['potential'] = np.where(counted > 0, np.nansum(scores, axis=1) / np.maximum(counted, 1), np.nan)
+
+    candidates = signals[(signals['potential'] >= min_score) & (streams_z < 0)]
+    candidates = candidates.sort_values('potential', ascending=False, kind='stable')
+    return signals, candidates
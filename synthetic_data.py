@@ -0,0 +1,155 @@
+"""
+Synthetic Artist Data Generator
+Writes schema-identical artist exports at configurable scale for benchmarking
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from big_nose_analysis import INPUT_FILES
+
+DEFAULT_ARTIST = "Synthetic Artist"
+
+TITLE_WORDS = ['Lavender', 'Suburbs', 'Dust', 'Sailing', 'Cliffside', 'Birthday', 'Elephants', 'Hotel',
+               'Morning', 'Static', 'Velvet', 'Harbor', 'Neon', 'Paper', 'Drift', 'Summer', 'Tape', 'Moon']
+
+
+def _titles(rng, count):
+    # Two words plus a serial keeps titles unique at any scale
+    first = rng.choice(TITLE_WORDS, count)
+    second = rng.choice(TITLE_WORDS, count)
+    return pd.Series(first).str.cat([pd.Series(second), pd.Series(np.arange(count)).astype(str)], sep=' ')
+
+
+STORES = ['Spotify', 'Apple Music', 'YouTube Music', 'Amazon Music', 'Tidal', 'Deezer']
+TERRITORIES = ['US', 'GB', 'DE', 'FR', 'BR', 'MX', 'JP', 'SE', 'AU', 'CA']
+
+# Songs per block when writing line-item statements, so generation memory stays flat at any scale
+STATEMENT_BLOCK_SONGS = 50_000
+
+
+def _write_statements(path, rng, titles, artists, amounts, release, end, items_per_song):
+    # Each song's cents are split over its line items, so the statement reduces back to the export's Amount
+    end_month = end.year * 12 + end.month - 1
+    release_month = (release.year * 12 + release.month - 1).to_numpy()
+    for start in range(0, len(titles), STATEMENT_BLOCK_SONGS):
+        block = slice(start, start + STATEMENT_BLOCK_SONGS)
+        count = len(titles[block])
+        cents = np.round(amounts[block] * 100).astype(np.int64)
+        weights = rng.random((count, items_per_song))
+        split = np.floor(weights / weights.sum(axis=1, keepdims=True) * cents[:, None]).astype(np.int64)
+        split[:, 0] += cents - split.sum(axis=1)
+        first = np.repeat(release_month[block], items_per_song)
+        month = first + np.floor(rng.random(first.size) * (end_month - first + 1)).astype(np.int64)
+        split = split.ravel()
+        items = pd.DataFrame({
+            'Sale Month': pd.Series(month // 12).astype(str) + '-' + pd.Series(month % 12 + 1).astype(str).str.zfill(2),
+            'Store': rng.choice(STORES, split.size),
+            'Artist': np.repeat(artists[block], items_per_song),
+            'Title': np.repeat(titles[block].to_numpy(), items_per_song),
+            'Quantity': np.round(split / 0.3).astype(np.int64),
+            'Country of Sale': rng.choice(TERRITORIES, split.size),
+            'Earnings (USD)': split / 100,
+        })
+        items.to_csv(path, mode='w' if start == 0 else 'a', header=start == 0, index=False)
+
+
+def generate(output_dir, artist=DEFAULT_ARTIST, songs=130, days=1090, playlists=100, seed=0,
+             end_date='2025-12-23', items_per_song=12):
+    """Write the input exports for a synthetic artist under `output_dir` and return their paths.
+
+    The line-item royalty statements hold `items_per_song` rows per song (0 leaves them out).
+    """
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp(end_date)
+    os.makedirs(os.path.join(output_dir, 'Earnings_Per_Songs'), exist_ok=True)
+    os.makedirs(os.path.join(output_dir, 'Spotify_Analysis'), exist_ok=True)
+
+    # Song catalog: release dates over ten years, heavy-tailed lifetime streams, decaying recent share
+    titles = _titles(rng, songs)
+    release = end - pd.to_timedelta(rng.integers(30, 3650, songs), unit='D')
+    age_years = (end - release).days.to_numpy() / 365.25
+    lifetime_streams = np.round(rng.lognormal(6.5, 2.0, songs)).astype(np.int64)
+    recent_share = np.clip(np.exp(-age_years / 2.5) * rng.uniform(0.2, 1.0, songs), 0.0, 1.0)
+    streams_1yr = np.round(lifetime_streams * recent_share).astype(np.int64)
+    listeners_1yr = np.round(streams_1yr / rng.uniform(1.1, 3.0, songs)).astype(np.int64)
+    saves_1yr = rng.binomial(streams_1yr, 0.004)
+    release_text = release.strftime('%Y-%m-%d')
+
+    songs_1year = pd.DataFrame({'song': titles, 'listeners': listeners_1yr, 'streams': streams_1yr,
+                                'saves': saves_1yr, 'release_date': release_text})
+    songs_all = pd.DataFrame({'song': titles, 'listeners': 0, 'streams': lifetime_streams, 'saves': 0,
+                              'release_date': release_text})
+
+    # Earnings: mostly the primary artist, some collaborations and some rows without metadata
+    artists = np.where(rng.random(songs) < 0.95, artist, f"Guest, {artist}")
+    artists = np.where(rng.random(songs) < 0.03, "Other Artist", artists)
+    amounts = np.round(lifetime_streams * 0.003 * rng.lognormal(0.0, 0.8, songs), 2)
+    earnings = pd.DataFrame({
+        'Song Title': titles,
+        'Artist': artists,
+        'Type': np.where(rng.random(songs) < 0.65, 'Single', 'Song on Album'),
+        'Amount': amounts,
+        'listeners': listeners_1yr.astype(float),
+        'streams': streams_1yr.astype(float),
+        'saves': saves_1yr.astype(float),
+        'release_date': release_text,
+        'Notes': np.where(rng.random(songs) < 0.04, '50% of splits', ''),
+    })
+    missing = rng.random(songs) < 0.04
+    earnings.loc[missing, ['listeners', 'streams', 'saves', 'release_date']] = np.nan
+
+    # Daily audience timeline ending at end_date with a slow follower random walk and stream spikes
+    dates = pd.date_range(end=end, periods=days, freq='D')
+    base = 800 * np.exp(np.cumsum(rng.normal(0.0, 0.03, days)))
+    spikes = np.where(rng.random(days) < 0.02, rng.uniform(2, 6, days), 1.0)
+    streams = np.round(base * spikes).astype(np.int64)
+    followers = np.maximum(300 + np.cumsum(rng.poisson(0.4, days) - rng.binomial(1, 0.15, days)), 0)
+    audience = pd.DataFrame({'date': dates.strftime('%Y-%m-%d'),
+                             'listeners': np.round(streams / rng.uniform(1.05, 1.3, days)).astype(np.int64),
+                             'streams': streams, 'followers': followers})
+
+    playlist_streams = np.round(rng.lognormal(4.5, 1.8, playlists)).astype(np.int64) + 10
+    playlist_df = pd.DataFrame({
+        'title': _titles(rng, playlists).radd('playlist '),
+        'author': np.where(rng.random(playlists) < 0.1, 'Spotify', '-'),
+        'listeners': np.round(playlist_streams / rng.uniform(1.2, 2.5, playlists)).astype(np.int64),
+        'streams': playlist_streams,
+        'date_added': (end - pd.to_timedelta(rng.integers(0, 365, playlists), unit='D')).strftime('%Y-%m-%d'),
+    })
+
+    paths = {name: os.path.join(output_dir, path.format(artist=artist)) for name, path in INPUT_FILES.items()}
+    # The Spotify exports carry a UTF-8 byte order mark; the distributor export does not
+    earnings.to_csv(paths['earnings_path'], index=False)
+    songs_1year.to_csv(paths['songs_1year_path'], index=False, encoding='utf-8-sig')
+    audience.to_csv(paths['audience_path'], index=False, encoding='utf-8-sig')
+    playlist_df.to_csv(paths['playlists_path'], index=False, encoding='utf-8-sig')
+    songs_all.to_csv(paths['songs_all_path'], index=False, encoding='utf-8-sig')
+    summary = earnings[['Song Title', 'Artist', 'Type', 'Amount', 'Notes']].rename(columns={'Song Title': 'Title'})
+    summary['Amount'] = summary['Amount'].map('${:,.2f}'.format)
+    summary.to_csv(paths['earnings_summary_path'], index=False)
+    if items_per_song:
+        _write_statements(paths['royalty_statements_path'], rng, titles, artists, amounts, release, end,
+                          items_per_song)
+    else:
+        del paths['royalty_statements_path']
+    return paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate schema-identical synthetic artist exports.")
+    parser.add_argument('output_dir', help="Data directory to create (Earnings_Per_Songs/, Spotify_Analysis/)")
+    parser.add_argument('--artist', default=DEFAULT_ARTIST)
+    parser.add_argument('--songs', type=int, default=130)
+    parser.add_argument('--days', type=int, default=1090, help="Daily audience points")
+    parser.add_argument('--playlists', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--items-per-song', type=int, default=12,
+                        help="Line items per song in the royalty statements (0: no statements)")
+    args = parser.parse_args()
+    for path in generate(args.output_dir, args.artist, args.songs, args.days, args.playlists, args.seed,
+                         items_per_song=args.items_per_song).values():
+        print(f"✓ Wrote {path}")
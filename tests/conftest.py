@@ -0,0 +1,18 @@
+import os
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+
+@pytest.fixture(scope='session')
+def synthetic_artist(tmp_path_factory):
+    """Data directory and input paths of a small synthetic artist, generated once per session."""
+    from synthetic_data import generate
+
+    data_dir = str(tmp_path_factory.mktemp('synthetic'))
+    paths = generate(data_dir, artist='Test Artist', songs=60, days=500, playlists=30, seed=3, items_per_song=4)
+    return {'artist': 'Test Artist', 'data_dir': data_dir, 'paths': paths}
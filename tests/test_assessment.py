@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+import assessment
+
+
+def _scalar_assessment(follower_growth_pct, total_streams_1yr, engagement_rate, total_earnings, songs_per_year,
+                       thresholds=None, tiers=(70, 50, 30)):
+    """The original PART 10 if/elif chain, with the thresholds as arguments."""
+    t = {'follower_growth': (20, 10, 0), 'stream_volume': (500000, 200000, 100000), 'engagement': (2, 1, 0.5),
+         'revenue': (2000, 1000, 500), 'content_velocity': (12, 6, 3), **(thresholds or {})}
+    scores = []
+
+    def above(value, cuts, band_scores):
+        for cut, score in zip(cuts, band_scores):
+            if value > cut:
+                return score
+        return band_scores[-1]
+
+    scores.append(above(follower_growth_pct, t['follower_growth'], (2, 1.5, 1, 0)))
+    scores.append(above(total_streams_1yr, t['stream_volume'], (2, 1.5, 1, 0.5)))
+    scores.append(above(engagement_rate, t['engagement'], (2, 1.5, 1, 0.5)))
+    scores.append(above(total_earnings, t['revenue'], (2, 1.5, 1, 0.5)))
+    if songs_per_year >= t['content_velocity'][0]:
+        scores.append(2)
+    elif songs_per_year >= t['content_velocity'][1]:
+        scores.append(1.5)
+    elif songs_per_year >= t['content_velocity'][2]:
+        scores.append(1)
+    else:
+        scores.append(0.5)
+
+    score = sum(scores)
+    pct = (score / 10) * 100
+    if pct >= tiers[0]:
+        verdict = "STRONG UPCOMING ARTIST"
+    elif pct >= tiers[1]:
+        verdict = "PROMISING UPCOMING ARTIST"
+    elif pct >= tiers[2]:
+        verdict = "EMERGING ARTIST"
+    else:
+        verdict = "EARLY STAGE ARTIST"
+    return scores, score, verdict
+
+
+def _roster(count=400, seed=0):
+    rng = np.random.default_rng(seed)
+    roster = {
+        'follower_growth_pct': rng.uniform(-30, 40, count),
+        'total_streams_1yr': rng.uniform(0, 800000, count).round(),
+        'engagement_rate': rng.uniform(0, 3, count),
+        'total_earnings': rng.uniform(0, 3000, count),
+        'songs_per_year': rng.integers(0, 20, count).astype(float),
+    }
+    # Values exactly on a threshold (strict vs inclusive comparisons) and missing metrics
+    roster['follower_growth_pct'][:3] = (20, 10, 0)
+    roster['total_streams_1yr'][3:6] = (500000, 200000, 100000)
+    roster['songs_per_year'][6:9] = (12, 6, 3)
+    roster['total_earnings'][9] = np.nan
+    return roster
+
+
+def test_grid_matches_the_scalar_rules():
+    roster = _roster()
+    scales = (0.5, 1, 1.5)
+    grid = assessment.assess(roster, assessment.scaled_scenarios(scales))
+    assert grid.shape == (400, len(scales))
+    factor_scores = grid.factor_scores()
+    for s, scale in enumerate(scales):
+        thresholds = {rule['factor']: [t * scale for t in rule['thresholds']] for rule in assessment.FACTORS}
+        for a in range(len(grid.artists)):
+            scores, score, verdict = _scalar_assessment(*(roster[m][a] for m in assessment.METRICS),
+                                                        thresholds=thresholds)
+            assert factor_scores[a, s].tolist() == scores
+            assert grid.score[a, s] == pytest.approx(score)
+            assert grid.verdict(a, s)[0] == verdict
+
+
+def test_tier_cutoffs_per_scenario():
+    roster = _roster(seed=1)
+    grid = assessment.assess(roster, [{'name': 'strict', 'tiers': [90, 80, 60]}, {'name': 'default'}])
+    for a in range(len(grid.artists)):
+        metrics = [roster[m][a] for m in assessment.METRICS]
+        assert grid.verdict(a, 0)[0] == _scalar_assessment(*metrics, tiers=(90, 80, 60))[2]
+        assert grid.verdict(a, 1)[0] == _scalar_assessment(*metrics)[2]
+
+
+def test_bad_scenarios_are_rejected():
+    with pytest.raises(ValueError, match='Unknown scenario keys'):
+        assessment.assess(_roster(), [{'followers': [3, 2, 1]}])
+    with pytest.raises(ValueError, match='descending'):
+        assessment.assess(_roster(), [{'revenue': [1, 2, 3]}])
@@ -0,0 +1,121 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import audience_state
+from audience_state import AudienceState, audience_cube, update_state
+from big_nose_analysis import parse_audience
+from timeseries_store import StoreWindow, TimeSeriesStore
+
+AS_OF = pd.Timestamp('2025-03-01 23:59:59')
+
+
+def _timeline(periods=1000, seed=0):
+    # Two readings a day, so appends can start in the middle of a day the state already holds
+    rng = np.random.default_rng(seed)
+    streams = rng.integers(100, 1000, periods).astype(float)
+    streams[rng.random(periods) < 0.05] = np.nan
+    return pd.DataFrame({'date': pd.date_range('2024-01-01', periods=periods, freq='12h'),
+                         'listeners': rng.integers(50, 500, periods), 'streams': streams,
+                         'followers': 300 + np.cumsum(rng.integers(0, 3, periods))})
+
+
+def _write(path, frame):
+    frame.assign(date=frame['date'].dt.strftime('%Y-%m-%d %H:%M:%S')).to_csv(path, index=False)
+
+
+def _append(path, frame):
+    frame.assign(date=frame['date'].dt.strftime('%Y-%m-%d %H:%M:%S')).to_csv(path, mode='a', header=False,
+                                                                               index=False)
+
+
+def _assert_cubes_equal(cube, expected):
+    assert cube.origin == expected.origin and len(cube) == len(expected)
+    for name in expected.daily:
+        np.testing.assert_array_equal(cube.daily[name], expected.daily[name])
+    for name in expected.sums:
+        np.testing.assert_allclose(cube._prefix[name], expected._prefix[name])
+        np.testing.assert_array_equal(cube._present[name], expected._present[name])
+    for name in expected.lasts:
+        np.testing.assert_array_equal(cube._filled[name], expected._filled[name])
+    for level in ('week', 'month'):
+        pd.testing.assert_frame_equal(cube.rollup(level), expected.rollup(level))
+
+
+@pytest.fixture
+def split_timeline(tmp_path):
+    timeline = _timeline()
+    csv_path = str(tmp_path / 'timeline.csv')
+    # Appends of uneven size, the second and third starting halfway through a day
+    cuts = [0, 401, 603, 777, len(timeline)]
+    return timeline, csv_path, [timeline.iloc[a:b] for a, b in zip(cuts, cuts[1:])]
+
+
+def test_state_after_appends_matches_a_full_build(split_timeline, tmp_path):
+    timeline, csv_path, parts = split_timeline
+    state_path = str(tmp_path / 'state.json')
+    for i, part in enumerate(parts):
+        (_write if i == 0 else _append)(csv_path, part)
+        state = update_state(csv_path, state_path, AS_OF, parse_audience)
+
+    expected = AudienceState.from_frame(parse_audience(csv_path), AS_OF)
+    reloaded = AudienceState.load(state_path)
+    for candidate in (state, reloaded):
+        _assert_cubes_equal(candidate.cube, expected.cube)
+        pd.testing.assert_frame_equal(candidate.window_frame(), expected.window_frame())
+        assert candidate.window_sums == pytest.approx(expected.window_sums)
+        pd.testing.assert_series_equal(candidate.monthly_followers(), expected.monthly_followers())
+        assert candidate.history_profile() == expected.history_profile()
+
+
+def test_state_file_holds_no_history(split_timeline, tmp_path):
+    timeline, csv_path, parts = split_timeline
+    state_path = str(tmp_path / 'state.json')
+    _write(csv_path, parts[0])
+    update_state(csv_path, state_path, AS_OF, parse_audience)
+    cube_dir = audience_state.cube_dir(state_path)
+    prefix_path = os.path.join(cube_dir, 'streams.prefix.bin')
+    with open(prefix_path, 'rb') as f:
+        before = f.read()
+
+    _append(csv_path, parts[1])
+    state = update_state(csv_path, state_path, AS_OF, parse_audience)
+    with open(state_path) as f:
+        saved = json.load(f)
+    assert 'daily' not in saved['cube']
+    # Earlier prefix sums are untouched; the file holds every element but the last
+    with open(prefix_path, 'rb') as f:
+        after = f.read()
+    assert after[:len(before)] == before
+    assert len(after) == len(state.cube) * 8
+
+
+def test_store_cube_after_appends_matches_a_full_build(split_timeline, tmp_path):
+    timeline, csv_path, parts = split_timeline
+    store_dir = str(tmp_path / 'store')
+    # The store needs strictly increasing dates, which each append keeps
+    for i, part in enumerate(parts):
+        (_write if i == 0 else _append)(csv_path, part)
+        TimeSeriesStore(store_dir).sync_from_csv(csv_path, parse_audience)
+
+    window = StoreWindow(TimeSeriesStore(store_dir), AS_OF)
+    _assert_cubes_equal(window.cube, audience_cube(parse_audience(csv_path)))
+    assert window.history_profile() == AudienceState.from_frame(parse_audience(csv_path), AS_OF).history_profile()
+
+
+def test_store_without_a_cube_builds_it_once(split_timeline, tmp_path):
+    timeline, csv_path, parts = split_timeline
+    store_dir = str(tmp_path / 'store')
+    _write(csv_path, timeline)
+    store = TimeSeriesStore(store_dir)
+    store.sync_from_csv(csv_path, parse_audience)
+    # A store written before the cube was kept
+    del store.meta['cube']
+    store._save_meta()
+
+    TimeSeriesStore(store_dir).sync_from_csv(csv_path, parse_audience)
+    assert 'cube' in TimeSeriesStore(store_dir).meta
+    _assert_cubes_equal(TimeSeriesStore(store_dir).cube(), audience_cube(parse_audience(csv_path)))
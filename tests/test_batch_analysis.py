@@ -0,0 +1,54 @@
+import multiprocessing as mp
+import os
+
+import pandas as pd
+import pytest
+
+import batch_analysis
+
+
+def test_batch_forwards_analysis_options(synthetic_artist, tmp_path, capsys):
+    manifest = tmp_path / 'manifest.csv'
+    manifest.write_text(f"artist,data_dir\n{synthetic_artist['artist']},{synthetic_artist['data_dir']}\n")
+    summary = batch_analysis.run_batch(str(manifest), str(tmp_path / 'out'), workers=1, plots=False,
+                                       forecast_paths=0, quality_gate='off', load_workers=1, as_of='2025-12-01')
+    capsys.readouterr()
+    assert summary['status'].tolist() == ['ok']
+    output_dir = summary.loc[0, 'output_dir']
+    assert os.path.exists(os.path.join(output_dir, 'analysis_report.txt'))
+    # forecast_paths=0 skips the forecast; plots=False skips the dashboard
+    assert not os.path.exists(os.path.join(output_dir, 'forecast.csv'))
+    assert not os.path.exists(os.path.join(output_dir, 'comprehensive_analysis.png'))
+
+
+def test_colliding_artist_names_get_distinct_output_dirs(tmp_path):
+    entries = [{'artist': name, 'data_dir': 'data'} for name in ('A/B', 'A B', 'A_B', 'a_b', 'A_B-2', 'C')]
+    output_dirs = batch_analysis.assign_output_dirs(entries, 'out')
+    assert [os.path.basename(path) for path in output_dirs] == ['A_B', 'A_B-2', 'A_B-3', 'a_b-4', 'A_B-2-2', 'C']
+
+    # Generated names step around explicit ones; two rows naming the same directory fail
+    entries = [{'artist': 'A B', 'data_dir': 'data'}, {'artist': 'X', 'data_dir': 'data', 'output_dir': 'out/A_B'}]
+    assert batch_analysis.assign_output_dirs(entries, 'out') == [os.path.join('out', 'A_B-2'), 'out/A_B']
+    entries.append({'artist': 'Y', 'data_dir': 'data', 'output_dir': 'out/./A_B'})
+    with pytest.raises(ValueError, match="'X' and 'Y' share output_dir"):
+        batch_analysis.assign_output_dirs(entries, 'out')
+
+
+def _crashing_analysis(artist, data_dir, output_dir, options):
+    # Stands in for a worker killed mid-run
+    os._exit(1)
+
+
+def test_a_dead_worker_is_recorded_as_a_failure(tmp_path, monkeypatch, capsys):
+    # Forked workers see the patched analysis function
+    monkeypatch.setattr(batch_analysis, 'pool_context', lambda preload: mp.get_context('fork'))
+    monkeypatch.setattr(batch_analysis, '_analyze_artist', _crashing_analysis)
+    manifest = tmp_path / 'manifest.csv'
+    manifest.write_text("artist,data_dir\nA,data\nB,data\n")
+    summary = batch_analysis.run_batch(str(manifest), str(tmp_path / 'out'), workers=1, plots=False)
+    capsys.readouterr()
+    assert summary['artist'].tolist() == ['A', 'B']
+    assert summary['status'].tolist() == ['failed', 'failed']
+    assert summary['error'].str.startswith('BrokenProcessPool').all()
+    saved = pd.read_csv(tmp_path / 'out' / batch_analysis.SUMMARY_FILE)
+    assert saved['output_dir'].tolist() == [str(tmp_path / 'out' / 'A'), str(tmp_path / 'out' / 'B')]
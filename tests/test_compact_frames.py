@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import compact_frames
+from compact_frames import category_contains, compact, downcast_counts
+
+
+def _raw(rows=200, seed=0):
+    rng = np.random.default_rng(seed)
+    artists = np.array(['Big Nose', 'Groovetide, Big Nose', 'Mad Seedling x Big Nose', 'big nose', 'Other (feat. X)',
+                        'a.b*c', None], dtype=object)
+    frame = pd.DataFrame({
+        'Song Title': [f'Song {i % 50}' for i in range(rows)],
+        'Artist': artists[rng.integers(0, len(artists), rows)],
+        'Type': rng.choice(['Single', 'Album'], rows),
+        'listeners': rng.integers(0, 1000, rows).astype(float),
+        'streams': rng.integers(0, 2**31 - 1, rows),
+        'saves': rng.random(rows),
+        'release_date': pd.date_range('2020-01-01', periods=rows).strftime('%Y-%m-%d'),
+        'Amount': rng.random(rows) * 100,
+    })
+    frame.loc[::7, 'listeners'] = np.nan
+    return frame
+
+
+def _labels(series):
+    return series.astype(object).where(series.notna(), None).tolist()
+
+
+def test_compact_keeps_values():
+    raw = _raw()
+    compacted = compact(raw.copy())
+    assert compacted['listeners'].dtype == 'Int32' and compacted['streams'].dtype == 'Int32'
+    # Fractional counts are left as floats
+    assert compacted['saves'].dtype == 'float64'
+    assert isinstance(compacted['Artist'].dtype, pd.CategoricalDtype)
+    assert isinstance(compacted['Type'].dtype, pd.CategoricalDtype)
+    for name in ('listeners', 'streams', 'saves', 'Amount'):
+        np.testing.assert_array_equal(compacted[name].to_numpy(dtype=float, na_value=np.nan),
+                                      raw[name].to_numpy(dtype=float))
+    for name in ('Song Title', 'Artist', 'Type'):
+        assert _labels(compacted[name]) == _labels(raw[name])
+    pd.testing.assert_series_equal(compacted['release_date'], pd.to_datetime(raw['release_date']))
+    # Equal titles share one string object
+    titles = compacted['Song Title']
+    assert titles.iloc[0] is titles.iloc[50]
+    assert compact_frames.footprint(compacted) < compact_frames.footprint(raw)
+
+
+@pytest.mark.parametrize('values, dtype', [
+    ([0, 2**31 - 1], 'Int32'),
+    ([-2**31, 5], 'Int32'),
+    ([0, 2**31], 'Int64'),
+    ([-2**31 - 1, 5], 'Int64'),
+    ([1.0, 2.0**62], 'Int64'),
+    ([1.0, 2.0**63], 'float64'),
+    ([1.0, np.nan, 2**40], 'Int64'),
+    ([1.0, 2.5], 'float64'),
+    (['3', '4', None], 'Int32'),
+])
+def test_counts_take_the_narrowest_type_that_holds_them(values, dtype):
+    counts = downcast_counts(pd.Series(values, dtype=object))
+    assert counts.dtype == dtype
+    expected = pd.to_numeric(pd.Series(values, dtype=object)).to_numpy(dtype=float)
+    np.testing.assert_array_equal(counts.to_numpy(dtype=float, na_value=np.nan), expected)
+
+
+def test_int32_counts_sum_without_overflow():
+    counts = downcast_counts(pd.Series([2**31 - 1, 2**31 - 1, 10]))
+    assert counts.dtype == 'Int32'
+    assert counts.sum() == 2 * (2**31 - 1) + 10
+
+
+@pytest.mark.parametrize('text', ['Big Nose', 'big nose', 'Nose', ', ', '(feat.', '.', '*', 'Absent'])
+def test_category_contains_matches_str_contains(text):
+    raw = _raw()
+    expected = raw['Artist'].str.contains(text, na=False, regex=False).astype(bool)
+    compacted = compact(raw.copy())['Artist']
+    pd.testing.assert_series_equal(category_contains(compacted, text), expected, check_names=False)
+    pd.testing.assert_series_equal(category_contains(raw['Artist'], text), expected, check_names=False)
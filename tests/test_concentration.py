@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import big_nose_analysis
+import concentration
+from ranking import RankingIndex
+
+
+def _direct(values):
+    # Textbook definitions on unsorted values: mean absolute difference Gini and the sum of squared shares
+    values = np.asarray(values, dtype=float)
+    n, total = len(values), values.sum()
+    gini = np.abs(values[:, None] - values[None, :]).sum() / (2 * n * n * values.mean())
+    ranked = np.sort(values)[::-1]
+    shares = np.cumsum(ranked) / total
+    return {'songs': n, 'total': total, 'gini': gini, 'hhi': ((values / total) ** 2).sum(),
+            'top1_share': ranked[0] / total, 'top5_share': ranked[:5].sum() / total,
+            'top10pct_share': shares[int(np.ceil(0.1 * n)) - 1], 'top20pct_share': shares[int(np.ceil(0.2 * n)) - 1],
+            'songs_for_80pct': next(k for k in range(1, n + 1) if shares[k - 1] >= 0.8 - 1e-12)}
+
+
+@pytest.mark.parametrize('values', [
+    np.random.default_rng(0).lognormal(0, 1.5, 200),
+    np.random.default_rng(1).integers(0, 4, 37).astype(float) + (np.arange(37) == 0),
+    np.full(10, 3.0),
+    np.r_[100.0, np.zeros(9)],
+    np.array([7.0]),
+    np.array([5.0, 3.0, 2.0]),
+])
+def test_summary_matches_the_direct_formulas(values):
+    row = concentration.summarize(np.sort(values)[::-1])
+    expected = _direct(values)
+    assert {name: row[name] for name in expected} == pytest.approx(expected)
+    assert row['effective_songs'] == pytest.approx(1 / expected['hhi'])
+
+
+def test_known_extremes():
+    equal = concentration.summarize(np.full(8, 2.0))
+    assert equal['gini'] == pytest.approx(0) and equal['effective_songs'] == pytest.approx(8)
+    single = concentration.summarize(np.r_[50.0, np.zeros(4)])
+    assert single['gini'] == pytest.approx(4 / 5) and single['hhi'] == 1 and single['songs_for_80pct'] == 1
+    # Nothing earned: no shares or indices
+    assert concentration.summarize(np.zeros(3)) == {'songs': 3, 'total': 0.0}
+    assert concentration.summarize(np.empty(0)) == {'songs': 0, 'total': 0.0}
+
+
+def _catalog(seed=0):
+    rng = np.random.default_rng(seed)
+    years = rng.choice([2015, 2016, 2018, 2019, 2021, np.nan], 120)
+    frame = pd.DataFrame({'Song Title': [f'song {i}' for i in range(120)], 'release_year': years,
+                          'Amount': rng.lognormal(0, 1.2, 120), 'streams': rng.integers(0, 5000, 120).astype(float)})
+    # Missing values, reversals and ties
+    frame.loc[rng.random(120) < 0.1, 'Amount'] = np.nan
+    frame.loc[[3, 40], 'Amount'] = -2.5
+    frame.loc[rng.random(120) < 0.3, 'streams'] = 1000.0
+    return frame.astype({'release_year': 'Int64'})
+
+
+def test_cohort_and_rolling_masks_match_direct_subsets():
+    frame = _catalog()
+    table, curve = concentration.concentration(frame, RankingIndex(frame))
+    for metric in concentration.METRICS:
+        rows = table[table['metric'] == metric]
+        known = frame[frame[metric].notna()]
+        values, years = known[metric].clip(lower=0), known['release_year']
+
+        expected_windows = [('all', None, None)] + [('cohort', year, year) for year in (2015, 2016, 2018, 2019, 2021)]
+        expected_windows += [('rolling', end - 2, end) for end in range(2017, 2022)]
+        assert [(row.scope, None if pd.isna(row.start_year) else row.start_year,
+                 None if pd.isna(row.end_year) else row.end_year) for row in rows.itertuples()] == expected_windows
+
+        for row in rows.itertuples():
+            mask = np.ones(len(values), dtype=bool) if row.scope == 'all' else \
+                ((years >= row.start_year) & (years <= row.end_year)).fillna(False).to_numpy()
+            subset = values.to_numpy()[mask]
+            assert row.songs == len(subset)
+            if subset.sum() > 0:
+                expected = _direct(subset)
+                assert {name: getattr(row, name) for name in expected} == pytest.approx(expected), row
+            else:
+                assert pd.isna(row.gini)
+
+        # The catalog's Pareto curve reads the same cumulative shares
+        shares = np.cumsum(np.sort(values.to_numpy())[::-1]) / values.sum()
+        metric_curve = curve[curve['metric'] == metric]
+        assert metric_curve['share'].iloc[-1] == pytest.approx(1)
+        assert metric_curve.loc[metric_curve['songs_pct'] == 10, 'share'].item() == \
+            pytest.approx(shares[int(np.ceil(0.1 * len(values))) - 1])
+
+
+def _recommendations(amounts, capsys):
+    frame = pd.DataFrame({'Song Title': [f'song {i}' for i in range(len(amounts))], 'Amount': amounts,
+                          'release_year': 2020})
+    rank = RankingIndex(frame)
+    table, _ = concentration.concentration(frame, rank)
+    top_5_pct = rank.top_sum('Amount', 5) / frame['Amount'].sum() * 100
+    playlists = pd.DataFrame({'title': ['p'], 'streams': [10]})
+    attribution = pd.DataFrame({'title': ['p'], 'stream_lift': [np.nan], 'attributed_streams': [np.nan]})
+    result = big_nose_analysis.generate_recommendations(top_5_pct, 2.0, 6.0, playlists, attribution,
+                                                        pd.DataFrame(), table)
+    capsys.readouterr()
+    gini = table.loc[table['scope'] == 'all', 'gini'].item()
+    return top_5_pct, gini, result['recommendations'][0]
+
+
+def test_high_gini_raises_the_diversification_priority(capsys):
+    # Top 5 songs under half of the earnings in both catalogs: only the Gini tells them apart
+    skewed = np.r_[np.full(20, 10.0), np.full(80, 0.2)]
+    top_5_pct, gini, recommendation = _recommendations(skewed, capsys)
+    assert top_5_pct < 50 and gini >= concentration.HIGH_GINI
+    assert recommendation['title'] == 'Diversify Revenue Streams' and recommendation['priority'] == 'HIGH'
+    assert f'(Gini {gini:.2f})' in recommendation['description']
+
+    even = np.linspace(1, 3, 100)
+    top_5_pct, gini, recommendation = _recommendations(even, capsys)
+    assert top_5_pct < 50 and gini < concentration.HIGH_GINI
+    assert recommendation['priority'] == 'MEDIUM'
+
+    # Few songs: the top-5 share alone still makes it HIGH
+    top_5_pct, gini, recommendation = _recommendations(np.full(6, 1.0), capsys)
+    assert top_5_pct >= 50 and gini < concentration.HIGH_GINI and recommendation['priority'] == 'HIGH'
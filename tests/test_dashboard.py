@@ -0,0 +1,48 @@
+import os
+import shutil
+
+import big_nose_analysis
+import dashboard
+
+PANELS = ['follower_growth', 'top_earning_songs']
+
+
+def _run(synthetic_artist, output_dir, memo_dir, figures):
+    params = big_nose_analysis.analysis_params(synthetic_artist['data_dir'], output_dir, synthetic_artist['artist'],
+                                               as_of='2025-12-23', figures=figures, plot_workers=1,
+                                               forecast_paths=0)
+    os.makedirs(output_dir, exist_ok=True)
+    return big_nose_analysis.STAGES.run(params, memo_dir=memo_dir, file_params=big_nose_analysis.INPUT_FILES,
+                                        untracked=('plot_workers',), artifact_dir=output_dir)
+
+
+def _images(output_dir):
+    return sorted(os.path.relpath(os.path.join(root, name), output_dir)
+                  for root, _, names in os.walk(output_dir) for name in names if name.endswith('.png'))
+
+
+def test_selected_panels_render_and_come_back_from_the_memo(synthetic_artist, tmp_path, capsys):
+    output_dir, memo_dir = str(tmp_path / 'out'), str(tmp_path / 'memo')
+    figures = {'panels': PANELS, 'separate': True, 'dpi': 20}
+    expected = ['comprehensive_analysis.png'] + [os.path.join('panels', f'{name}.png') for name in sorted(PANELS)]
+    assert sorted(dashboard.output_files(figures)) == expected
+
+    run = _run(synthetic_artist, output_dir, memo_dir, figures)
+    assert 'plot_dashboard' in run.recomputed
+    assert _images(output_dir) == expected
+    drawn = {name: open(os.path.join(output_dir, name), 'rb').read() for name in expected}
+
+    # A rerun draws nothing: the images are copied back from the memo entry
+    shutil.rmtree(output_dir)
+    run = _run(synthetic_artist, output_dir, memo_dir, figures)
+    assert 'plot_dashboard' in run.reused and 'plot_dashboard' not in run.recomputed
+    assert _images(output_dir) == expected
+    for name, content in drawn.items():
+        assert open(os.path.join(output_dir, name), 'rb').read() == content
+
+    # Another panel selection is a new memo entry, written without the previous selection's files
+    shutil.rmtree(output_dir)
+    run = _run(synthetic_artist, output_dir, memo_dir, {**figures, 'panels': ['daily_streams'], 'composite': False})
+    assert 'plot_dashboard' in run.recomputed
+    assert _images(output_dir) == [os.path.join('panels', 'daily_streams.png')]
+    capsys.readouterr()
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import decay_curves
+
+AS_OF = '2025-01-01'
+
+
+def _catalog(rates, ages, lifetime=10_000.0):
+    # Songs whose last-year streams follow exponential decay at `rates` exactly
+    rates, ages = np.asarray(rates, dtype=float), np.asarray(ages, dtype=float)
+    as_of_day = (pd.Timestamp(AS_OF) - pd.Timestamp(0)).days
+    metrics = pd.DataFrame({'title': [f'song {i}' for i in range(len(rates))],
+                            'lifetime_streams': lifetime,
+                            'streams_1yr': lifetime * decay_curves.recent_share(rates, ages),
+                            'amount': lifetime * 0.001})
+    return metrics, as_of_day - ages * 365.25
+
+
+def test_song_rates_recover_the_decay_that_made_the_streams():
+    rates = np.array([-2.0, -0.3, 0.0, 0.2, 0.9, 3.5])
+    ages = np.array([2.0, 3.0, 5.0, 4.0, 8.0, 2.5])
+    share = decay_curves.recent_share(rates, ages)
+    fitted = decay_curves.fit_song_rates(share, ages)
+    assert fitted == pytest.approx(rates, abs=1e-8)
+    assert not decay_curves.saturated(fitted).any()
+
+
+def test_out_of_range_shares_are_flagged_and_left_out_of_the_cohorts():
+    # Three songs of one release year decaying at 0.5/year, plus one with no streams last year
+    metrics, release_days = _catalog([0.5, 0.5, 0.5, 0.5], [3.0, 3.0, 3.0, 3.0])
+    metrics.loc[3, 'streams_1yr'] = 0.0
+    songs, cohorts, catalog_rate = decay_curves.fit_decay(metrics, release_days, AS_OF)
+
+    assert songs['saturated'].tolist() == [False, False, False, True]
+    assert songs.loc[3, 'decay_rate'] == pytest.approx(decay_curves.MAX_RATE)
+    assert catalog_rate == pytest.approx(0.5, abs=1e-6)
+    year = songs['release_year'].iloc[0]
+    assert cohorts.loc[year, 'decay_rate'] == pytest.approx(0.5, abs=1e-6)
+    assert cohorts.loc[year, 'fitted_songs'] == 3
+    assert cohorts.loc[year, 'saturated_songs'] == 1
+
+
+def test_songs_without_earnings_count_as_earning_nothing():
+    # One release year: two songs with earnings rows and two without, all decaying at 0.5/year
+    metrics, release_days = _catalog([0.5, 0.5, 0.5, 0.5], [3.0, 3.0, 3.0, 3.0])
+    metrics.loc[[1, 3], 'amount'] = np.nan
+    songs, cohorts, _ = decay_curves.fit_decay(metrics, release_days, AS_OF)
+
+    assert songs['earnings_matched'].tolist() == [True, False, True, False]
+    assert songs.loc[[1, 3], 'remaining_value'].tolist() == [0, 0]
+    assert songs['remaining_value'].notna().all() and songs['lifetime_value'].notna().all()
+    year = songs['release_year'].iloc[0]
+    cohort = cohorts.loc[year]
+    assert cohort['remaining_streams'] == pytest.approx(songs['remaining_streams'].sum())
+    assert cohort['matched_streams'] == pytest.approx(songs.loc[[0, 2], 'remaining_streams'].sum())
+    assert cohort['remaining_value'] == pytest.approx(cohort['matched_streams'] * 0.001)
+
+
+def test_no_earnings_rows_leave_the_value_unknown():
+    metrics, release_days = _catalog([0.5, 0.5, 0.5], [3.0, 3.0, 3.0])
+    metrics['amount'] = np.nan
+    songs, cohorts, _ = decay_curves.fit_decay(metrics, release_days, AS_OF)
+    assert songs['remaining_value'].isna().all()
+    assert cohorts['matched_streams'].eq(0).all()
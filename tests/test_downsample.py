@@ -0,0 +1,93 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import dashboard
+import downsample
+
+
+def _lttb_reference(x, y, budget):
+    # Steinarsson's Largest-Triangle-Three-Buckets, one point at a time
+    n = len(y)
+    if budget >= n:
+        return list(range(n))
+    every = (n - 2) / (budget - 2)
+    kept, a = [0], 0
+    for i in range(budget - 2):
+        start, end = int(i * every) + 1, int((i + 1) * every) + 1
+        next_start, next_end = end, min(int((i + 2) * every) + 1, n)
+        avg_x = sum(x[next_start:next_end]) / (next_end - next_start)
+        avg_y = sum(y[next_start:next_end]) / (next_end - next_start)
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a])) * 0.5
+            if area > best_area:
+                best, best_area = j, area
+        kept.append(best)
+        a = best
+    return kept + [n - 1]
+
+
+def _series(n, seed=0):
+    rng = np.random.default_rng(seed)
+    y = np.cumsum(rng.normal(scale=0.1, size=n))
+    y[n // 3] += 80
+    y[2 * n // 3] -= 80
+    return y
+
+
+@pytest.mark.parametrize('n', [50, 1000, 9999])
+@pytest.mark.parametrize('budget', [4, 5, 17, 300])
+def test_minmax_keeps_spikes_within_budget(n, budget):
+    y = _series(n)
+    kept = downsample.minmax(y, budget)
+    assert len(kept) == n if n <= budget else len(kept) <= budget
+    assert (np.diff(kept) > 0).all() and kept[0] == 0 and kept[-1] == n - 1
+    assert n // 3 in kept and 2 * n // 3 in kept
+
+
+@pytest.mark.parametrize('n', [7, 100, 2500])
+@pytest.mark.parametrize('budget', [4, 5, 30, 500])
+def test_lttb_matches_the_reference(n, budget):
+    rng = np.random.default_rng(n + budget)
+    x = np.sort(rng.uniform(0, 1000, n))
+    y = _series(n, seed=budget)
+    kept = downsample.lttb(x, y, budget)
+    assert len(kept) == n if n <= budget else len(kept) == budget
+    assert list(kept) == _lttb_reference(x.tolist(), y.tolist(), budget)
+
+
+@pytest.mark.parametrize('budget', [0, 1, 2, 3])
+def test_small_budgets_are_raised_to_the_minimum(budget):
+    y = _series(200)
+    x = np.arange(200.0)
+    for kept in (downsample.minmax(y, budget), downsample.lttb(x, y, budget)):
+        assert len(kept) <= downsample.MIN_BUDGET
+        assert kept[0] == 0 and kept[-1] == 199
+    assert list(downsample.lttb(x, y, budget)) == _lttb_reference(x.tolist(), y.tolist(), downsample.MIN_BUDGET)
+
+
+def test_downsample_drops_missing_values_and_rejects_unknown_methods():
+    series = pd.Series(_series(400), index=pd.date_range('2025-01-01', periods=400, freq='h'), name='streams')
+    series.iloc[5] = np.nan
+    for method in downsample.METHODS:
+        reduced = downsample.downsample(series, 20, method)
+        assert len(reduced) <= 20 and reduced.notna().all()
+        assert reduced.index.is_monotonic_increasing
+    with pytest.raises(ValueError, match='Unknown downsampling method'):
+        downsample.downsample(series, 20, 'mean')
+
+
+def test_dpi_must_be_positive():
+    assert dashboard.parse_dpi('72') == 72
+    for text in ('0', '-1', 'high'):
+        with pytest.raises(argparse.ArgumentTypeError):
+            dashboard.parse_dpi(text)
+    with pytest.raises(ValueError, match='DPI must be at least 1'):
+        dashboard.figure_options({'dpi': 0})
+    # The smallest DPI still leaves a workable point budget
+    series = pd.Series(_series(5000), index=pd.date_range('2020-01-01', periods=5000, freq='D'), name='streams')
+    points = dashboard.timeline_points(series, {'dpi': 1})
+    assert len(points) <= dashboard.point_budget({'dpi': 1})
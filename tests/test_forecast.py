@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import forecast
+
+
+def _weekly_audience(weeks=52, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({'days': 7, 'followers': 500 + np.cumsum(rng.integers(-2, 4, weeks)),
+                         'streams': rng.integers(800, 1200, weeks).astype(float)})
+
+
+def _song_metrics(songs=200, seed=0):
+    rng = np.random.default_rng(seed)
+    lifetime = rng.lognormal(8, 1.5, songs).round()
+    amount = lifetime * rng.uniform(0.0005, 0.0015, songs)
+    amount[::10] = np.nan
+    # One-year streams are a small share of lifetime streams, as in the exports
+    return pd.DataFrame({'amount': amount, 'lifetime_streams': lifetime, 'streams_1yr': (lifetime * 0.01).round()})
+
+
+def test_rate_is_lifetime_earnings_over_lifetime_streams():
+    metrics = _song_metrics()
+    model = forecast.fit_model(_weekly_audience(), metrics)
+    expected = metrics['amount'].sum() / metrics['lifetime_streams'].sum()
+    assert forecast.historical_rate(model) == pytest.approx(expected)
+
+
+def test_projected_revenue_per_stream_stays_near_history():
+    metrics = _song_metrics()
+    audience = _weekly_audience()
+    rate = forecast.historical_rate(forecast.fit_model(audience, metrics))
+    bands = forecast.forecast(audience, metrics, paths=20_000, workers=1).set_index(['metric', 'months'])
+    for months in forecast.HORIZON_MONTHS:
+        projected = bands.loc[('revenue', months), 'p50'] / bands.loc[('streams', months), 'p50']
+        assert projected == pytest.approx(rate, rel=0.1)
+
+
+def test_songs_without_earnings_dilute_the_rate():
+    metrics = _song_metrics()
+    unearned = metrics.assign(amount=np.nan).iloc[:50]
+    rate = forecast.historical_rate(forecast.fit_model(_weekly_audience(), pd.concat([metrics, unearned])))
+    assert rate == pytest.approx(metrics['amount'].sum() / (metrics['lifetime_streams'].sum()
+                                                            + unearned['lifetime_streams'].sum()))
+
+
+def test_no_earnings_leaves_revenue_empty():
+    metrics = _song_metrics().assign(amount=np.nan)
+    bands = forecast.forecast(_weekly_audience(), metrics, paths=1000, workers=1)
+    assert bands.loc[bands['metric'] == 'revenue', 'p50'].isna().all()
@@ -0,0 +1,56 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import big_nose_analysis
+import ingest_cache
+
+
+def _entry_dir(cache_dir):
+    return next(os.path.join(cache_dir, name) for name in os.listdir(cache_dir) if not name.startswith('.'))
+
+
+def test_parsed_inputs_round_trip(synthetic_artist, tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    for name, parser in big_nose_analysis.INPUT_PARSERS.items():
+        path = synthetic_artist['paths'][name]
+        first = ingest_cache.load_frame(path, parser, cache_dir)
+        # Cache hits are memory-mapped; a deep copy compares the values rather than the array class
+        cached = ingest_cache.load_frame(path, parser, cache_dir).copy()
+        pd.testing.assert_frame_equal(cached, parser(path))
+        pd.testing.assert_frame_equal(cached, first)
+
+
+def test_strings_are_stored_variable_width(tmp_path):
+    titles = [f'song {i}' for i in range(10_000)]
+    titles[0] = 'x' * 5000
+    titles[1] = 'Crème brûlée 🎸 (feat. Ünïcode)'
+    titles[2] = None
+    frame = pd.DataFrame({'title': pd.Series(titles, dtype='str'),
+                          'author': pd.Categorical(['a' * 3000 if i == 0 else 'b' for i in range(10_000)])})
+    csv_path = tmp_path / 'titles.csv'
+    csv_path.write_text('unused\n')
+    cache_dir = str(tmp_path / 'cache')
+
+    ingest_cache.load_frame(str(csv_path), lambda path: frame, cache_dir)
+    cached = ingest_cache.load_frame(str(csv_path), lambda path: frame, cache_dir)
+    pd.testing.assert_frame_equal(cached, frame)
+
+    entry = _entry_dir(cache_dir)
+    size = sum(os.path.getsize(os.path.join(entry, name)) for name in os.listdir(entry))
+    # Fixed-width storage would take 4 bytes x 5,000 characters for each of the 10,000 titles
+    text = sum(len(title.encode()) for title in titles if title)
+    assert size < 2 * text + 16 * len(titles) + 10_000
+
+
+def test_nullable_and_datetime_columns_round_trip(tmp_path):
+    frame = pd.DataFrame({'streams': pd.array([1, None, 3], dtype='Int64'),
+                          'amount': [1.5, np.nan, 2.0],
+                          'date': pd.to_datetime(['2024-01-01', None, '2024-03-01'])})
+    csv_path = tmp_path / 'frame.csv'
+    csv_path.write_text('unused\n')
+    cache_dir = str(tmp_path / 'cache')
+    ingest_cache.load_frame(str(csv_path), lambda path: frame, cache_dir)
+    pd.testing.assert_frame_equal(ingest_cache.load_frame(str(csv_path), lambda path: frame, cache_dir), frame)
@@ -0,0 +1,53 @@
+import importlib
+import sys
+
+import pytest
+
+from ingest_cache import parser_digest
+from pipeline import StageGraph
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """A throwaway project: a stage module calling into a helper module, next to an unrelated module."""
+    (tmp_path / 'helper_mod.py').write_text('def scale(x):\n    return x * 2\n')
+    (tmp_path / 'unrelated_mod.py').write_text('VALUE = 1\n')
+    (tmp_path / 'stages_mod.py').write_text(
+        'import helper_mod\nimport unrelated_mod\n\n'
+        'def _offset(x):\n    return x + 1\n\n'
+        'def double(x):\n    return {"y": _offset(helper_mod.scale(x))}\n\n'
+        'def other(x):\n    return {"z": x}\n')
+    monkeypatch.syspath_prepend(str(tmp_path))
+    for name in ('helper_mod', 'unrelated_mod', 'stages_mod'):
+        sys.modules.pop(name, None)
+    yield tmp_path, importlib.import_module('stages_mod')
+    for name in ('helper_mod', 'unrelated_mod', 'stages_mod'):
+        sys.modules.pop(name, None)
+
+
+def test_digest_follows_helper_modules(project):
+    root, stages = project
+    before = parser_digest(stages.double), parser_digest(stages.other)
+    (root / 'helper_mod.py').write_text('def scale(x):\n    return x * 30\n')
+    assert parser_digest(stages.double) != before[0]
+    assert parser_digest(stages.other) == before[1]
+
+
+def test_digest_ignores_modules_the_function_does_not_reach(project):
+    root, stages = project
+    before = parser_digest(stages.double)
+    (root / 'unrelated_mod.py').write_text('VALUE = 2\n')
+    assert parser_digest(stages.double) == before
+
+
+def test_helper_edit_invalidates_memo(project, tmp_path):
+    root, stages = project
+    graph = StageGraph()
+    graph.stage(outputs=('y',))(stages.double)
+    memo_dir = str(tmp_path / 'memo')
+    assert graph.run({'x': 1}, memo_dir=memo_dir).recomputed == ['double']
+    assert graph.run({'x': 1}, memo_dir=memo_dir).reused == ['double']
+
+    (root / 'helper_mod.py').write_text('def scale(x):\n    return x * 30\n')
+    rerun = graph.run({'x': 1}, memo_dir=memo_dir)
+    assert rerun.recomputed == ['double']
@@ -0,0 +1,106 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import big_nose_analysis
+import playlist_attribution
+from audience_state import audience_cube
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ADDED = pd.Timestamp('2025-03-01')
+
+
+def _timeline():
+    # 100 streams a day and one new follower a day until ADDED, then 160 streams and three followers a day
+    dates = pd.date_range('2025-01-01', '2025-06-30', freq='D')
+    after = dates >= ADDED
+    gains = np.where(after, 3, 1)
+    return pd.DataFrame({'date': dates, 'listeners': 50, 'streams': np.where(after, 160, 100),
+                         'followers': 1000 + np.cumsum(gains) - gains[0]})
+
+
+def _playlists(rows):
+    return pd.DataFrame(rows, columns=['title', 'author', 'listeners', 'streams', 'date_added'])
+
+
+def test_lift_and_follower_gain():
+    table = playlist_attribution.attribute_playlists(_playlists([('A', 'x', 10, 500, '2025-03-01')]),
+                                                     audience_cube(_timeline()))
+    row = table.iloc[0]
+    assert row['pre_daily_streams'] == 100 and row['post_daily_streams'] == 160
+    assert row['stream_lift'] == 60 and row['lift_pct'] == pytest.approx(60)
+    # 42 followers gained over the 14 post days, against 14 at the pre window's pace of one a day
+    assert row['follower_lift'] == pytest.approx(42 - 14)
+    assert row['post_days'] == 14 and row['attributed_streams'] == 60 * 14
+
+
+def test_same_day_placements_split_the_lift():
+    cube = audience_cube(_timeline())
+    playlists = _playlists([('A', 'x', 10, 300, '2025-03-01'), ('B', 'y', 10, 100, '2025-03-01'),
+                            ('C', 'z', 10, 500, '2025-04-20')])
+    table = playlist_attribution.attribute_playlists(playlists, cube).set_index('title')
+    # By playlist streams
+    assert table.loc['A', 'attributed_streams'] == pytest.approx(60 * 14 * 0.75)
+    assert table.loc['B', 'attributed_streams'] == pytest.approx(60 * 14 * 0.25)
+    assert table.loc['C', 'stream_lift'] == 0 and table.loc['C', 'attributed_streams'] == 0
+    assert table['rank'].tolist() == [1, 2, 3] and table.index.tolist() == ['A', 'B', 'C']
+
+    # Equally when the day's placements have no playlist streams
+    playlists = _playlists([('D', 'x', 10, 0, '2025-03-01'), ('E', 'y', 10, np.nan, '2025-03-01')])
+    table = playlist_attribution.attribute_playlists(playlists, cube)
+    assert table['attributed_streams'].tolist() == pytest.approx([60 * 14 / 2] * 2)
+
+
+def test_overlapping_placements_are_counted_within_a_window():
+    offsets = {'A': 0, 'B': 0, 'C': 14, 'D': 15, 'E': 40}
+    playlists = _playlists([(title, 'x', 1, 1, ADDED + pd.Timedelta(days=days)) for title, days in offsets.items()]
+                           + [('F', 'Spotify', 1, 1, 'n/a')])
+    table = playlist_attribution.attribute_playlists(playlists, audience_cube(_timeline())).set_index('title')
+    expected = {}
+    for title, days in offsets.items():
+        expected[title] = sum(abs(days - other) <= playlist_attribution.WINDOW_DAYS
+                              for name, other in offsets.items() if name != title)
+    assert table['overlapping'].to_dict() == {**expected, 'F': 0}
+    assert expected == {'A': 2, 'B': 2, 'C': 3, 'D': 1, 'E': 0}
+
+
+def test_undated_and_out_of_timeline_placements_are_not_measured():
+    playlists = _playlists([('dated', 'x', 1, 50, '2025-03-01'), ('undated', 'Spotify', 1, 900, 'n/a'),
+                            ('blank', 'Spotify', 1, 900, None), ('before', 'x', 1, 900, '2024-06-01'),
+                            ('first day', 'x', 1, 900, '2025-01-01'), ('after', 'x', 1, 900, '2025-09-01'),
+                            ('late', 'x', 1, 900, '2025-06-25')])
+    table = playlist_attribution.attribute_playlists(playlists, audience_cube(_timeline()), as_of='2025-06-30')
+    table = table.set_index('title')
+    unmeasured = ['undated', 'blank', 'before', 'first day', 'after']
+    assert table.loc[unmeasured, 'stream_lift'].isna().all()
+    assert table.loc[unmeasured, 'attributed_streams'].isna().all()
+    assert table.loc[['undated', 'blank'], 'date_added'].isna().all()
+    assert table.loc[['undated', 'blank', 'before', 'after'], 'post_days'].tolist() == [0, 0, 0, 0]
+    # The post window is cut at the as-of date
+    assert table.loc['late', 'post_days'] == 6 and table.loc['late', 'stream_lift'] == 0
+    # Unmeasured placements rank after every measured one
+    assert table['rank'].to_dict()['dated'] == 1
+    assert set(table.index[-len(unmeasured):]) == set(unmeasured)
+
+
+def test_bundled_spotify_placements_dated_na():
+    directory = os.path.join(REPO_ROOT, 'Spotify_Analysis')
+    path = os.path.join(directory, 'Big Nose-playlists-1year.csv')
+    playlists = big_nose_analysis.parse_plain(path)
+    timeline = big_nose_analysis.parse_audience(os.path.join(directory, 'Big Nose-audience-timeline.csv'))
+    table = playlist_attribution.attribute_playlists(playlists, audience_cube(timeline), '2025-12-24')
+
+    raw = pd.read_csv(path, keep_default_na=False)
+    undated = raw['date_added'].eq('n/a')
+    assert undated.sum() == 11 and set(raw.loc[undated, 'author']) == {'Spotify'}
+    assert playlists.loc[undated, 'date_added'].isna().all()
+    assert len(table) == len(playlists) and table['date_added'].isna().sum() == undated.sum()
+    unmeasured = table[table['date_added'].isna()]
+    assert unmeasured['stream_lift'].isna().all() and (unmeasured['overlapping'] == 0).all()
+    # Every dated placement with timeline days on both sides is measured
+    added = table['date_added']
+    inside = (added - pd.Timedelta(days=1) >= timeline['date'].min()) & (added <= timeline['date'].max())
+    assert table.loc[inside, 'stream_lift'].notna().all()
@@ -0,0 +1,124 @@
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import big_nose_analysis
+import quality
+from audience_state import AudienceState
+from timeseries_store import StoreWindow, TimeSeriesStore
+
+AS_OF = pd.Timestamp('2025-06-30')
+
+
+def _timeline(start='2023-01-01', periods=900):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({'date': pd.date_range(start, periods=periods, freq='D'),
+                         'listeners': rng.integers(50, 500, periods), 'streams': rng.integers(100, 1000, periods),
+                         'followers': 300 + np.arange(periods)})
+
+
+def _frames(**overrides):
+    frames = {
+        'earnings': pd.DataFrame({'Song Title': ['a', 'b'], 'Amount': [1.0, 2.0],
+                                  'release_date': pd.to_datetime(['2024-01-01', '2024-02-01'])}),
+        'songs_1year': pd.DataFrame({'song': ['a', 'b'], 'streams': [10, 20], 'listeners': [5, 6], 'saves': [1, 2]}),
+        'audience': _timeline(),
+    }
+    return {**frames, **overrides}
+
+
+def test_gate_levels():
+    clean = quality.profile_inputs(_frames(), AS_OF)
+    for level in quality.GATE_LEVELS:
+        clean.gate(level)
+
+    # A negative count is a warning: it stops the run only at level 'warnings'
+    negative = _frames()
+    negative['songs_1year'].loc[0, 'streams'] = -5
+    report = quality.profile_inputs(negative, AS_OF)
+    assert report.warnings == ["songs_1year: 1 out-of-range values in 'streams'"] and not report.errors
+    report.gate('errors')
+    report.gate('off')
+    with pytest.raises(quality.DataQualityError, match='out-of-range'):
+        report.gate('warnings')
+
+    # A missing required column is an error at every level but 'off'
+    report = quality.profile_inputs(_frames(earnings=_frames()['earnings'].drop(columns='Amount')), AS_OF)
+    assert report.errors == ["earnings: missing column 'Amount'"]
+    for level in ('errors', 'warnings'):
+        with pytest.raises(quality.DataQualityError, match="missing column 'Amount'"):
+            report.gate(level)
+    report.gate('off')
+
+    with pytest.raises(ValueError, match='Unknown quality gate level'):
+        clean.gate('strict')
+
+
+def test_folded_profile_matches_a_whole_profile():
+    timeline = _timeline()
+    timeline.loc[[3, 700], 'streams'] = np.nan
+    profile = None
+    for chunk in np.array_split(np.arange(len(timeline)), [100, 101, 650]):
+        profile = quality.fold_profile(profile, timeline.iloc[chunk])
+    whole = quality.fold_profile(None, timeline)
+    assert profile == whole
+    assert profile['columns']['streams']['nulls'] == 2
+    assert profile['columns']['listeners']['sum'] == timeline['listeners'].sum()
+
+
+@pytest.mark.parametrize('view', ['state', 'store'])
+def test_history_outside_the_window_is_profiled(view, tmp_path):
+    timeline = _timeline()
+    # Both problems lie long before the trailing year ending at AS_OF
+    timeline.loc[10, 'followers'] = -1
+    timeline.loc[20, 'listeners'] = np.nan
+    if view == 'state':
+        window = AudienceState.from_frame(timeline, AS_OF)
+    else:
+        store = TimeSeriesStore(str(tmp_path / 'store'))
+        store.append(timeline)
+        window = StoreWindow(store, AS_OF)
+
+    report = quality.profile_inputs(_frames(audience=window.history_profile()), AS_OF)
+    audience = report['audience']
+    assert audience['rows'] == len(timeline)
+    assert audience['columns']['listeners']['nulls'] == 1
+    assert "audience: 1 out-of-range values in 'followers'" in report.warnings
+    # Rows after the as-of date are dates out of range
+    assert audience['columns']['date']['out_of_range'] == (timeline['date'] > AS_OF).sum()
+    assert audience['window_rows'] == ((timeline['date'] >= AS_OF - pd.Timedelta(days=365))
+                                       & (timeline['date'] <= AS_OF)).sum()
+
+
+def test_empty_window_is_a_warning_tied_to_the_as_of_date():
+    window = AudienceState.from_frame(_timeline(periods=100), '2030-01-01')
+    report = quality.profile_inputs(_frames(audience=window.history_profile()), '2030-01-01')
+    assert report.errors == []
+    assert report.warnings == ['audience: no rows in the 365 days up to 2030-01-01']
+
+    empty = AudienceState.from_frame(_timeline(periods=0), AS_OF)
+    assert quality.profile_inputs(_frames(audience=empty.history_profile()), AS_OF).errors == ['audience: no rows']
+
+
+def test_run_stops_at_the_quality_gate(synthetic_artist, tmp_path, capsys):
+    data_dir = str(tmp_path / 'data')
+    shutil.copytree(synthetic_artist['data_dir'], data_dir)
+    audience_path = os.path.join(data_dir, 'Spotify_Analysis', f"{synthetic_artist['artist']}-audience-timeline.csv")
+    audience = pd.read_csv(audience_path, encoding='utf-8-sig')
+    # A negative follower count on the first day, outside the trailing year
+    audience.loc[0, 'followers'] = -1
+    audience.to_csv(audience_path, index=False)
+
+    def run(gate, as_of='2025-12-23'):
+        return big_nose_analysis.run_analysis(data_dir=data_dir, output_dir=str(tmp_path / gate),
+                                              artist=synthetic_artist['artist'], as_of=as_of, plots=False,
+                                              forecast_paths=0, quality_gate=gate)
+
+    assert run('errors')['artist'] == synthetic_artist['artist']
+    with pytest.raises(quality.DataQualityError, match="audience: 1 out-of-range values in 'followers'"):
+        run('warnings')
+    assert run('off', as_of='2035-01-01')['artist'] == synthetic_artist['artist']
+    assert 'no rows in the 365 days up to 2035-01-01' in capsys.readouterr().out
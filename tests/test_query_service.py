@@ -0,0 +1,68 @@
+import json
+import os
+import threading
+import time
+
+import pytest
+
+import big_nose_analysis
+import query_service
+
+AS_OF = '2025-12-01'
+
+
+@pytest.fixture
+def service(synthetic_artist):
+    entry = {'artist': synthetic_artist['artist'], 'data_dir': synthetic_artist['data_dir']}
+    return query_service.QueryService([entry], {'forecast_paths': 0})
+
+
+def test_metrics_match_run_analysis(service, synthetic_artist, tmp_path, capsys):
+    summary = big_nose_analysis.run_analysis(synthetic_artist['data_dir'], str(tmp_path), synthetic_artist['artist'],
+                                             as_of=AS_OF, plots=False, forecast_paths=0)
+    capsys.readouterr()
+    status, body = service.respond('metrics', {'as_of': AS_OF})
+    assert status == 200
+    metrics = json.loads(body)['metrics']
+    for name in big_nose_analysis.SUMMARY_METRICS:
+        assert metrics[name] == pytest.approx(summary[name]) if isinstance(summary[name], float) \
+            else metrics[name] == summary[name]
+
+
+def test_unexpected_error_is_a_json_500(service, monkeypatch, capsys):
+    def broken(values, query):
+        raise RuntimeError('boom')
+
+    monkeypatch.setitem(query_service.ENDPOINTS, 'insights', broken)
+    status, body = service.respond('insights', {'as_of': AS_OF})
+    assert status == 500
+    assert json.loads(body) == {'error': 'RuntimeError: boom'}
+    assert 'RuntimeError' in capsys.readouterr().err
+
+
+def test_refresh_during_concurrent_queries(service, synthetic_artist):
+    path = synthetic_artist['paths']['audience_path']
+    statuses, stop = [], threading.Event()
+
+    def query(endpoint):
+        while not stop.is_set():
+            statuses.append(service.respond(endpoint, {'as_of': AS_OF, 'window': '30'})[0])
+
+    def touch():
+        # New modification times make the queries see changed inputs and drop the held values
+        while not statuses:
+            time.sleep(0.01)
+        for i in range(10):
+            stat = os.stat(path)
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+            time.sleep(0.05)
+        stop.set()
+
+    threads = [threading.Thread(target=query, args=(endpoint,)) for endpoint in ('window', 'top', 'metrics')]
+    threads.append(threading.Thread(target=touch))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(120)
+    assert statuses and set(statuses) == {200}
+    assert service.sessions[synthetic_artist['artist']].generation > 0
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ranking import RANKED_METRICS, RankingIndex
+
+
+def _frame(rows, seed=0):
+    # Few distinct values, so most of them tie, and some missing ones
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({metric: rng.integers(0, 6, rows).astype(float) for metric in RANKED_METRICS})
+    for metric in RANKED_METRICS:
+        frame.loc[rng.random(rows) < 0.2, metric] = np.nan
+    frame['song'] = [f'song {i}' for i in range(rows)]
+    return frame
+
+
+@pytest.mark.parametrize('k', [0, 1, 5, 17, 40, 60])
+def test_top_matches_nlargest(k):
+    frame = _frame(40)
+    rank = RankingIndex(frame)
+    for metric in RANKED_METRICS:
+        expected = frame.nlargest(k, metric)
+        pd.testing.assert_frame_equal(rank.top(metric, k), expected)
+        pd.testing.assert_frame_equal(rank.top(metric, k, ['song', metric]), expected[['song', metric]])
+        assert rank.top_sum(metric, k) == expected[metric].sum()
+
+
+def test_all_missing_and_absent_metrics():
+    frame = pd.DataFrame({'streams': [np.nan, np.nan, np.nan], 'song': ['a', 'b', 'c']})
+    rank = RankingIndex(frame)
+    pd.testing.assert_frame_equal(rank.top('streams', 2), frame.nlargest(2, 'streams'))
+    assert rank.top_sum('streams', 2) == 0
+    with pytest.raises(KeyError):
+        rank.top('Amount', 2)
+
+
+def test_append_matches_a_rebuild():
+    frame = _frame(60, seed=1)
+    rank = RankingIndex(frame.iloc[:25])
+    # Appended values tie with existing ones: the existing rows stay first
+    for start, stop in ((25, 26), (26, 40), (40, 60)):
+        rank.append(frame.iloc[start:stop])
+    rebuilt = RankingIndex(frame)
+    assert len(rank) == len(frame)
+    for metric in RANKED_METRICS:
+        assert rank.order[metric].tolist() == rebuilt.order[metric].tolist()
+        assert rank.keys[metric].tolist() == pytest.approx(rebuilt.keys[metric].tolist(), nan_ok=True)
+        for k in (3, 30, 60):
+            pd.testing.assert_frame_equal(rank.top(metric, k), frame.nlargest(k, metric))
@@ -0,0 +1,196 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import big_nose_analysis
+from rollup_cube import LEVELS, RollupCube
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SUMS, LASTS = ('listeners', 'streams'), ('followers',)
+
+
+def _timeline(seed=0):
+    # Two years of rows with missing days, repeated days, missing values and intraday times
+    rng = np.random.default_rng(seed)
+    days = pd.date_range('2023-11-15', '2025-12-03', freq='D')
+    days = days[rng.random(len(days)) > 0.15]
+    dates = np.sort(np.concatenate([days, rng.choice(days, 60)]))
+    dates = dates + pd.to_timedelta(rng.integers(0, 86400, len(dates)), 's')
+    frame = pd.DataFrame({'date': dates, 'listeners': rng.integers(0, 500, len(dates)).astype(float),
+                          'streams': rng.integers(0, 900, len(dates)).astype(float),
+                          'followers': 100 + np.arange(len(dates), dtype=float)})
+    for name in ('listeners', 'streams', 'followers'):
+        frame.loc[rng.random(len(frame)) < 0.05, name] = np.nan
+    return frame
+
+
+def _grid(frame):
+    # The reference daily grid: per-day sums (NaN when nothing was recorded) and forward-filled last values
+    day = frame['date'].dt.floor('D')
+    grouped = frame.groupby(day)
+    grid = pd.concat([grouped[list(SUMS)].sum(min_count=1), grouped[list(LASTS)].last()], axis=1)
+    grid = grid.reindex(pd.date_range(grid.index[0], grid.index[-1], freq='D'))
+    grid[list(LASTS)] = grid[list(LASTS)].ffill()
+    return grid
+
+
+def _expected_window(grid, start, end):
+    days = grid.loc[(grid.index >= (grid.index[0] if pd.isna(start) else pd.Timestamp(start).floor('D')))
+                    & (grid.index <= (grid.index[-1] if pd.isna(end) else pd.Timestamp(end).floor('D')))]
+    window = {'days': len(days)}
+    for name in SUMS:
+        window[name] = days[name].sum(min_count=1)
+    for name in LASTS:
+        window[f'{name}_first'] = days[name].iloc[0] if len(days) else np.nan
+        window[f'{name}_last'] = days[name].iloc[-1] if len(days) else np.nan
+    return window
+
+
+def _values(window):
+    return {name: value for name, value in window.items() if name not in ('start', 'end')}
+
+
+BOUNDS = [
+    (None, None),
+    ('2020-01-01', '2030-01-01'),        # around the whole grid
+    ('2020-01-01', '2023-11-14'),        # before the first day
+    ('2025-12-04', '2026-06-01'),        # after the last day
+    ('2023-11-15', '2023-11-15'),        # the first day alone
+    ('2025-12-03 23:59', '2025-12-03'),  # the last day alone
+    ('2023-11-10', '2023-11-20'),        # across the first day
+    ('2025-11-28', '2025-12-09'),        # across the last day
+    ('2024-06-10 18:00', '2024-09-01 02:00'),
+    ('2024-06-10', '2024-06-09'),        # end before start
+    (None, '2024-02-29'),
+    ('2025-02-28', None),
+]
+
+
+@pytest.mark.parametrize('start, end', BOUNDS)
+def test_window_matches_direct_sums(start, end):
+    frame = _timeline()
+    cube = RollupCube.from_frame(frame, sums=SUMS, lasts=LASTS)
+    window = cube.window(start, end)
+    expected = _expected_window(_grid(frame), start, end)
+    assert {name: window[name] for name in expected} == pytest.approx(expected, nan_ok=True)
+    if expected['days']:
+        assert window['end'] - window['start'] == pd.Timedelta(days=expected['days'] - 1)
+    else:
+        assert pd.isna(window['start']) and pd.isna(window['end'])
+
+
+def test_windows_match_window():
+    frame = _timeline()
+    cube = RollupCube.from_frame(frame, sums=SUMS, lasts=LASTS)
+    starts = [start for start, _ in BOUNDS] + [pd.NaT, '2024-01-01']
+    ends = [end for _, end in BOUNDS] + ['2024-01-01', pd.NaT]
+    # windows() takes dates for both bounds; open bounds become the grid edges
+    starts = [start if start is not None else '2023-11-15' for start in starts]
+    ends = [end if end is not None else '2025-12-03' for end in ends]
+    table = cube.windows(pd.to_datetime(starts, format='mixed'), pd.to_datetime(ends, format='mixed'))
+    for i, (start, end) in enumerate(zip(starts, ends)):
+        if pd.isna(start) or pd.isna(end):
+            assert table.loc[i, 'days'] == 0 and np.isnan(table.loc[i, 'streams'])
+            continue
+        window = cube.window(start, end)
+        row = table.loc[i]
+        assert {name: row[name] for name in ('days',) + SUMS + ('followers_first', 'followers_last')} == \
+            pytest.approx({name: window[name] for name in ('days',) + SUMS + ('followers_first', 'followers_last')},
+                          nan_ok=True)
+
+
+@pytest.mark.parametrize('level', list(LEVELS))
+@pytest.mark.parametrize('start, end', [(None, None), ('2024-02-14', '2025-07-02 13:00'), ('2023-01-01', '2024-01-01'),
+                                        ('2025-12-01', '2026-12-01'), ('2024-05-05', '2024-05-05')])
+def test_rollups_match_groupby(level, start, end):
+    frame = _timeline()
+    grid = _grid(frame)
+    cube = RollupCube.from_frame(frame, sums=SUMS, lasts=LASTS)
+    rollup = cube.rollup(level, start, end)
+
+    days = grid.loc[(grid.index >= (grid.index[0] if start is None else pd.Timestamp(start).floor('D')))
+                    & (grid.index <= (grid.index[-1] if end is None else pd.Timestamp(end).floor('D')))]
+    periods = days.index.to_period(LEVELS[level])
+    grouped = days.groupby(periods)
+    expected = pd.concat([grouped[list(SUMS)].sum(min_count=1), grouped[list(LASTS)].last(),
+                          grouped.size().rename('days')], axis=1)
+    expected['end'] = days.index.to_series().groupby(periods).max()
+    expected.index = expected.index.rename(level)
+    pd.testing.assert_frame_equal(rollup[['end', 'days', *SUMS, *LASTS]], expected[['end', 'days', *SUMS, *LASTS]],
+                                  check_dtype=False, check_freq=False)
+
+
+def test_extend_in_chunks_matches_a_full_build():
+    frame = _timeline()
+    whole = RollupCube.from_frame(frame, sums=SUMS, lasts=LASTS)
+    cube = RollupCube(sums=SUMS, lasts=LASTS)
+    # Chunks split inside a day, so a chunk may continue the last stored day
+    day = frame['date'].dt.floor('D')
+    cuts = [0, 1, 40, int(np.flatnonzero(day.duplicated().to_numpy())[5]), 400, len(frame)]
+    assert day.iloc[cuts[3]] == day.iloc[cuts[3] - 1]
+    # ... and one may start after days with no rows
+    assert (day.iloc[400] - day.iloc[399]).days > 1
+    for lo, hi in zip(cuts[:-1], cuts[1:]):
+        cube.extend(frame.iloc[lo:hi])
+    for name in SUMS + LASTS:
+        np.testing.assert_array_equal(cube.daily[name], whole.daily[name])
+    for start, end in BOUNDS:
+        assert _values(cube.window(start, end)) == pytest.approx(_values(whole.window(start, end)), nan_ok=True)
+    with pytest.raises(ValueError, match='must not predate'):
+        cube.extend(frame.iloc[:3])
+
+
+def test_round_trips(tmp_path):
+    frame = _timeline()
+    whole = RollupCube.from_frame(frame, sums=SUMS, lasts=LASTS)
+
+    restored = RollupCube.from_dict(json.loads(json.dumps(whole.to_dict())))
+    for start, end in BOUNDS:
+        assert _values(restored.window(start, end)) == pytest.approx(_values(whole.window(start, end)), nan_ok=True)
+
+    # Array files are appended to across saves; each load sees exactly the cube that was saved
+    array_dir = str(tmp_path / 'cube')
+    cube = RollupCube(sums=SUMS, lasts=LASTS)
+    for lo, hi in ((0, 300), (300, 301), (301, len(frame))):
+        cube.extend(frame.iloc[lo:hi])
+        data = json.loads(json.dumps(cube.to_dict(array_dir)))
+        cube = RollupCube.from_dict(data, array_dir)
+    for name in SUMS + LASTS:
+        np.testing.assert_array_equal(cube.daily[name], whole.daily[name])
+    for level in ('week', 'quarter'):
+        pd.testing.assert_frame_equal(cube.rollup(level), whole.rollup(level))
+
+    empty = RollupCube.from_dict(RollupCube(sums=SUMS, lasts=LASTS).to_dict(str(tmp_path / 'empty')),
+                                 str(tmp_path / 'empty'))
+    assert len(empty) == 0 and empty.window()['days'] == 0
+
+
+def _groupby_earnings_by_year(earnings_df, as_of):
+    # PART 3 as the original script computed it
+    five_years_ago = as_of - pd.Timedelta(days=5 * 365)
+    earnings_5yr = earnings_df[earnings_df['release_date'] >= five_years_ago].copy()
+    earnings_by_year = earnings_5yr.groupby('release_year').agg({
+        'Amount': 'sum', 'Song Title': 'count', 'streams': 'sum', 'listeners': 'sum', 'saves': 'sum'})
+    return earnings_by_year.rename(columns={'Song Title': 'song_count'})
+
+
+def test_earnings_by_year_matches_the_original_groupby(capsys):
+    path = big_nose_analysis.INPUT_FILES['earnings_path'].format(artist=big_nose_analysis.ARTIST)
+    earnings_raw = big_nose_analysis.parse_earnings(os.path.join(REPO_ROOT, path))
+    # 190 as-of dates, at the end of the day as run_analysis passes them, from before the first release to
+    # past the last
+    days = pd.date_range('2012-01-01', '2031-01-01', periods=190).normalize()
+    as_of_dates = days + pd.Timedelta(days=1, microseconds=-1)
+    prepared = {}
+    for as_of in as_of_dates:
+        prepared = big_nose_analysis.prepare_earnings(earnings_raw, None, None, big_nose_analysis.ARTIST, as_of)
+        by_year = big_nose_analysis.analyze_earnings_trend(prepared['earnings_cube'], as_of)['earnings_by_year']
+        expected = _groupby_earnings_by_year(prepared['earnings_df'], as_of)
+        expected = expected[expected['song_count'] > 0]
+        pd.testing.assert_frame_equal(by_year, expected, check_dtype=False, check_names=False,
+                                      check_index_type=False, obj=str(as_of))
+    capsys.readouterr()
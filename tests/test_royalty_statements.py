@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from big_nose_analysis import parse_earnings
+from royalty_statements import KeyedSums, aggregate_statements
+
+
+@pytest.fixture
+def statement(tmp_path):
+    items = pd.DataFrame({
+        'Sale Month': ['2024-01', '2024-02', '2024-01', '2024-03', '2024-01', '2024-02', '2024-02'],
+        'Store': 'Spotify',
+        'Artist': ['Big Nose', 'Big Nose', 'Other Band', None, 'Big Nose', None, 'Big Nose'],
+        'Title': ['Home', 'Home', 'Home', 'Home', 'Dust', 'Dust', None],
+        'Quantity': [10, 20, 5, 7, 3, 4, 1],
+        'Country of Sale': ['US', 'GB', 'US', 'US', 'DE', None, 'US'],
+        'Earnings (USD)': [1.25, 2.50, 0.75, 0.40, 0.30, 0.20, 0.10],
+    })
+    path = tmp_path / 'statements.csv'
+    items.to_csv(path, index=False)
+    return str(path), items
+
+
+def test_totals_keep_items_without_an_artist(statement):
+    path, items = statement
+    # Tiny chunks and buffers exercise the partial-sum merges
+    ledger = aggregate_statements(path, rollup=True, chunk_rows=2)
+    songs = ledger.songs()
+    titled = items[items['Title'].notna()]
+    assert songs['Amount'].sum() == pytest.approx(titled['Earnings (USD)'].sum())
+    assert ledger.line_items == len(items)
+    unknown = songs[songs['Artist'].isna()].set_index('Song Title')['Amount']
+    assert unknown.to_dict() == pytest.approx({'Home': 0.40, 'Dust': 0.20})
+    assert ledger.rollup_frame()['Amount'].sum() == pytest.approx(titled['Earnings (USD)'].sum())
+
+
+def test_keyed_sums_match_a_single_groupby(statement):
+    path, items = statement
+    frame = items.rename(columns={'Title': 'Song Title', 'Earnings (USD)': 'Amount', 'Quantity': 'units'})
+    sums = KeyedSums(['Song Title', 'Artist'], buffer_rows=1)
+    for start in range(0, len(frame), 2):
+        sums.add(frame.iloc[start:start + 2])
+    expected = frame.groupby(['Song Title', 'Artist'], dropna=False)[['Amount', 'units']].sum()
+    result = sums.frame().set_index(['Song Title', 'Artist']).sort_index()
+    np.testing.assert_allclose(result['Amount'], expected.sort_index()['Amount'])
+
+
+def test_metadata_joins_on_title_and_artist(statement, tmp_path):
+    path, _ = statement
+    export = pd.DataFrame({'Song Title': ['Home', 'Home', 'Dust'], 'Artist': ['Big Nose', 'Other Band', 'Big Nose'],
+                           'Type': ['Single', 'Song on Album', 'Single'], 'Amount': [0.0, 0.0, 0.0],
+                           'listeners': [1, 2, 3], 'streams': [100, 200, 300], 'saves': [0, 0, 0],
+                           'release_date': ['2020-01-01', '2021-06-01', '2022-03-01'], 'Notes': ''})
+    export_path = tmp_path / 'earnings.csv'
+    export.to_csv(export_path, index=False)
+
+    frame = aggregate_statements(path).earnings_frame(parse_earnings(str(export_path)))
+    rows = frame.dropna(subset=['Artist']).set_index(['Song Title', 'Artist'])
+    assert rows.loc[('Home', 'Big Nose'), 'streams'] == 100
+    assert rows.loc[('Home', 'Other Band'), 'streams'] == 200
+    assert rows.loc[('Home', 'Big Nose'), 'Amount'] == pytest.approx(3.75)
+    assert len(frame) == 5
@@ -0,0 +1,67 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import big_nose_analysis
+from song_catalog import SongCatalog, normalize_titles
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_normalized_titles():
+    titles = ['Ghost Driver (feat. LUMRY)', 'GHOST  DRIVER ft. Someone', 'ghost driver [Featuring A, B]',
+              'Ghost Driver feat Other', 'ＧＨＯＳＴ Driver', 'Straße', 'STRASSE', ' ﬁre  line ', 'Defeat Me',
+              'Aft. Glow']
+    assert normalize_titles(titles).tolist() == [
+        'ghost driver', 'ghost driver', 'ghost driver', 'ghost driver', 'ghost driver', 'strasse', 'strasse',
+        'fire line', 'defeat me', 'aft. glow']
+
+
+def test_register_and_aligned_sums():
+    catalog = SongCatalog()
+    first = catalog.register('earnings', ['Song A', 'Song B (feat. X)', None, 'Song A'])
+    second = catalog.register('streams', ['song b', 'SONG C', 'Song A', 'Song C', np.nan])
+    assert first.tolist() == [0, 1, -1, 0]
+    assert second.tolist() == [1, 2, 0, 2, -1]
+    # The first spelling seen is the display title
+    assert catalog.frame()['title'].tolist() == ['Song A', 'Song B (feat. X)', 'SONG C']
+    assert catalog.matched('earnings') == 2 and catalog.matched('streams') == 3
+
+    earnings = catalog.aligned('earnings', [1.5, 2.0, 100.0, 0.5])
+    np.testing.assert_array_equal(earnings, [2.0, 2.0, np.nan])
+    # Missing values are skipped; a song whose values are all missing is NaN, not 0
+    streams = catalog.aligned('streams', pd.Series([np.nan, 3, 7, 5, 1000], dtype='Float64'))
+    np.testing.assert_array_equal(streams, [7.0, np.nan, 8.0])
+    assert catalog.aligned('streams', [0, 0, 0, 0, 0]).tolist() == [0.0, 0.0, 0.0]
+
+
+def test_earnings_summary_folds_unquoted_commas(tmp_path):
+    path = tmp_path / 'summary.csv'
+    path.write_text('Title,Artist,Type,Amount,Notes\n'
+                    'Plain,Big Nose,Single,$1.00,\n'
+                    'Cliffside,Groovetide,Big Nose,Single,"$1,019.41",50% of splits\n'
+                    "Fine, I'll Wait,Mad Seedling x Big Nose,Single,$0.46,50% of splits\n"
+                    'One, Two, Three,A,B,C,Album,$2.00,\n')
+    summary = big_nose_analysis.parse_earnings_summary(str(path), compact=False)
+    assert summary['Title'].tolist() == ['Plain', 'Cliffside', "Fine, I'll Wait", 'One, Two, Three']
+    assert summary['Artist'].tolist() == ['Big Nose', 'Groovetide, Big Nose', 'Mad Seedling x Big Nose', 'A, B, C']
+    assert summary['Type'].tolist() == ['Single', 'Single', 'Single', 'Album']
+    assert summary['Amount'].tolist() == [1.0, 1019.41, 0.46, 2.0]
+
+
+def test_bundled_earnings_summary_matches_the_per_song_export():
+    directory = os.path.join(REPO_ROOT, 'Earnings_Per_Songs')
+    summary = big_nose_analysis.parse_earnings_summary(os.path.join(directory, 'Big Nose-earnings-per-songs.csv'),
+                                                       compact=False)
+    earnings = big_nose_analysis.parse_earnings(os.path.join(directory, 'Big Nose-earnings-per-song.csv'),
+                                                compact=False)
+    # Rows 13, 84, 87 and 102 of the file carry unquoted commas; the per-song export quotes the same fields
+    songs = earnings.set_index('Song Title')
+    for line in (13, 84, 87, 102):
+        row = summary.iloc[line - 2]
+        assert row['Artist'] == songs.loc[row['Title'], 'Artist']
+        assert row['Amount'] == pytest.approx(songs.loc[row['Title'], 'Amount'])
+    assert summary['Title'].str.contains(',').sum() == 3
+    assert len(summary) == 123
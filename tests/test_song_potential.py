@@ -0,0 +1,111 @@
+import statistics
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import song_potential
+from song_catalog import SongCatalog
+
+AS_OF = pd.Timestamp('2025-12-31')
+
+
+def test_robust_z_matches_the_formula():
+    values = np.array([3.0, 7.0, 1.0, 4.0, 10.0, 4.5, np.nan, np.inf, -np.inf])
+    finite = [value for value in values if np.isfinite(value)]
+    median = statistics.median(finite)
+    mad = 1.4826 * statistics.median([abs(value - median) for value in finite])
+    z = song_potential.robust_z(values)
+    assert z[:6] == pytest.approx([(value - median) / mad for value in values[:6]])
+    # Missing stays missing, infinite keeps its sign without moving the median or MAD
+    assert np.isnan(z[6]) and z[7] == np.inf and z[8] == -np.inf
+
+
+def test_robust_z_without_spread():
+    # MAD is 0 when most values are equal: every score is 0, not inf or NaN, and missing stays missing
+    z = song_potential.robust_z([2.0, 2.0, 2.0, 9.0, np.nan, -np.inf])
+    assert z[:4].tolist() == [0, 0, 0, 0] and np.isnan(z[4]) and z[5] == 0
+    assert np.isnan(song_potential.robust_z([np.nan, np.inf])).all()
+    assert len(song_potential.robust_z([])) == 0
+
+
+def _exports(rows):
+    # rows: (song, 1-year streams, listeners, saves, lifetime streams, release date); None leaves the song
+    # out of that export
+    one_year = pd.DataFrame([(song, streams, listeners, saves, release)
+                             for song, streams, listeners, saves, _, release in rows if streams is not None],
+                            columns=['song', 'streams', 'listeners', 'saves', 'release_date'])
+    lifetime = pd.DataFrame([(song, 0, total, 0, release)
+                             for song, _, _, _, total, release in rows if total is not None],
+                            columns=['song', 'listeners', 'streams', 'saves', 'release_date'])
+    catalog = SongCatalog()
+    catalog.register('songs_1year', one_year['song'])
+    catalog.register('songs_all', lifetime['song'])
+    return catalog, one_year, lifetime
+
+
+def _steady(song, streams, release='2020-01-01', spread=(1, 1, 1)):
+    # A song streaming at a steady pace since release: momentum 1, two streams per listener, 1% saves,
+    # each scaled by `spread`
+    years = (AS_OF - pd.Timestamp(release)).days / 365.25
+    saves, replay, momentum = spread
+    return (song, streams, round(streams / 2 / replay), round(streams / 100 * saves),
+            round(streams * years / momentum), release)
+
+
+def test_signals_cover_songs_in_only_one_export():
+    catalog, one_year, lifetime = _exports([
+        _steady('both', 1000),
+        ('recent only', 1000, 500, 10, None, '2024-06-01'),
+        ('lifetime only', None, None, None, 50_000, '2019-01-01'),
+        ('quiet', 99, 50, 1, 5000, '2020-01-01'),
+    ])
+    signals = song_potential.song_signals(catalog, one_year, lifetime, AS_OF).set_index('title')
+    assert signals.loc['both', 'momentum'] == pytest.approx(1, rel=1e-3)
+    assert signals.loc['both', ['save_rate', 'streams_per_listener']].tolist() == [0.01, 2]
+    # No lifetime total: no momentum, the other signals still count
+    assert np.isnan(signals.loc['recent only', 'momentum'])
+    assert signals.loc['recent only', 'save_rate'] == 0.01
+    # No 1-year row, or too few streams to trust the rates: no signals at all
+    for song in ('lifetime only', 'quiet'):
+        assert signals.loc[song, list(song_potential.SIGNALS)].isna().all()
+
+    release = song_potential.release_days(catalog, one_year, lifetime)
+    assert release[catalog.frame()['title'].tolist().index('lifetime only')] == \
+        (pd.Timestamp('2019-01-01') - pd.Timestamp(0)).days
+
+    scored, candidates = song_potential.detect(catalog, one_year, lifetime, AS_OF)
+    scored = scored.set_index('title')
+    assert scored.loc[['lifetime only', 'quiet'], 'potential'].isna().all()
+    # Potential averages the available scores
+    assert scored.loc['recent only', 'potential'] == pytest.approx(
+        np.mean(scored.loc['recent only', ['save_rate_z', 'streams_per_listener_z']]))
+
+
+def test_candidates_need_potential_and_below_median_streams():
+    factors = [0.8, 0.9, 1.0, 1.1, 1.2, 0.85, 1.15]
+    rows = [_steady(f'steady {i}', streams, spread=(factors[i], factors[(i + 2) % 7], factors[(i + 4) % 7]))
+            for i, streams in enumerate([400, 800, 1200, 1600, 2000, 2400, 3000])]
+    rows += [
+        # Fans save and replay it far more than the rest, on few streams: a candidate
+        ('hidden gem', 500, 100, 50, 1500, '2020-01-01'),
+        # Same signals on many streams: already pushed
+        ('hit', 50_000, 10_000, 5000, 150_000, '2020-01-01'),
+        # Slightly better than the rest: not enough potential
+        _steady('solid', 450, spread=(1.2, 1.2, 1.2)),
+    ]
+    catalog, one_year, lifetime = _exports(rows)
+    signals, candidates = song_potential.detect(catalog, one_year, lifetime, AS_OF)
+    signals = signals.set_index('title')
+
+    median = np.median(np.log(signals['streams_1yr']))
+    expected = signals[(signals['potential'] >= song_potential.MIN_SCORE) & (np.log(signals['streams_1yr']) < median)]
+    assert candidates['title'].tolist() == expected.sort_values('potential', ascending=False).index.tolist()
+    assert candidates['title'].tolist() == ['hidden gem']
+    assert signals.loc['hit', 'potential'] >= song_potential.MIN_SCORE
+    assert 0 < signals.loc['solid', 'potential'] < song_potential.MIN_SCORE
+
+    # A lower bar admits more candidates, still ranked by potential
+    _, lowered = song_potential.detect(catalog, one_year, lifetime, AS_OF, min_score=0)
+    assert set(lowered['title']) >= {'hidden gem', 'solid'} and 'hit' not in set(lowered['title'])
+    assert lowered['potential'].is_monotonic_decreasing
@@ -0,0 +1,81 @@
+import multiprocessing as mp
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import big_nose_analysis
+from warehouse import Warehouse, ingest_artist
+
+WRITERS = 4
+
+
+def _frame(seed):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({'song': [f'Song {i}' for i in range(50)], 'listeners': rng.integers(0, 100, 50),
+                         'streams': rng.integers(0, 1000, 50), 'saves': rng.random(50),
+                         'release_date': pd.date_range('2020-01-01', periods=50)})
+
+
+def _store(path, artist, seed, barrier):
+    warehouse = Warehouse(path)
+    barrier.wait()
+    warehouse.store(artist, 'songs_1year', _frame(seed))
+
+
+def test_concurrent_writers_add_columns_once(tmp_path):
+    path = str(tmp_path / 'wh.sqlite')
+    Warehouse(path)
+    ctx = mp.get_context('spawn')
+    barrier = ctx.Barrier(WRITERS)
+    workers = [ctx.Process(target=_store, args=(path, f'Artist {i}', i, barrier)) for i in range(WRITERS)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(60)
+    assert [worker.exitcode for worker in workers] == [0] * WRITERS
+
+    warehouse = Warehouse(path)
+    assert warehouse.artists() == [f'Artist {i}' for i in range(WRITERS)]
+    for i in range(WRITERS):
+        pd.testing.assert_frame_equal(warehouse.frame(f'Artist {i}', 'songs_1year'), _frame(i))
+
+
+def test_roundtrip_and_rollups_match_parsers(tmp_path, synthetic_artist):
+    warehouse = Warehouse(str(tmp_path / 'wh.sqlite'))
+    paths = {name: path for name, path in synthetic_artist['paths'].items() if name in big_nose_analysis.INPUT_PARSERS}
+    ingest_artist(warehouse, synthetic_artist['artist'], paths, big_nose_analysis.INPUT_PARSERS)
+
+    songs = big_nose_analysis.INPUT_PARSERS['songs_1year_path'](paths['songs_1year_path'])
+    pd.testing.assert_frame_equal(warehouse.frame(synthetic_artist['artist'], 'songs_1year'), songs)
+    roster = warehouse.roster_metrics('2025-12-23').set_index('artist')
+    assert roster.loc[synthetic_artist['artist'], 'total_streams_1yr'] == songs['streams'].sum()
+
+
+def test_artist_metrics_match_the_stages(tmp_path, synthetic_artist):
+    path = str(tmp_path / 'wh.sqlite')
+    params = big_nose_analysis.analysis_params(synthetic_artist['data_dir'], str(tmp_path),
+                                               synthetic_artist['artist'], as_of='2025-12-23', plots=False,
+                                               forecast_paths=0, warehouse_path=path)
+    run = big_nose_analysis.STAGES.run(params, file_params=big_nose_analysis.INPUT_FILES,
+                                       artifact_dir=str(tmp_path), skip=('plot_dashboard',))
+    metrics = Warehouse(path).artist_metrics(synthetic_artist['artist'], '2025-12-23', k=10)
+
+    for name in ('total_earnings', 'avg_earnings_per_song', 'median_earnings_per_song', 'total_streams_1yr',
+                 'total_listeners_1yr', 'total_saves_1yr', 'initial_followers', 'final_followers'):
+        assert metrics[name] == pytest.approx(run[name]), name
+    audience = run['audience_1yr']
+    assert metrics['window_listeners'] == audience['listeners'].sum()
+    assert metrics['window_streams'] == audience['streams'].sum()
+
+    top_songs = run['top_songs'].rename(columns={'Song Title': 'song', 'Amount': 'amount'}).reset_index(drop=True)
+    top_songs['release_date'] = top_songs['release_date'].dt.strftime('%Y-%m-%d %H:%M:%S')
+    pd.testing.assert_frame_equal(metrics['top_songs'], top_songs, check_dtype=False)
+    top_performers = run['top_performers_1yr'].reset_index(drop=True)
+    top_performers['release_date'] = top_performers['release_date'].dt.strftime('%Y-%m-%d %H:%M:%S')
+    pd.testing.assert_frame_equal(metrics['top_performers_1yr'], top_performers, check_dtype=False)
+    by_year = run['earnings_by_year'].rename(columns={'Amount': 'amount'}).reset_index()
+    pd.testing.assert_frame_equal(metrics['earnings_by_year'], by_year, check_dtype=False)
+    monthly = run['monthly_followers']
+    assert metrics['monthly_followers']['year_month'].tolist() == [str(month) for month in monthly.index]
+    assert metrics['monthly_followers']['followers'].tolist() == monthly.tolist()
@@ -0,0 +1,193 @@
+"""
+Audience Time-Series Store
+Append-only, memory-mapped fixed-width columns for audience timelines
+"""
+
+import io
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+import quality
+from audience_state import audience_cube, history_profile, read_appended, read_complete_lines, track_source
+from rollup_cube import RollupCube
+
+METRICS = ('listeners', 'streams', 'followers')
+
+# Metric columns are int64; missing values are stored as this sentinel
+MISSING = np.iinfo(np.int64).min
+
+DATE_DTYPE = np.dtype('datetime64[s]')
+METRIC_DTYPE = np.dtype(np.int64)
+
+
+class TimeSeriesStore:
+    """One artist's audience timeline as a date index plus one int64 file per metric.
+
+    `meta.json` is the commit point: its `length` counts the rows that are fully written, so a crash
+    during an append leaves trailing bytes that the next append overwrites. The daily rollup cube of
+    the timeline is kept the same way under `cube/`, extended by each append, and so is the running
+    quality profile of every appended row (`meta['profile']`).
+    """
+
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+        meta_path = os.path.join(store_dir, 'meta.json')
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                self.meta = json.load(f)
+        else:
+            self.meta = {'length': 0, 'profile': None, 'source': None}
+        self._arrays = None
+        self._cube = None
+
+    def __len__(self):
+        return self.meta['length']
+
+    def _path(self, column):
+        return os.path.join(self.store_dir, f'{column}.bin')
+
+    def _columns(self):
+        return (('date', DATE_DTYPE),) + tuple((metric, METRIC_DTYPE) for metric in METRICS)
+
+    @property
+    def arrays(self):
+        """Read-only memory maps of every column, trimmed to the committed length."""
+        if self._arrays is None:
+            length = len(self)
+            self._arrays = {
+                column: (np.memmap(self._path(column), dtype=dtype, mode='r', shape=(length,)) if length
+                         else np.empty(0, dtype=dtype))
+                for column, dtype in self._columns()
+            }
+        return self._arrays
+
+    def cube(self):
+        """Daily rollup cube of every stored row, read from its files (built once for older stores)."""
+        if self._cube is None:
+            if 'cube' in self.meta:
+                self._cube = RollupCube.from_dict(self.meta['cube'], os.path.join(self.store_dir, 'cube'))
+            else:
+                self._cube = audience_cube(self.slice() if len(self) else None)
+        return self._cube
+
+    def _save_meta(self):
+        staging = os.path.join(self.store_dir, f'meta.json.{os.getpid()}.tmp')
+        with open(staging, 'w') as f:
+            json.dump(self.meta, f)
+        os.replace(staging, os.path.join(self.store_dir, 'meta.json'))
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def append(self, frame):
+        """Append timeline rows (strictly later than the stored rows) without rewriting existing data."""
+        self.meta['profile'] = quality.fold_profile(self.meta['profile'], frame)
+        if len(frame) == 0:
+            return
+        dates = frame['date'].to_numpy(dtype=DATE_DTYPE)
+        if (np.diff(dates.astype(np.int64)) <= 0).any():
+            raise ValueError("Audience rows must be strictly increasing in date")
+        if len(self) and dates[0] <= self.arrays['date'][-1]:
+            raise ValueError("Appended audience rows must be later than the stored rows")
+
+        os.makedirs(self.store_dir, exist_ok=True)
+        cube = self.cube()
+        cube.extend(frame)
+        offset = len(self) * 8
+        columns = {'date': dates.view(np.int64)}
+        for metric in METRICS:
+            missing = frame[metric].isna().to_numpy()
+            columns[metric] = np.where(missing, MISSING, frame[metric].fillna(0).to_numpy(dtype=np.int64))
+        for column, values in columns.items():
+            path = self._path(column)
+            with open(path, 'r+b' if os.path.exists(path) else 'wb') as f:
+                f.seek(offset)
+                f.truncate()
+                f.write(values.astype('<i8', copy=False).tobytes())
+
+        self.meta['length'] += len(frame)
+        self.meta['cube'] = cube.to_dict(os.path.join(self.store_dir, 'cube'))
+        self._save_meta()
+        self._arrays = None
+
+    def sync_from_csv(self, csv_path, parser):
+        """Append the rows added to `csv_path` since the last sync; rebuild if the file was rewritten."""
+        source = self.meta['source']
+        # Stores written before the quality profile was kept are rebuilt
+        appended = read_appended(csv_path, source) if source and 'profile' in self.meta else None
+        if appended is None:
+            data = read_complete_lines(csv_path)
+            self.meta = {'length': 0, 'profile': None, 'source': track_source(data)}
+            self._arrays = None
+            self._cube = audience_cube()
+            self.append(parser(io.BytesIO(data)))
+        elif appended:
+            self.append(parser(io.BytesIO(appended)))
+        if 'cube' not in self.meta:
+            self.meta['cube'] = self.cube().to_dict(os.path.join(self.store_dir, 'cube'))
+        self._save_meta()
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def slice(self, start=None, end=None):
+        """Rows with start <= date <= end as a frame over the memory-mapped columns (no copy).
+
+        Metrics are int64 unless the slice contains missing values, in which case they become float.
+        """
+        arrays = self.arrays
+        dates = arrays['date']
+        lo = 0 if start is None else np.searchsorted(dates, np.datetime64(pd.Timestamp(start).ceil('s')), 'left')
+        hi = len(self) if end is None else np.searchsorted(dates, np.datetime64(pd.Timestamp(end)), 'right')
+        data = {'date': arrays['date'][lo:hi]}
+        for metric in METRICS:
+            values = arrays[metric][lo:hi]
+            missing = values == MISSING
+            if missing.any():
+                values = np.where(missing, np.nan, values)
+            data[metric] = values
+        return pd.DataFrame(data, copy=False)
+
+    @property
+    def date_range(self):
+        if not len(self):
+            return pd.NaT, pd.NaT
+        return pd.Timestamp(self.arrays['date'][0]), pd.Timestamp(self.arrays['date'][-1])
+
+
+class StoreWindow:
+    """Trailing-window view over a TimeSeriesStore, interchangeable with AudienceState in PART 4."""
+
+    def __init__(self, store, as_of, window_days=365):
+        self.store = store
+        self.as_of = pd.Timestamp(as_of)
+        self.window_days = window_days
+        self.rows = len(store)
+        self._frame = store.slice(start=self.as_of - pd.Timedelta(days=window_days))
+        self.cube = store.cube()
+
+    def history_profile(self):
+        """Quality profile of the whole stored timeline, completed for this window's as-of date."""
+        after = len(self.store) - int(np.searchsorted(self.store.arrays['date'], np.datetime64(self.as_of), 'right'))
+        return history_profile(self.store.meta.get('profile'), after, len(self._frame) - after, self.as_of,
+                               self.window_days)
+
+    def window_frame(self):
+        return self._frame.copy(deep=False)
+
+    def monthly_followers(self):
+        frame = self._frame[self._frame['followers'].notna()]
+        return frame.groupby(frame['date'].dt.to_period('M').rename('year_month'))['followers'].last()
+
+    @property
+    def window_sums(self):
+        return {metric: float(np.nansum(self._frame[metric])) for metric in ('listeners', 'streams')}
+
+    @property
+    def date_range(self):
+        return self.store.date_range
@@ -0,0 +1,347 @@
+"""
+Analytical Warehouse
+Embedded SQLite store of every artist's cleaned inputs, indexed by artist, with pushed-down roster and PART 2-5 queries
+
+`run_analysis(warehouse_path=...)` reads its input frames from here instead of parsing the files, and
+its stages still run in pandas on those frames. The figures computed inside SQLite are the roster's
+headline metrics (`roster_metrics`) and one artist's PART 2-5 aggregates (`artist_metrics`).
+"""
+
+import argparse
+import contextlib
+import json
+import sqlite3
+from datetime import datetime
+
+import pandas as pd
+
+from ingest_cache import file_digest, parser_digest
+
+# Tables and the column each is indexed on after the artist; a table is named after its input
+# parameter without the `_path` suffix (earnings_path -> earnings)
+TABLES = {
+    'earnings': 'song',
+    'songs_1year': 'song',
+    'songs_all': 'song',
+    'earnings_summary': 'song',
+    'audience': 'date',
+    'playlists': 'date_added',
+}
+
+# Frame columns stored under another name ('artist' is the warehouse key, so the credit column moves)
+COLUMN_NAMES = {'Song Title': 'song', 'Title': 'song', 'Artist': 'credited_artist'}
+
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# The artist's own rows of the earnings table (the analysis drops collaborations credited elsewhere)
+OWN_SONGS = 'artist = :artist AND instr(credited_artist, artist) > 0'
+
+# Per-artist aggregates that do not depend on the as-of date, recomputed in SQL whenever an artist's
+# table is stored, so roster queries read one small table instead of scanning every song row
+ROLLUPS = {
+    'earnings': (
+        f'SELECT SUM(amount) AS total_earnings, COUNT(*) AS songs FROM earnings WHERE {OWN_SONGS}',
+        'SELECT AVG(released) AS songs_per_year FROM (SELECT COUNT(*) AS released FROM earnings '
+        f'WHERE {OWN_SONGS} AND release_date IS NOT NULL GROUP BY substr(release_date, 1, 4))',
+        # Gini and HHI from the running total over amounts in descending order (see concentration.py)
+        'SELECT 2.0 * SUM(cumulative) / (COUNT(*) * MAX(total)) - (COUNT(*) + 1.0) / COUNT(*) AS earnings_gini, '
+        'SUM(amount * amount) / (MAX(total) * MAX(total)) AS earnings_hhi FROM ('
+        'SELECT MAX(amount, 0) AS amount, SUM(MAX(amount, 0)) OVER (ORDER BY MAX(amount, 0) DESC ROWS UNBOUNDED '
+        'PRECEDING) AS cumulative, SUM(MAX(amount, 0)) OVER () AS total FROM earnings '
+        f'WHERE {OWN_SONGS} AND amount IS NOT NULL) WHERE total > 0',
+    ),
+    'songs_1year': (
+        'SELECT SUM(streams) AS total_streams_1yr, SUM(listeners) AS total_listeners_1yr, '
+        'SUM(saves) AS total_saves_1yr FROM songs_1year WHERE artist = :artist',
+    ),
+    'playlists': (
+        'SELECT COUNT(*) AS playlists, SUM(streams) AS playlist_streams FROM playlists WHERE artist = :artist',
+    ),
+}
+
+# One artist's PART 2-5 figures; :start is the first moment of the trailing year and :cutoff the first
+# release day of the 5-year earnings trend. Top-k ties keep row order and missing values sort last, as
+# in RankingIndex.
+ARTIST_QUERIES = {
+    'overview': (
+        'SELECT SUM(amount) AS total_earnings, AVG(amount) AS avg_earnings_per_song, '
+        '(SELECT AVG(amount) FROM (SELECT amount, ROW_NUMBER() OVER (ORDER BY amount) AS rank, COUNT(*) OVER () '
+        f'AS n FROM earnings WHERE {OWN_SONGS} AND amount IS NOT NULL) WHERE rank IN ((n + 1) / 2, (n + 2) / 2)) '
+        'AS median_earnings_per_song '
+        f'FROM earnings WHERE {OWN_SONGS} AND amount IS NOT NULL'),
+    'top_songs': (
+        f'SELECT song, amount, listeners, streams, saves, release_date FROM earnings WHERE {OWN_SONGS} '
+        'ORDER BY amount IS NULL, amount DESC, row LIMIT :k'),
+    'earnings_by_year': (
+        'SELECT CAST(substr(release_date, 1, 4) AS INTEGER) AS release_year, SUM(amount) AS amount, '
+        'COUNT(song) AS song_count, SUM(streams) AS streams, SUM(listeners) AS listeners, SUM(saves) AS saves '
+        f'FROM earnings WHERE {OWN_SONGS} AND release_date >= :cutoff GROUP BY release_year HAVING song_count > 0 '
+        'ORDER BY release_year'),
+    'performance': (
+        'SELECT SUM(streams) AS total_streams_1yr, SUM(listeners) AS total_listeners_1yr, '
+        'SUM(saves) AS total_saves_1yr FROM songs_1year WHERE artist = :artist'),
+    'top_performers_1yr': (
+        'SELECT song, listeners, streams, saves, release_date FROM songs_1year WHERE artist = :artist '
+        'ORDER BY streams IS NULL, streams DESC, row LIMIT :k'),
+    'followers': (
+        'SELECT (SELECT followers FROM audience WHERE artist = :artist AND date >= :start ORDER BY date LIMIT 1) '
+        'AS initial_followers, '
+        '(SELECT followers FROM audience WHERE artist = :artist AND date >= :start ORDER BY date DESC LIMIT 1) '
+        'AS final_followers, SUM(listeners) AS window_listeners, SUM(streams) AS window_streams '
+        'FROM audience WHERE artist = :artist AND date >= :start'),
+    'monthly_followers': (
+        'SELECT month AS year_month, followers FROM (SELECT substr(date, 1, 7) AS month, followers, '
+        'ROW_NUMBER() OVER (PARTITION BY substr(date, 1, 7) ORDER BY date DESC) AS latest FROM audience '
+        'WHERE artist = :artist AND date >= :start AND followers IS NOT NULL) WHERE latest = 1 ORDER BY month'),
+}
+
+# ARTIST_QUERIES entries returning one row of scalars; the others are tables
+ARTIST_SCALARS = ('overview', 'performance', 'followers')
+
+ROLLUP_METRICS = ('total_earnings', 'songs', 'songs_per_year', 'earnings_gini', 'earnings_hhi', 'total_streams_1yr',
+                  'total_listeners_1yr', 'total_saves_1yr', 'playlists', 'playlist_streams')
+
+
+def _sql_name(name):
+    return COLUMN_NAMES.get(name, name.lower().replace(' ', '_'))
+
+
+def _affinity(dtype):
+    if pd.api.types.is_integer_dtype(dtype) or pd.api.types.is_bool_dtype(dtype):
+        return 'INTEGER'
+    return 'REAL' if pd.api.types.is_float_dtype(dtype) else 'TEXT'
+
+
+class Warehouse:
+    """One SQLite file holding the cleaned input frames of every artist.
+
+    Each table has one row per input row, keyed by (artist, row) and indexed on (artist, song) or
+    (artist, date). The `sources` table records the file and parser digest each artist's rows were
+    loaded from, plus the frame's column names and dtypes so reads return the parser's frame exactly.
+    Every call opens its own connection, so loader threads and batch processes can share the file;
+    `store` takes the write lock before reading the schema, so concurrent writers add columns in turn.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with self._connect() as db:
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('CREATE TABLE IF NOT EXISTS sources (artist TEXT NOT NULL, input TEXT NOT NULL, '
+                       'path TEXT, digest TEXT, columns TEXT, rows INTEGER, loaded_at TEXT, '
+                       'PRIMARY KEY (artist, input))')
+            db.execute('CREATE TABLE IF NOT EXISTS artist_metrics (artist TEXT NOT NULL, input TEXT NOT NULL, '
+                       'metric TEXT NOT NULL, value REAL, PRIMARY KEY (artist, metric))')
+            for table, column in TABLES.items():
+                db.execute(f'CREATE TABLE IF NOT EXISTS {table} (artist TEXT NOT NULL, row INTEGER NOT NULL, '
+                           f'"{column}", PRIMARY KEY (artist, row)) WITHOUT ROWID')
+                db.execute(f'CREATE INDEX IF NOT EXISTS {table}_artist_{column} ON {table} (artist, "{column}")')
+
+    @contextlib.contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=60)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def store(self, artist, table, frame, digest=None, path=None):
+        """Replace the artist's rows of `table` with `frame`."""
+        columns = [[name, _sql_name(name), str(dtype)] for name, dtype in frame.dtypes.items()]
+        values = {}
+        for name, sql_name, _ in columns:
+            series = frame[name]
+            if pd.api.types.is_datetime64_any_dtype(series):
+                series = series.dt.strftime(DATE_FORMAT)
+            values[sql_name] = series.astype(object).where(series.notna(), None)
+        rows = pd.DataFrame(values, index=frame.index).itertuples(index=False, name=None)
+
+        with self._connect() as db:
+            # Take the write lock up front: a deferred transaction would let two writers read the same
+            # old schema and both add the missing columns
+            db.execute('BEGIN IMMEDIATE')
+            existing = {info[1] for info in db.execute(f'PRAGMA table_info({table})')}
+            for name, sql_name, dtype in columns:
+                if sql_name not in existing:
+                    db.execute(f'ALTER TABLE {table} ADD COLUMN "{sql_name}" {_affinity(frame[name].dtype)}')
+            names = ', '.join(f'"{sql_name}"' for _, sql_name, _ in columns)
+            db.execute(f'DELETE FROM {table} WHERE artist = ?', (artist,))
+            db.executemany(f'INSERT INTO {table} (artist, row, {names}) VALUES (?, ?{", ?" * len(columns)})',
+                           ((artist, i) + row for i, row in enumerate(rows)))
+            db.execute('INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?, ?, ?, ?)',
+                       (artist, table, path, digest, json.dumps(columns), len(frame),
+                        datetime.now().isoformat(timespec='seconds')))
+            db.execute('DELETE FROM artist_metrics WHERE artist = ? AND input = ?', (artist, table))
+            for sql in ROLLUPS.get(table, ()):
+                cursor = db.execute(sql, {'artist': artist})
+                metrics = zip((column[0] for column in cursor.description), cursor.fetchone())
+                db.executemany('INSERT INTO artist_metrics VALUES (?, ?, ?, ?)',
+                               [(artist, table, metric, value) for metric, value in metrics])
+
+    def load(self, artist, table, path, parser):
+        """`parser(path)` for the artist, read from the warehouse while the file and parser are unchanged.
+
+        A new or changed file is parsed and its rows replace the artist's old ones.
+        """
+        digest = f'{parser_digest(parser)}:{file_digest(path)}'
+        with self._connect() as db:
+            stored = db.execute('SELECT digest FROM sources WHERE artist = ? AND input = ?', (artist, table)).fetchone()
+        if stored and stored[0] == digest:
+            return self.frame(artist, table)
+        frame = parser(path)
+        self.store(artist, table, frame, digest, path)
+        return frame
+
+    def frame(self, artist, table, where=None, params=()):
+        """The artist's rows of `table` as the frame that was stored, optionally filtered by a SQL `where`
+        clause on the stored column names (evaluated in SQLite, on the artist's index range)."""
+        with self._connect() as db:
+            stored = db.execute('SELECT columns FROM sources WHERE artist = ? AND input = ?', (artist, table)).fetchone()
+            if stored is None:
+                raise KeyError(f"No {table} rows for {artist!r} in {self.path}")
+            columns = json.loads(stored[0])
+            names = ', '.join(f'"{sql_name}"' for _, sql_name, _ in columns)
+            condition = f' AND ({where})' if where else ''
+            rows = db.execute(f'SELECT {names} FROM {table} WHERE artist = ?{condition} ORDER BY row',
+                              (artist, *params)).fetchall()
+
+        data = {}
+        for i, (name, _, dtype) in enumerate(columns):
+            values = pd.Series([row[i] for row in rows], dtype=object)
+            if dtype.startswith('datetime64'):
+                values = pd.to_datetime(values, format=DATE_FORMAT)
+            data[name] = values.astype(dtype)
+        return pd.DataFrame(data, columns=[name for name, _, _ in columns])
+
+    def artists(self):
+        """Artists with any input loaded."""
+        with self._connect() as db:
+            return [row[0] for row in db.execute('SELECT DISTINCT artist FROM sources ORDER BY artist')]
+
+    def query(self, sql, params=()):
+        """Run a SQL query against the warehouse and return the result as a frame."""
+        with self._connect() as db:
+            return pd.read_sql_query(sql, db, params=params)
+
+    # ------------------------------------------------------------------
+    # Pushed-down metrics
+    # ------------------------------------------------------------------
+
+    def artist_metrics(self, artist, as_of=None, k=10):
+        """One artist's PART 2-5 figures, each aggregated inside SQLite on the artist's index range.
+
+        Returns the scalars of PART 2, 4 and 5 (earnings total, mean and median, 1-year totals, followers at
+        the edges of the trailing year and its listener/stream sums) and the frames `top_songs`,
+        `earnings_by_year`, `top_performers_1yr` and `monthly_followers`, under the stage output names.
+        Like `roster_metrics`, earnings are the per-song export's (line-item statements are not stored).
+        """
+        day = pd.Timestamp(as_of if as_of is not None else datetime.now().date()).normalize()
+        end = day + pd.Timedelta(days=1, microseconds=-1)
+        params = {'artist': artist, 'k': k,
+                  'start': (day + pd.Timedelta(days=1) - pd.Timedelta(days=365)).strftime(DATE_FORMAT),
+                  'cutoff': (end - pd.Timedelta(days=5 * 365)).ceil('D').strftime(DATE_FORMAT)}
+        metrics = {}
+        with self._connect() as db:
+            for name, sql in ARTIST_QUERIES.items():
+                result = pd.read_sql_query(sql, db, params=params)
+                if name in ARTIST_SCALARS:
+                    metrics.update(result.iloc[0].to_dict())
+                else:
+                    metrics[name] = result
+        return metrics
+
+    def roster_metrics(self, as_of=None):
+        """Headline PART 2-5 metrics of every artist, aggregated inside SQLite.
+
+        The as-of-independent totals are the ROLLUPS kept up to date by `store`; the follower counts at
+        the edges of the year are two index seeks per artist. Matches run_analysis for the same as-of
+        date: earnings are the artist's own songs in the per-song export (line-item statements are not
+        stored), the 1-year totals come from the songs export and follower growth spans the timeline
+        rows from 365 days before the end of `as_of`.
+        """
+        day = pd.Timestamp(as_of if as_of is not None else datetime.now().date()).normalize()
+        start = (day + pd.Timedelta(days=1) - pd.Timedelta(days=365)).strftime(DATE_FORMAT)
+        totals = self.query('SELECT artist, metric, value FROM artist_metrics')
+        totals = totals.pivot(index='artist', columns='metric', values='value').reset_index()
+        # First and last timeline rows of the year, each one seek on the (artist, date) index
+        followers = self.query(
+            'SELECT artist, '
+            '(SELECT followers FROM audience a WHERE a.artist = s.artist AND date >= :start ORDER BY date LIMIT 1) '
+            'AS initial_followers, '
+            '(SELECT followers FROM audience a WHERE a.artist = s.artist AND date >= :start ORDER BY date DESC LIMIT 1) '
+            "AS final_followers FROM sources s WHERE input = 'audience'", {'start': start})
+
+        roster = pd.DataFrame({'artist': self.artists()})
+        roster = roster.merge(totals, on='artist', how='left').merge(followers, on='artist', how='left')
+        roster = roster.reindex(columns=['artist', *ROLLUP_METRICS, 'initial_followers', 'final_followers'])
+        initial = roster['initial_followers'].fillna(0)
+        roster['final_followers'] = roster['final_followers'].fillna(0)
+        roster['follower_growth'] = roster['final_followers'] - initial
+        roster['follower_growth_pct'] = (roster['follower_growth'] / initial.where(initial > 0) * 100).fillna(0)
+        roster['save_rate'] = (roster['total_saves_1yr'] / roster['total_streams_1yr'].where(roster['total_streams_1yr'] > 0)
+                               * 100).fillna(0)
+        return roster
+
+
+def ingest_artist(warehouse, artist, paths, parsers):
+    """Load every existing input file of one artist; `paths` and `parsers` are keyed by input parameter."""
+    loaded = {}
+    for name, parser in parsers.items():
+        table = name[:-len('_path')]
+        try:
+            loaded[table] = len(warehouse.load(artist, table, paths[name], parser))
+        except FileNotFoundError:
+            continue
+    return loaded
+
+
+if __name__ == "__main__":
+    import time
+
+    parser = argparse.ArgumentParser(description="Load artist inputs into the warehouse and query it.")
+    parser.add_argument('warehouse', help="SQLite warehouse file (created if missing)")
+    commands = parser.add_subparsers(dest='command', required=True)
+    ingest = commands.add_parser('ingest', help="Load (or refresh) every artist of a manifest")
+    ingest.add_argument('manifest', help="CSV with artist,data_dir columns")
+    one = commands.add_parser('artist', help="One artist's PART 2-5 figures, aggregated in SQL")
+    one.add_argument('artist')
+    one.add_argument('--as-of', default=None, help="Analysis date (YYYY-MM-DD, default: today)")
+    one.add_argument('--top', type=int, default=10, help="Songs in the top-k tables")
+    roster = commands.add_parser('roster', help="Roster-wide headline metrics, aggregated in SQL")
+    roster.add_argument('--as-of', default=None, help="Analysis date (YYYY-MM-DD, default: today)")
+    roster.add_argument('--output', default=None, help="Also write the table to this CSV")
+    sql = commands.add_parser('query', help="Run a SQL query")
+    sql.add_argument('sql')
+    args = parser.parse_args()
+
+    warehouse = Warehouse(args.warehouse)
+    if args.command == 'ingest':
+        import os
+        import big_nose_analysis
+        from batch_analysis import read_manifest
+        for entry in read_manifest(args.manifest):
+            paths = {name: os.path.join(entry['data_dir'], path.format(artist=entry['artist']))
+                     for name, path in big_nose_analysis.INPUT_FILES.items()}
+            loaded = ingest_artist(warehouse, entry['artist'], paths, big_nose_analysis.INPUT_PARSERS)
+            print(f"✓ {entry['artist']}: " + (', '.join(f'{table} {rows:,}' for table, rows in loaded.items()) or 'no inputs'))
+    elif args.command == 'artist':
+        started = time.perf_counter()
+        metrics = warehouse.artist_metrics(args.artist, args.as_of, args.top)
+        for name, value in metrics.items():
+            if isinstance(value, pd.DataFrame):
+                print(f"\n{name}:\n{value.to_string(index=False)}")
+            else:
+                print(f"{name}: {value}")
+        print(f"\n✓ {len(metrics)} figures in {(time.perf_counter() - started) * 1000:.1f} ms")
+    else:
+        started = time.perf_counter()
+        result = warehouse.roster_metrics(args.as_of) if args.command == 'roster' else warehouse.query(args.sql)
+        print(result.to_string(index=False))
+        print(f"\n✓ {len(result)} rows in {(time.perf_counter() - started) * 1000:.1f} ms")
+        if args.command == 'roster' and args.output:
+            result.to_csv(args.output, index=False)
+            print(f"✓ Saved roster metrics: {args.output}")
@@ -0,0 +1,16 @@
+"""
+Worker Pools
+Start context shared by the batch, dashboard and forecast process pools
+"""
+
+import multiprocessing as mp
+
+
+def pool_context(preload):
+    """A forkserver context whose server imports the `preload` modules once and forks warm workers from
+    them; the platform's default context where forkserver is unavailable."""
+    if 'forkserver' in mp.get_all_start_methods():
+        ctx = mp.get_context('forkserver')
+        ctx.set_forkserver_preload(list(preload))
+        return ctx
+    return mp.get_context()